@@ -1,6 +1,7 @@
 import Driver from '../models/Driver.js';
 import Team from '../models/Team.js';
 import Race from '../models/Race.js';
+import { findSeasonStandings } from '../models/Standings.js';
 
 export const getAllDrivers = async (req, res) => {
   try {
@@ -35,6 +36,12 @@ export const getDriverStandings = async (req, res) => {
       'stats.season_points': 1
     });
 
+    // Puntos calculados desde los resultados; si aún no existen, los guardados a mano
+    // ?year=2024 para una temporada concreta; por defecto, la última calculada
+    const year = Number.parseInt(req.query.year, 10) || null;
+    const standings = await findSeasonStandings('drivers', year);
+    const points = new Map((standings?.standings ?? []).map(s => [`driver_${s.driver}`, s.points]));
+
     const formattedDrivers = await Promise.all(drivers.map(async (driver) => {
       const teamId = `team_${driver.team}`;
       const team = await Team.findById(teamId);
@@ -45,7 +52,7 @@ export const getDriverStandings = async (req, res) => {
         profileImage: driver.profile_image,
         flagImage: driver.nationality.flag_image,
         teamName: team.name,
-        seasonPoints: driver.stats?.season_points ?? 0
+        seasonPoints: points.get(driver._id) ?? driver.stats?.season_points ?? 0
       };
     }));
 
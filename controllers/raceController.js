@@ -2,8 +2,10 @@ import path from 'path';
 import fs from 'fs/promises';
 import axios from 'axios';
 import Race from '../models/Race.js';
+import RaceChart from '../models/RaceChart.js';
 import Driver from '../models/Driver.js';
 import Team from '../models/Team.js';
+import { invalidateFingerprint } from '../models/fingerprint.js';
 
 const URL = process.env.BACK_URL || 'http://localhost:3000/';
 
@@ -45,6 +47,44 @@ export const getRaceById = async (req, res) => {
   }
 }
 
+// [posición, vueltas, posición, vueltas, ...] -> una posición por vuelta (null = sin dato)
+const decodeRuns = (runs) => {
+  const values = [];
+  for (let i = 0; i < runs.length; i += 2) {
+    for (let j = 0; j < runs[i + 1]; j++) {
+      values.push(runs[i] || null);
+    }
+  }
+  return values;
+}
+
+export const getRaceChart = async (req, res) => {
+  const { raceId } = req.params;
+
+  try {
+    const chart = await RaceChart.findById(raceId).lean();
+    if (!chart) {
+      return res.status(404).json({ error: 'Gráfico de la carrera no encontrado' });
+    }
+    res.json({
+      race: chart._id,
+      year: chart.year,
+      round: chart.round,
+      laps: chart.laps,
+      drivers: chart.drivers.map(d => ({
+        driver: d.driver,
+        driver_id: d.driver_id,
+        grid: d.grid,
+        positions: decodeRuns(d.positions),
+        gaps: d.gaps.map(g => (g === null ? null : g / 10))
+      }))
+    });
+  } catch (err) {
+    console.error(err);
+    res.status(500).json({ error: 'Error al obtener el gráfico de la carrera' });
+  }
+}
+
 export const getCircuitById = async (req, res) => {
   const { circuitId } = req.params;
 
@@ -177,10 +217,14 @@ export const updateSesionsByRound = async (req, res) => {
         // data.results ya es un objeto { first: {...}, second: {...}, ... }
         const sessionResultObj = data.results;
 
-        // Volcarlo directamente en MongoDB
+        // Volcarlo directamente en MongoDB (con el análisis por sectores si lo hay)
+        const fields = { 'sessions.$.session_result': sessionResultObj };
+        if (data.sectors) {
+          fields['sessions.$.sectors'] = data.sectors;
+        }
         await Race.collection.updateOne(
           { _id: raceDoc._id, 'sessions.name': name },
-          { $set: { 'sessions.$.session_result': sessionResultObj } }
+          invalidateFingerprint({ $set: fields })
         );
       } catch (err) {
         console.warn(`Error al procesar ${file}: ${err.message}`);
@@ -205,10 +249,11 @@ export const updateQualyfingByRound = async (req, res) => {
   const baseUrl = `${URL}api/scripts`;
 
   try {
-    // 1) Ejecutar el script que genera el archivo JSON de qualy
+    // 1) Ejecutar el script: procesa la qualy y la publica directamente en MongoDB
+    let data;
     try {
-      await axios.get(`${baseUrl}/updateQualy/${year}/${round}`);
-      /* console.log("Script ejecutado correctamente"); */
+      const response = await axios.get(`${baseUrl}/updateQualy/${year}/${round}`);
+      data = response.data;
     } catch (axiosErr) {
       console.error("Fallo al ejecutar script de qualifying:");
       console.error("Status:", axiosErr.response?.status);
@@ -221,31 +266,17 @@ export const updateQualyfingByRound = async (req, res) => {
       });
     }
 
-    // 2) Buscar el documento de la carrera en MongoDB
-    const raceDoc = await Race.findOne({ round: parseInt(round, 10) });
-    if (!raceDoc) return res.status(404).json({ message: 'Carrera no encontrada' });
-
-    // 3) Leer el archivo qualifying.json generado
-    const folderPath = path.join(process.cwd(), 'gp_results', year, round);
-    const fullPath = path.join(folderPath, 'qualifying.json');
-    const raw = await fs.readFile(fullPath, 'utf8');
-    const data = JSON.parse(raw);
+    if (!data.results || typeof data.results !== 'object') return res.status(400).json({ message: 'El script de clasificación no devolvió resultados válidos' });
 
-    if (!data.results || typeof data.results !== 'object') return res.status(400).json({ message: 'El archivo de clasificación no contiene resultados válidos' });
+    // 2) El script devuelve la carrera ya actualizada (null si no existe)
+    if (!data.race) return res.status(404).json({ message: 'Carrera no encontrada' });
 
-    const sessionResultObj = data.results;
-
-    // 4) Guardar los resultados en la sesión "Qualifying"
-    await Race.collection.updateOne(
-      { _id: raceDoc._id, 'sessions.name': 'Qualifying' },
-      { $set: { 'sessions.$.session_result': sessionResultObj } }
-    );
+    // Resultado repetido desde el registro de trabajos: se devuelve la carrera actual
+    const race = data.ledger === 'done' ? (await Race.findById(data.race._id)) || data.race : data.race;
 
-    // 5) Devolver la carrera ya actualizada
-    const updatedRace = await Race.findById(raceDoc._id);
     return res.status(200).json({
-      message: 'Clasificación actualizada correctamente desde archivo JSON',
-      race: updatedRace
+      message: 'Clasificación actualizada correctamente',
+      race
     });
 
   } catch (err) {
@@ -259,10 +290,12 @@ export const updateRaceByRound = async (req, res) => {
   const baseUrl = `${URL}api/scripts`;
 
   try {
-    // 1) Ejecutar el script que genera el archivo JSON de qualy
+    // 1) Ejecutar el script: procesa la carrera y la publica directamente en MongoDB
+    //    (session_result, race_results, finished y winner)
+    let data;
     try {
-      await axios.get(`${baseUrl}/updateRace/${year}/${round}`);
-      /* console.log("Script ejecutado correctamente"); */
+      const response = await axios.get(`${baseUrl}/updateRace/${year}/${round}`);
+      data = response.data;
     } catch (axiosErr) {
       console.error("Fallo al ejecutar script de updateRace:");
       console.error("Status:", axiosErr.response?.status);
@@ -275,17 +308,7 @@ export const updateRaceByRound = async (req, res) => {
       });
     }
 
-    // 2) Buscar el documento de la carrera en MongoDB
-    const raceDoc = await Race.findOne({ round: parseInt(round, 10) });
-    if (!raceDoc) return res.status(404).json({ message: 'Carrera no encontrada' });
-
-    // 3) Leer el archivo qualifying.json generado
-    const folderPath = path.join(process.cwd(), 'gp_results', year, round);
-    const fullPath = path.join(folderPath, 'race.json');
-    const raw = await fs.readFile(fullPath, 'utf8');
-    const data = JSON.parse(raw);
-
-    if (!data.results || typeof data.results !== 'object') return res.status(400).json({ message: 'El archivo de carrera no contiene resultados válidos' });
+    if (!data.results || typeof data.results !== 'object') return res.status(400).json({ message: 'El script de carrera no devolvió resultados válidos' });
 
     const sessionResultObj = data.results;
     const winnerId = sessionResultObj.first?.driver;
@@ -296,30 +319,20 @@ export const updateRaceByRound = async (req, res) => {
       });
     }
 
-    const raceResultsArray = Object.values(sessionResultObj)
-      .filter(r => typeof r === 'object' && r.driver && r.position?.Position)
-      .map(r => ({
-        driver: r.driver,
-        time: r.time ?? null,
-        position: parseInt(r.position.Position)
-      }))
-      .sort((a, b) => a.position - b.position);
-
-
-    // 4) Guardar los resultados en la sesión "Race"
-    await Race.collection.updateOne(
-      { _id: raceDoc._id, 'sessions.name': 'Race' },
-      { 
-        $set: {
-          'sessions.$.session_result': sessionResultObj,
-          race_results: raceResultsArray,
-          finished: true,
-          winner: winnerId
-        } 
-      }
-    );
+    // 2) El script devuelve la carrera ya actualizada (null si no existe)
+    if (!data.race) return res.status(404).json({ message: 'Carrera no encontrada' });
 
-    // 5) Actualizar estadísticas de pilotos y acumular puntos por equipo
+    // Resultado repetido desde el registro de trabajos: las estadísticas ya se sumaron
+    // la primera vez y la carrera guardada en el registro puede estar desfasada
+    if (data.ledger === 'done') {
+      const race = await Race.findById(data.race._id);
+      return res.status(200).json({
+        message: 'Carrera ya procesada anteriormente',
+        race: race || data.race
+      });
+    }
+
+    // 3) Actualizar estadísticas de pilotos y acumular puntos por equipo
     const teamPointsMap = {};
 
     await Promise.all(
@@ -365,7 +378,7 @@ export const updateRaceByRound = async (req, res) => {
       })
     );
 
-    // 6) Actualizar puntos de los equipos
+    // 4) Actualizar puntos de los equipos
     await Promise.all(
       Object.entries(teamPointsMap).map(async ([teamId, points]) => {
         try {
@@ -376,11 +389,10 @@ export const updateRaceByRound = async (req, res) => {
       })
     );
 
-    // 7) Devolver la carrera ya actualizada
-    const updatedRace = await Race.findById(raceDoc._id);
+    // 5) Devolver la carrera ya actualizada
     return res.status(200).json({
-      message: 'Carrera actualizada correctamente desde archivo JSON',
-      race: updatedRace
+      message: 'Carrera actualizada correctamente',
+      race: data.race
     });
 
   } catch (err) {
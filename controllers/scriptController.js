@@ -1,63 +1,28 @@
-import { spawn } from 'child_process';
-import path from 'path';
-import { promises as fs } from 'fs';
-import { fileURLToPath } from 'url';
-import { dirname } from 'path';
-
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = dirname(__filename);
-const isWindows = process.platform === 'win32';
-
-const getPythonPath = () => {
-  return process.env.BACK_URL
-    ? 'python3'
-    : isWindows
-      ? path.join(__dirname, 'python_scripts', '.venv', 'Scripts', 'python.exe')
-      : path.join(__dirname, 'python_scripts', '.venv', 'bin', 'python3');
-};
-
-const runPythonScript = async (scriptFile, args = [], expectJson = false, jsonPath = '') => {
-  const pythonPath = getPythonPath();
-  const scriptPath = path.join(__dirname, '..', 'python_scripts', scriptFile);
-
-  return new Promise((resolve, reject) => {
-    const py = spawn(pythonPath, [scriptPath, ...args]);
+import pythonPool from '../pythonWorkerPool.js';
 
-    let result = '';
-    let error = '';
+// Publicación directa: Python escribe en MongoDB y devuelve el resultado (sin JSON intermedio en disco)
+const PUBLISH_OPTIONS = { publish: true, write_file: false };
 
-    py.stdout.on('data', (data) => (result += data.toString()));
-    py.stderr.on('data', (data) => (error += data.toString()));
+// Envía el trabajo al pool de workers Python (sin lanzar un intérprete nuevo por petición)
+const runPythonJob = async (job, args = {}) => {
+  const result = await pythonPool.run(job, args);
 
-    py.on('close', async (code) => {
-      if (code !== 0) {
-        return reject({ code, error });
-      }
-
-      if (expectJson) {
-        try {
-          const jsonContent = await fs.readFile(jsonPath, 'utf-8');
-          return resolve(JSON.parse(jsonContent));
-        } catch (readErr) {
-          return reject({ code: 500, error: 'Error leyendo archivo JSON', details: readErr });
-        }
-      }
-
-      resolve(result);
-    });
+  if (result && result.error) {
+    throw { code: 500, error: result.error };
+  }
 
-    py.on('error', (err) => {
-      reject({ code: 500, error: 'No se pudo ejecutar el script', details: err });
-    });
-  });
+  return result;
 };
 
+// ?force=true vuelve a procesar aunque el registro de trabajos la dé por hecha
+const isForced = (req) => req.query.force === 'true';
+
 
 export const process_sessions = async (req, res) => {
   const { year, round } = req.params;
 
   try {
-    const output = await runPythonScript('get_sessions.py', [year, round]);
+    const output = await runPythonJob('practice', { year, round, options: { force: isForced(req) } });
     res.status(200).json({ success: true, output });
   } catch (err) {
     res.status(500).json({ success: false, error: err });
@@ -67,11 +32,9 @@ export const process_sessions = async (req, res) => {
 
 export const get_qualifying = async (req, res) => {
   const { year, round } = req.params;
-  const jsonPath = path.join(__dirname, '..', 'gp_results', year, round, 'qualifying.json');
-
 
   try {
-    const data = await runPythonScript('get_qualifying_main.py', [year, round], true, jsonPath);
+    const data = await runPythonJob('qualifying', { year, round, options: { ...PUBLISH_OPTIONS, force: isForced(req) } });
     res.status(200).json(data);
   } catch (err) {
     res.status(500).json({ error: 'Fallo al obtener clasificación', details: err });
@@ -81,12 +44,36 @@ export const get_qualifying = async (req, res) => {
 
 export const get_race = async (req, res) => {
   const { year, round } = req.params;
-  const jsonPath = path.join(__dirname, '..', 'gp_results', year, round, 'race.json');
 
   try {
-    const data = await runPythonScript('get_race_main.py', [year, round], true, jsonPath);
+    const data = await runPythonJob('race', { year, round, options: { ...PUBLISH_OPTIONS, force: isForced(req) } });
     res.status(200).json(data);
   } catch (err) {
     res.status(500).json({ error: 'Fallo al obtener carrera', details: err });
   }
 };
+
+
+export const get_telemetry = async (req, res) => {
+  const { year, round, session, driver } = req.params;
+  const { points, reference } = req.query;
+
+  try {
+    const options = { session, driver, points: points ? Number(points) : null, reference: reference || null };
+    const data = await runPythonJob('telemetry', { year, round, options });
+    res.status(200).json(data);
+  } catch (err) {
+    res.status(500).json({ error: 'Fallo al obtener la telemetría', details: err });
+  }
+};
+
+
+export const workers_health = async (req, res) => {
+  try {
+    const health = await pythonPool.health();
+    const healthy = health.workers.every(w => w.ok);
+    res.status(healthy ? 200 : 503).json(health);
+  } catch (err) {
+    res.status(500).json({ error: 'Fallo al consultar los workers', details: err });
+  }
+};
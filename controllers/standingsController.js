@@ -0,0 +1,36 @@
+import { Standings, StandingsRound } from '../models/Standings.js';
+
+// Clasificaciones materializadas por python_scripts/standings.py al publicar cada carrera y sprint:
+// cada petición es una única lectura por _id
+
+const findStandings = async (req, res, kind) => {
+  const { year } = req.params;
+
+  try {
+    const standings = await Standings.findById(`${year}_${kind}`).lean();
+    if (!standings) {
+      return res.status(404).json({ error: `No hay clasificación de ${year}` });
+    }
+    res.json(standings);
+  } catch (err) {
+    res.status(500).json({ error: err.message });
+  }
+};
+
+export const getDriversStandings = (req, res) => findStandings(req, res, 'drivers');
+
+export const getTeamsStandings = (req, res) => findStandings(req, res, 'teams');
+
+export const getRoundContributions = async (req, res) => {
+  const { year, round } = req.params;
+
+  try {
+    const contributions = await StandingsRound.find({ year: Number(year), round: Number(round) }).lean();
+    if (!contributions.length) {
+      return res.status(404).json({ error: `No hay puntos registrados para la ronda ${round} de ${year}` });
+    }
+    res.json(contributions);
+  } catch (err) {
+    res.status(500).json({ error: err.message });
+  }
+};
@@ -1,6 +1,7 @@
 import Team from '../models/Team.js';
 import Driver from '../models/Driver.js';
 import Race from '../models/Race.js';
+import { findSeasonStandings } from '../models/Standings.js';
 
 export const getAllTeams = async (req, res) => {
   try {
@@ -43,6 +44,12 @@ export const getTeamStandings = async (req, res) => {
     const teams = await Team.find({});
     const summary = [];
 
+    // Puntos calculados desde los resultados; si aún no existen, los guardados a mano
+    // ?year=2024 para una temporada concreta; por defecto, la última calculada
+    const year = Number.parseInt(req.query.year, 10) || null;
+    const standings = await findSeasonStandings('teams', year);
+    const points = new Map((standings?.standings ?? []).map(s => [`team_${s.team}`, s.points]));
+
     for (const team of teams) {
       const driversData = await Driver.find({
         _id: { $in: team.drivers }
@@ -59,7 +66,7 @@ export const getTeamStandings = async (req, res) => {
         name: team.name,
         logo: team.logo,
         drivers,
-        season_points: team.points ?? 0
+        season_points: points.get(team._id) ?? team.points ?? 0
       });
     }
 
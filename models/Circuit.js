@@ -1,9 +1,10 @@
 import mongoose from 'mongoose';
-const { Schema, Types } = mongoose;
+import { fingerprintPlugin } from './fingerprint.js';
+const { Schema } = mongoose;
 
 const lapRecordSchema = new Schema({
   time:     String,
-  driver:   { type: Types.ObjectId, ref: 'Driver' },
+  driver:   { type: String, ref: 'Driver' },
   year:     Number,
 }, { _id: false });
 
@@ -37,4 +38,6 @@ const circuitSchema = new Schema({
   versionKey: false
 });
 
+circuitSchema.plugin(fingerprintPlugin);
+
 export default mongoose.model('Circuit', circuitSchema);
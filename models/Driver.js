@@ -1,4 +1,5 @@
 import mongoose from 'mongoose';
+import { fingerprintPlugin } from './fingerprint.js';
 
 const careerSchema = new mongoose.Schema({
   teams: [String],
@@ -50,5 +51,7 @@ const driverSchema = new mongoose.Schema({
   team: String
 });
 
+driverSchema.plugin(fingerprintPlugin);
+
 const Driver = mongoose.model('Driver', driverSchema, 'drivers');
 export default Driver;
\ No newline at end of file
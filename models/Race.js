@@ -1,4 +1,5 @@
 import mongoose from 'mongoose';
+import { fingerprintPlugin } from './fingerprint.js';
 
 const sessionResultPositionSchema = new mongoose.Schema({
   driver: String,
@@ -12,12 +13,29 @@ const sessionResultSchema = new mongoose.Schema({
   third: sessionResultPositionSchema
 }, { _id: false });
 
+// Análisis por sectores (python_scripts/sectors.py): tiempos en segundos
+const sectorTimeSchema = new mongoose.Schema({
+  time: Number,
+  rank: Number,
+  gap: Number
+}, { _id: false });
+
+const driverSectorsSchema = new mongoose.Schema({
+  driver: String,
+  driver_id: String,
+  best_lap: Number,
+  sectors: [sectorTimeSchema],
+  theoretical: sectorTimeSchema,
+  potential: Number
+}, { _id: false });
+
 const sessionSchema = new mongoose.Schema({
   name: String,
   date: String,
   start_time: String,
   end_time: String,
-  session_result: sessionResultSchema
+  session_result: sessionResultSchema,
+  sectors: [driverSectorsSchema]
 }, { _id: false });
 
 const raceResultSchema = new mongoose.Schema({
@@ -26,6 +44,36 @@ const raceResultSchema = new mongoose.Schema({
   total_time: String
 }, { _id: false });
 
+const stintSchema = new mongoose.Schema({
+  stint: Number,
+  compound: String,
+  start_lap: Number,
+  end_lap: Number,
+  laps: Number,
+  clean_laps: Number,
+  tyre_life_start: Number,
+  avg: Number,
+  best: Number,
+  deg: Number
+}, { _id: false });
+
+const driverStintsSchema = new mongoose.Schema({
+  driver: String,
+  driver_id: String,
+  stints: [stintSchema]
+}, { _id: false });
+
+// Vuelta rápida de la carrera (candidata al récord del circuito en 'lap_records')
+const fastestLapSchema = new mongoose.Schema({
+  driver: String,
+  driver_code: String,
+  lap: Number,
+  time: String,
+  time_ns: Number,
+  year: Number,
+  round: Number
+}, { _id: false });
+
 const raceSchema = new mongoose.Schema({
   _id: String,
   circuit: String,
@@ -37,7 +85,11 @@ const raceSchema = new mongoose.Schema({
   winner: String,
   timeZone: String,
   round: Number,
+  stints: [driverStintsSchema],
+  fastest_lap: fastestLapSchema,
 });
 
+raceSchema.plugin(fingerprintPlugin);
+
 const Race = mongoose.model('Race', raceSchema, 'races');
 export default Race;
@@ -0,0 +1,30 @@
+import mongoose from 'mongoose';
+import { fingerprintPlugin } from './fingerprint.js';
+
+// Gráfico de posiciones de una carrera generado por python_scripts/race_charts.py
+// (mismo _id que la carrera). positions: runs [posición, nº de vueltas, ...],
+// 0 = sin dato; gaps: décimas de segundo respecto al líder por vuelta.
+const raceChartDriverSchema = new mongoose.Schema({
+  driver: String,
+  driver_id: String,
+  grid: Number,
+  positions: [Number],
+  gaps: [Number]
+}, { _id: false });
+
+const raceChartSchema = new mongoose.Schema({
+  _id: String,
+  year: Number,
+  round: Number,
+  laps: Number,
+  encoding: {
+    positions: String,
+    gaps: String
+  },
+  drivers: [raceChartDriverSchema]
+});
+
+raceChartSchema.plugin(fingerprintPlugin);
+
+const RaceChart = mongoose.model('RaceChart', raceChartSchema, 'race_charts');
+export default RaceChart;
@@ -0,0 +1,53 @@
+import mongoose from 'mongoose';
+import { fingerprintPlugin } from './fingerprint.js';
+
+// Documentos materializados por python_scripts/standings.py ('<año>_drivers', '<año>_teams')
+const standingsEntrySchema = new mongoose.Schema({
+  driver: String,
+  team: String,
+  position: Number,
+  points: Number,
+  wins: Number,
+  podiums: Number,
+  last_round_points: Number,
+  position_change: Number,
+  round_points: [Number],
+  positions: [Number]
+}, { _id: false });
+
+const standingsSchema = new mongoose.Schema({
+  _id: String,
+  year: Number,
+  kind: String,
+  round: Number,
+  rounds: [Number],
+  standings: [standingsEntrySchema]
+});
+
+// Aportación de una carrera o sprint ('<año>_<ronda>_<sesión>')
+const standingsRoundSchema = new mongoose.Schema({
+  _id: String,
+  year: Number,
+  round: Number,
+  session: String,
+  drivers: [String],
+  teams: [String],
+  points: [Number],
+  positions: [Number]
+});
+standingsRoundSchema.index({ year: 1, round: 1 });
+
+standingsSchema.plugin(fingerprintPlugin);
+standingsRoundSchema.plugin(fingerprintPlugin);
+
+export const Standings = mongoose.model('Standings', standingsSchema, 'standings');
+export const StandingsRound = mongoose.model('StandingsRound', standingsRoundSchema, 'standings_rounds');
+
+// Clasificación de una temporada; sin año, la más reciente que exista (así no
+// depende del año del reloj del servidor: en enero sigue la temporada pasada)
+export const findSeasonStandings = (kind, year) => {
+  if (year) return Standings.findById(`${year}_${kind}`).lean();
+  return Standings.findOne({ kind }).sort({ year: -1 }).lean();
+};
+
+export default Standings;
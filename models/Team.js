@@ -1,4 +1,5 @@
 import mongoose from 'mongoose';
+import { fingerprintPlugin } from './fingerprint.js';
 
 const teamChiefsSchema = new mongoose.Schema({
   team_principal: String,
@@ -42,5 +43,7 @@ const teamSchema = new mongoose.Schema({
   team_images: teamImagesSchema
 });
 
+teamSchema.plugin(fingerprintPlugin);
+
 const Team = mongoose.model('Team', teamSchema, 'teams');
 export default Team;
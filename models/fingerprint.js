@@ -0,0 +1,28 @@
+// Huella '_fp' que BulkWriter (python_scripts/bulk_writer.py) guarda en cada
+// documento para no reescribirlo si no ha cambiado. No se devuelve en las
+// consultas y cualquier actualización hecha desde Node la borra, así la
+// siguiente reconstrucción desde Python vuelve a escribir el documento.
+export const FINGERPRINT_FIELD = '_fp';
+
+// Para las escrituras que no pasan por mongoose (Model.collection.updateOne)
+export const invalidateFingerprint = (update) => ({
+  ...update,
+  $unset: { ...(update.$unset || {}), [FINGERPRINT_FIELD]: '' }
+});
+
+export const fingerprintPlugin = (schema) => {
+  schema.add({ [FINGERPRINT_FIELD]: { type: String, select: false } });
+
+  schema.pre(['updateOne', 'updateMany', 'findOneAndUpdate'], function () {
+    const update = this.getUpdate() || {};
+    // Las claves sin operador son un $set implícito
+    const fields = Object.fromEntries(Object.entries(update).filter(([key]) => !key.startsWith('$')));
+    const operators = Object.fromEntries(Object.entries(update).filter(([key]) => key.startsWith('$')));
+    const $set = { ...(operators.$set || {}), ...fields };
+    this.setUpdate(invalidateFingerprint(Object.keys($set).length ? { ...operators, $set } : operators));
+  });
+
+  schema.pre('save', function () {
+    if (!this.isNew) this.set(FINGERPRINT_FIELD, undefined);
+  });
+};
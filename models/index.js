@@ -1,6 +1,8 @@
 import Circuit from './Circuit.js';
 import Driver from './Driver.js';
 import Race from './Race.js';
+import RaceChart from './RaceChart.js';
 import Team from './Team.js';
+import Standings, { StandingsRound } from './Standings.js';
 
-export { Circuit, Driver, Race, Team };
\ No newline at end of file
+export { Circuit, Driver, Race, RaceChart, Team, Standings, StandingsRound };
\ No newline at end of file
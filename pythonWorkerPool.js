@@ -0,0 +1,226 @@
+import { spawn } from 'child_process';
+import path from 'path';
+import readline from 'readline';
+import { fileURLToPath } from 'url';
+import { dirname } from 'path';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = dirname(__filename);
+const isWindows = process.platform === 'win32';
+
+const WORKER_SCRIPT = path.join(__dirname, 'python_scripts', 'worker.py');
+const POOL_SIZE = parseInt(process.env.PY_WORKERS, 10) || 2;
+const JOB_TIMEOUT_MS = parseInt(process.env.PY_JOB_TIMEOUT_MS, 10) || 10 * 60 * 1000;
+const HEALTH_TIMEOUT_MS = 5000;
+
+export const getPythonPath = () => {
+  return process.env.BACK_URL
+    ? 'python3'
+    : isWindows
+      ? path.join(__dirname, 'python_scripts', '.venv', 'Scripts', 'python.exe')
+      : path.join(__dirname, 'python_scripts', '.venv', 'bin', 'python3');
+};
+
+// Un proceso Python de larga duración que atiende un trabajo cada vez
+class PythonWorker {
+  constructor(onExit) {
+    this.nextId = 1;
+    this.pending = new Map();
+    this.busy = false;
+    this.startedAt = Date.now();
+    this.stderr = '';
+
+    this.process = spawn(getPythonPath(), [WORKER_SCRIPT], {
+      cwd: process.cwd(),
+      env: { ...process.env, PYTHONUNBUFFERED: '1' }
+    });
+
+    this.ready = new Promise((resolve, reject) => {
+      this.pending.set(null, { resolve, reject, timer: null });
+    });
+    // Evita "unhandled rejection" si el worker muere antes de usarse
+    this.ready.then(() => { this.started = true; }, () => {});
+
+    readline.createInterface({ input: this.process.stdout }).on('line', (line) => this.handleLine(line));
+
+    this.process.stderr.on('data', (data) => {
+      // Solo se conserva la cola del stderr para adjuntarla a los errores
+      this.stderr = (this.stderr + data.toString()).slice(-8192);
+    });
+
+    // Si el proceso no llega a arrancar (ENOENT, EAGAIN) Node emite 'error' pero no 'exit'
+    this.process.on('error', (err) => {
+      this.finish(onExit, { code: 500, error: 'No se pudo ejecutar el worker', details: err.message });
+      this.kill();
+    });
+    // Escribir en un worker que acaba de morir (EPIPE) no debe tumbar el servidor
+    this.process.stdin.on('error', (err) => {
+      this.terminate({ code: 500, error: 'Conexión con el worker perdida', details: err.message });
+      this.kill();
+    });
+    this.process.on('exit', (code, signal) => {
+      this.finish(onExit, { code: code ?? 500, error: `El worker terminó (${signal ?? code})`, details: this.stderr });
+    });
+  }
+
+  finish(onExit, reason) {
+    // Se avisa al pool una sola vez aunque lleguen 'error' y 'exit'
+    this.terminate(reason);
+    if (this.exited) return;
+    this.exited = true;
+    onExit(this, this.started ? null : reason);
+  }
+
+  handleLine(line) {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch {
+      return;
+    }
+
+    const entry = this.pending.get(message.id);
+    if (!entry) return;
+    this.pending.delete(message.id);
+    clearTimeout(entry.timer);
+
+    if (message.ok) entry.resolve(message.result);
+    else entry.reject({ code: 500, error: message.error, details: message.traceback });
+  }
+
+  send(job, params, timeoutMs) {
+    const id = this.nextId++;
+    return new Promise((resolve, reject) => {
+      if (this.dead) {
+        reject({ code: 500, error: 'Worker terminado', details: this.stderr });
+        return;
+      }
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject({ code: 504, error: `Tiempo de espera agotado para el trabajo '${job}' (${timeoutMs} ms)` });
+        // El proceso puede quedar bloqueado en una carga: se descarta y se sustituye
+        this.kill();
+      }, timeoutMs);
+
+      this.pending.set(id, { resolve, reject, timer });
+      this.process.stdin.write(JSON.stringify({ id, job, ...params }) + '\n');
+    });
+  }
+
+  terminate(reason) {
+    for (const { reject, timer } of this.pending.values()) {
+      clearTimeout(timer);
+      reject(reason);
+    }
+    this.pending.clear();
+    this.dead = true;
+  }
+
+  kill() {
+    // Se marca muerto ya: el 'exit' llega más tarde y acquire() no debe volver a elegirlo
+    if (this.process.pid && this.process.exitCode === null && this.process.signalCode === null) this.process.kill('SIGKILL');
+    this.dead = true;
+  }
+}
+
+// Pool acotado de workers: los trabajos que excedan el tamaño esperan en cola
+export class PythonWorkerPool {
+  constructor({ size = POOL_SIZE, timeoutMs = JOB_TIMEOUT_MS } = {}) {
+    this.size = size;
+    this.timeoutMs = timeoutMs;
+    this.workers = [];
+    this.queue = [];
+  }
+
+  run(job, params = {}, { timeoutMs = this.timeoutMs } = {}) {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ job, params, timeoutMs, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  acquire() {
+    const idle = this.workers.find(w => !w.busy && !w.dead);
+    if (idle) return idle;
+    if (this.workers.length < this.size) {
+      const worker = new PythonWorker((w, startError) => this.remove(w, startError));
+      this.workers.push(worker);
+      return worker;
+    }
+    return null;
+  }
+
+  dispatch() {
+    while (this.queue.length > 0) {
+      const worker = this.acquire();
+      if (!worker) return;
+
+      const task = this.queue.shift();
+      worker.busy = true;
+
+      worker.ready
+        .then(() => worker.send(task.job, task.params, task.timeoutMs))
+        .then(task.resolve, task.reject)
+        .finally(() => {
+          worker.busy = false;
+          this.dispatch();
+        });
+    }
+  }
+
+  remove(worker, startError = null) {
+    this.workers = this.workers.filter(w => w !== worker);
+    if (startError) {
+      // El worker murió sin llegar a arrancar: los siguientes fallarían igual, así que
+      // se rechaza la cola en lugar de relanzar un proceso por cada trabajo
+      for (const task of this.queue.splice(0)) task.reject(startError);
+    }
+    this.dispatch();
+  }
+
+  async health() {
+    const workers = await Promise.all(this.workers.map(async (worker) => {
+      if (worker.dead) {
+        return { pid: worker.process.pid, ok: false, error: 'Worker terminado' };
+      }
+      const uptime = (Date.now() - worker.startedAt) / 1000;
+      if (!worker.started) {
+        // Aún importando fastf1/pandas: se espera como mucho HEALTH_TIMEOUT_MS sin reservarlo
+        let timer;
+        const timeout = new Promise((resolve) => { timer = setTimeout(resolve, HEALTH_TIMEOUT_MS); });
+        await Promise.race([worker.ready.catch(() => {}), timeout]);
+        clearTimeout(timer);
+        if (worker.dead) {
+          return { pid: worker.process.pid, ok: false, error: 'Worker terminado' };
+        }
+        if (!worker.started) {
+          return { pid: worker.process.pid, ok: true, starting: true, uptime };
+        }
+      }
+      if (worker.busy) {
+        return { pid: worker.process.pid, ok: true, busy: true, uptime };
+      }
+      try {
+        worker.busy = true;
+        const info = await worker.send('ping', {}, HEALTH_TIMEOUT_MS);
+        return { ...info, ok: true, busy: false };
+      } catch (err) {
+        return { pid: worker.process.pid, ok: false, error: err.error };
+      } finally {
+        worker.busy = false;
+        this.dispatch();
+      }
+    }));
+
+    return {
+      size: this.size,
+      alive: this.workers.length,
+      queued: this.queue.length,
+      timeoutMs: this.timeoutMs,
+      workers
+    };
+  }
+}
+
+const pool = new PythonWorkerPool();
+export default pool;
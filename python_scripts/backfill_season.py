@@ -0,0 +1,197 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Recarga de una temporada completa (circuitos + carreras) repartiendo las
+# rondas entre un pool de procesos. Cada worker construye los documentos de
+# sus rondas, los acumula y los vuelca en bloque con su propio cliente MongoDB.
+# Con --memory-mode cada ronda suelta sus sesiones al terminar y con
+# --memory-budget-mb no se reparten más lotes mientras el RSS del pool
+# (proceso principal + workers) supere el presupuesto.
+#
+# Uso: python backfill_season.py 2024 --rounds 1-24 --workers 4 --batch-size 4 [--memory-mode --memory-budget-mb 3000]
+
+# Cada cuánto se vuelve a mirar el RSS con lotes retenidos por el presupuesto
+BUDGET_POLL_SECONDS = 1.0
+
+
+def parse_rounds(value):
+    rounds = []
+    for part in value.split(","):
+        if "-" in part:
+            start, end = part.split("-", 1)
+            rounds.extend(range(int(start), int(end) + 1))
+        else:
+            rounds.append(int(part))
+    return sorted(set(rounds))
+
+
+def chunk(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def flush_documents(db, circuits, races, charts):
+    from bulk_writer import BulkWriter
+    from circuit_races_mongodb import queue_gp_documents
+
+    with BulkWriter(db, skip_unchanged=True) as writer:
+        for circuit_data, race_data, chart_data in zip(circuits, races, charts):
+            queue_gp_documents(writer, circuit_data, race_data, chart_data)
+    return writer
+
+
+def backfill_rounds(year, rounds):
+    """
+    Se ejecuta dentro de un worker del pool: procesa un lote de rondas y
+    escribe todos sus documentos con un único bulk_write por colección.
+    """
+    from circuit_races_mongodb import build_gp_documents
+    from memory_budget import PeakTracker
+    from mongo import get_db
+
+    reports = []
+    circuits = []
+    races = []
+    charts = []
+    counts = {"written": 0, "skipped": 0}
+
+    for gp_round in rounds:
+        start = time.perf_counter()
+        tracker = PeakTracker()
+        try:
+            with tracker:
+                documents = build_gp_documents(year, gp_round)
+            if documents is None:
+                raise RuntimeError("Sin datos de evento o calendario")
+            circuit_data, race_data, chart_data = documents
+            circuits.append(circuit_data)
+            races.append(race_data)
+            charts.append(chart_data)
+            reports.append({
+                "round": gp_round,
+                "ok": True,
+                "race": race_data["_id"],
+                "seconds": time.perf_counter() - start,
+                "peak_rss_mb": tracker.peak_mb
+            })
+        except Exception as e:
+            reports.append({
+                "round": gp_round,
+                "ok": False,
+                "error": str(e),
+                "seconds": time.perf_counter() - start,
+                "peak_rss_mb": tracker.peak_mb
+            })
+
+    try:
+        writer = flush_documents(get_db(), circuits, races, charts)
+        counts = {"written": writer.written, "skipped": writer.skipped}
+    except Exception as e:
+        # Si falla el volcado, las rondas del lote no han quedado guardadas
+        for report in reports:
+            if report["ok"]:
+                report["ok"] = False
+                report["error"] = f"Error al escribir en MongoDB: {e}"
+
+    return reports, counts
+
+
+def backfill_season(year, rounds, workers=4, batch_size=1, memory_budget_mb=None):
+    """
+    Reparte las rondas en lotes entre el pool de procesos.
+
+    Parámetros:
+      memory_budget_mb: RSS máximo (MB) del proceso y sus workers antes de
+                        dejar de repartir lotes (None = MEMORY_BUDGET_MB; 0 =
+                        sin límite). Siempre queda al menos un lote en curso.
+
+    Retorna:
+      (reports, counts): informe por ronda y documentos escritos, sin cambios
+      y lotes retrasados por el presupuesto ('throttled').
+    """
+    from memory_budget import MemoryBudget, MEMORY_BUDGET_MB
+
+    budget = MemoryBudget(MEMORY_BUDGET_MB if memory_budget_mb is None else memory_budget_mb,
+                          include_children=True)
+    reports = []
+    counts = {"written": 0, "skipped": 0, "throttled": 0}
+    batches = chunk(rounds, batch_size)
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {}
+        held = False
+        while batches or futures:
+            # Nuevo lote si hay hueco en el pool y la memoria lo permite
+            while batches and len(futures) < workers:
+                if futures and budget.over():
+                    counts["throttled"] += int(not held)
+                    held = True
+                    break
+                held = False
+                batch = batches.pop(0)
+                futures[executor.submit(backfill_rounds, year, batch)] = batch
+                if budget.enabled and len(futures) > 1:
+                    # Con presupuesto se añade un lote por vuelta, para medir el RSS con él ya en marcha
+                    break
+
+            done, _ = wait(futures, timeout=BUDGET_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = futures.pop(future)
+                try:
+                    batch_reports, batch_counts = future.result()
+                    reports.extend(batch_reports)
+                    for key in batch_counts:
+                        counts[key] += batch_counts[key]
+                except Exception as e:
+                    reports.extend({"round": r, "ok": False, "error": str(e), "seconds": 0.0} for r in batch)
+
+    return sorted(reports, key=lambda r: r["round"]), counts
+
+
+def print_report(year, reports, counts, elapsed):
+    print(f"\nBackfill {year}: {len(reports)} rondas en {elapsed:.1f} s "
+          f"(documentos escritos: {counts['written']}, sin cambios: {counts['skipped']}, "
+          f"esperas por memoria: {counts.get('throttled', 0)})\n")
+    print(f"{'Ronda':>5}  {'Estado':<6}  {'Tiempo':>8}  {'Pico RSS':>9}  Detalle")
+    for r in reports:
+        status = "OK" if r["ok"] else "FALLO"
+        detail = r.get("race") if r["ok"] else r.get("error")
+        peak = f"{r['peak_rss_mb']:.0f} MB" if r.get("peak_rss_mb") is not None else "-"
+        print(f"{r['round']:>5}  {status:<6}  {r['seconds']:>7.1f}s  {peak:>9}  {detail}")
+
+    failed = [r["round"] for r in reports if not r["ok"]]
+    if failed:
+        print(f"\nRondas con error: {', '.join(map(str, failed))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recarga circuitos y carreras de una temporada en MongoDB.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("--rounds", default="1-24", help="Rango de rondas, p.ej. 1-24 o 1,3,5-8")
+    parser.add_argument("--workers", type=int, default=4, help="Número de procesos del pool")
+    parser.add_argument("--batch-size", type=int, default=1, help="Rondas por tarea (y por bulk_write)")
+    parser.add_argument("--memory-mode", action="store_true",
+                        help="Tipos compactos y sesiones liberadas al terminar cada ronda")
+    parser.add_argument("--memory-budget-mb", type=float,
+                        help="RSS máximo del pool en MB antes de dejar de repartir lotes")
+    args = parser.parse_args(argv)
+
+    # Los workers (spawn) leen la configuración del entorno al importar memory_budget
+    if args.memory_mode:
+        os.environ["MEMORY_MODE"] = "1"
+    if args.memory_budget_mb is not None:
+        os.environ["MEMORY_BUDGET_MB"] = str(args.memory_budget_mb)
+
+    start = time.perf_counter()
+    reports, counts = backfill_season(args.year, parse_rounds(args.rounds), args.workers, args.batch_size,
+                                      args.memory_budget_mb)
+    print_report(args.year, reports, counts, time.perf_counter() - start)
+    return 0 if all(r["ok"] for r in reports) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
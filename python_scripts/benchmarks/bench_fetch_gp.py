@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+# Mide tiempo total y pico de RSS de build_gp_documents (lo que hace
+# fetch_and_save_gp salvo la escritura) en un proceso limpio por repetición.
+# Ejecutar antes y después de un cambio con la caché de FastF1 ya caliente.
+#
+# Uso: python benchmarks/bench_fetch_gp.py 2025 5 --repeat 3 [--memory-mode]
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import sys, time, json, resource
+start = time.perf_counter()
+from circuit_races_mongodb import build_gp_documents
+build_gp_documents({year}, {gp_round})
+elapsed = time.perf_counter() - start
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sys.__stdout__.write("\\n" + json.dumps({{"seconds": elapsed, "peak_rss_mb": peak_kb / 1024}}) + "\\n")
+"""
+
+
+def run_once(year, gp_round, memory_mode=False):
+    env = {**os.environ, "MEMORY_MODE": "1" if memory_mode else "0"}
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD.format(year=year, gp_round=gp_round)],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True, env=env
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de build_gp_documents (tiempo y pico de RSS).")
+    parser.add_argument("year", type=int)
+    parser.add_argument("round", type=int)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory-mode", action="store_true", help="Ejecuta con MEMORY_MODE=1")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.year, args.round, args.memory_mode) for _ in range(args.repeat)]
+    report = {
+        "year": args.year,
+        "round": args.round,
+        "memory_mode": args.memory_mode,
+        "runs": runs,
+        "best_seconds": min(r["seconds"] for r in runs),
+        "max_peak_rss_mb": max(r["peak_rss_mb"] for r in runs)
+    }
+    print(json.dumps(report, indent=4))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
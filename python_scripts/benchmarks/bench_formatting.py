@@ -0,0 +1,104 @@
+import sys
+import timeit
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from formatting import format_lap_times, format_total_times, format_durations  # noqa: E402
+
+# Micro-benchmark de formatting.py frente a los helpers por fila que sustituye.
+# Además comprueba que la salida es idéntica byte a byte.
+#
+# Uso: python benchmarks/bench_formatting.py --rows 20000
+
+
+# --- Helpers originales (copia literal) ---
+
+def format_total_time(td):
+    total_seconds = td.total_seconds()
+    total_minutes = int(total_seconds // 60)
+    seconds = int(total_seconds % 60)
+    milliseconds = int(round((total_seconds - total_minutes * 60 - seconds) * 1000))
+
+    hours = total_minutes // 60
+    minutes = total_minutes % 60
+
+    if hours > 0:
+        return f"{hours}:{minutes:02d}:{seconds:02d}:{milliseconds:03d}"
+    else:
+        return f"{minutes:02d}:{seconds:02d}:{milliseconds:03d}"
+
+
+def format_time(t):
+    if pd.isna(t):
+        return None
+    total_seconds = t.total_seconds()
+    minutes = int(total_seconds // 60)
+    seconds = total_seconds % 60
+    return f"{minutes}:{seconds:06.3f}"
+
+
+def formatear_duracion(tiempo):
+    if isinstance(tiempo, pd.Timedelta):
+        total_segundos = int(tiempo.total_seconds())
+        milisegundos = int(tiempo.microseconds / 1000)
+        horas = total_segundos // 3600
+        minutos = (total_segundos % 3600) // 60
+        segundos = total_segundos % 60
+        return f"{horas:02}:{minutos:02}:{segundos:02}.{milisegundos:03}"
+    return None
+
+
+def legacy_lap_times(series):
+    return series.dt.total_seconds().apply(lambda x: f"{int(x // 60)}:{x % 60:06.3f}" if pd.notna(x) else None)
+
+
+def legacy_total_times(series):
+    return pd.Series([format_total_time(t) if pd.notna(t) else None for t in series], index=series.index)
+
+
+def legacy_durations(series):
+    return pd.Series([formatear_duracion(t) for t in series], index=series.index)
+
+
+def legacy_q_times(series):
+    return pd.Series([format_time(t) for t in series], index=series.index)
+
+
+def sample(rows, low_ms, high_ms, seed=0):
+    rng = np.random.default_rng(seed)
+    values = pd.Series(pd.to_timedelta(rng.integers(low_ms, high_ms, rows), unit="ms"))
+    values[rng.random(rows) < 0.05] = pd.NaT
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del formateo de tiempos.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    laps = sample(args.rows, 60_000, 130_000)
+    races = sample(args.rows, 3_000, 2 * 3600 * 1000, seed=1)
+
+    cases = [
+        ("vuelta m:ss.fff (práctica)", laps, legacy_lap_times, format_lap_times),
+        ("Q1/Q2/Q3 m:ss.fff", laps, legacy_q_times, format_lap_times),
+        ("total mm:ss:fff", races, legacy_total_times, format_total_times),
+        ("carrera hh:mm:ss.fff", races, legacy_durations, format_durations),
+    ]
+
+    print(f"{'Caso':<28} {'antiguo (ms)':>13} {'nuevo (ms)':>11} {'x':>6}  idéntico")
+    for name, values, legacy, vectorized in cases:
+        identical = legacy(values).tolist() == vectorized(values).tolist()
+        old = min(timeit.repeat(lambda: legacy(values), number=1, repeat=args.repeat)) * 1000
+        new = min(timeit.repeat(lambda: vectorized(values), number=1, repeat=args.repeat)) * 1000
+        print(f"{name:<28} {old:>13.2f} {new:>11.2f} {old / new:>6.1f}  {identical}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import sys
+import json
+import timeit
+import argparse
+from contextlib import nullcontext
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import instrumentation  # noqa: E402
+
+# Coste por llamada de span() y @traced desactivados frente al código sin
+# instrumentar, y con las trazas activadas (sin salida) como referencia.
+#
+# Uso: python benchmarks/bench_instrumentation.py --number 200000
+
+
+def plain(year, round_number):
+    return year + round_number
+
+
+@instrumentation.traced("bench.traced", year="year", round="round_number")
+def decorated(year, round_number):
+    return year + round_number
+
+
+def with_span():
+    with instrumentation.span("bench.span", year=2025, round=1, session="Race"):
+        pass
+
+
+def with_nullcontext():
+    with nullcontext():
+        pass
+
+
+def ns_per_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e9
+
+
+def measure(number):
+    return {
+        "plain_call_ns": round(ns_per_call(lambda: plain(2025, 1), number), 1),
+        "traced_call_ns": round(ns_per_call(lambda: decorated(2025, 1), number), 1),
+        "nullcontext_ns": round(ns_per_call(with_nullcontext, number), 1),
+        "span_ns": round(ns_per_call(with_span, number), 1)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coste de la instrumentación activada y desactivada.")
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    instrumentation.disable()
+    disabled = measure(args.number)
+    instrumentation.configure(output=None)
+    enabled = measure(args.number // 10)
+    instrumentation.disable()
+
+    print(json.dumps({"disabled": disabled, "enabled": enabled}, indent=4))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import shutil
+import tempfile
+import contextlib
+from pathlib import Path
+
+# Benchmark offline del pipeline de ingesta con fines de semana sintéticos
+# (20 pilotos, ~60 vueltas en carrera, formato normal y sprint). Sustituye
+# las llamadas de red de FastF1 por los datos de synthetic.py y MongoDB por
+# la base de datos en memoria de memory_db.py, y mide cada etapa por separado.
+#
+# El informe JSON incluye una huella de la salida de cada etapa, así que al
+# comparar dos commits se ve tanto el cambio de tiempos como si la salida
+# ha cambiado.
+#
+# Uso: python benchmarks/bench_pipeline.py --repeat 5 --output bench.json
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent
+
+WEEKENDS = {
+    "conventional": {"gp_round": 1, "sprint": False, "location": "Monza"},
+    "sprint": {"gp_round": 2, "sprint": True, "location": "Miami"},
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def install_fakes(weekends):
+    """
+    Redirige fastf1.get_event/get_session/get_event_schedule a los fines de
+    semana sintéticos y el cliente de mongo.py a la base de datos en memoria.
+    """
+    import fastf1
+    import mongo
+    from memory_db import MemoryClient
+    from synthetic import SyntheticSchedule
+
+    by_round = {(w.year, w.gp_round): w for w in weekends}
+
+    fastf1.get_event = lambda year, gp_round, **kwargs: by_round[(year, gp_round)].event
+    fastf1.get_session = lambda year, gp_round, name, **kwargs: by_round[(year, gp_round)].session(name)
+    fastf1.get_event_schedule = lambda year, **kwargs: SyntheticSchedule.from_weekends(
+        [w for w in weekends if w.year == year]
+    )
+
+    mongo._client = MemoryClient()
+    mongo._client_pid = os.getpid()
+
+
+def reset_db():
+    import mongo
+    from memory_db import MemoryClient
+
+    mongo._client = MemoryClient()
+    mongo._client_pid = os.getpid()
+    return mongo.get_db()
+
+
+def weekend_stages(weekend):
+    """
+    Etapas del pipeline para un fin de semana, en orden. Cada etapa devuelve
+    la salida sobre la que se calcula la huella.
+    """
+    import session_cache
+    import circuit_races_mongodb as crm
+    from getPracticeResults import process_sessions
+    from get_race_results import get_race_results
+    from get_qualifying_results import get_qualifying_results
+    from formatting import format_lap_times, format_total_times, format_durations
+    from bulk_writer import BulkWriter
+    from standings import rebuild_season
+
+    year, gp_round, event = weekend.year, weekend.gp_round, weekend.event
+    state = {}
+
+    def load_race_session():
+        session_cache.clear()
+        state["race_session"] = crm.load_race_session(event, gp_round)
+        return state["race_session"].total_laps
+
+    def get_fallback_data():
+        state["fallback"] = crm.get_fallback_data(year, gp_round)
+        return state["fallback"]
+
+    def build_circuit_data():
+        state["circuit"] = crm.build_circuit_data(event, state["fallback"], state["race_session"], crm.get_gp_data())
+        return state["circuit"]
+
+    def build_race_data():
+        state["race"] = crm.build_race_data(event, state["fallback"], state["race_session"], state["circuit"])
+        return state["race"]
+
+    def build_race_chart():
+        state["chart"] = crm.build_race_chart(event, state["race"], state["race_session"])
+        return state["chart"]
+
+    def run_process_sessions():
+        session_dir = Path("gp_results") / str(year) / str(gp_round)
+        process_sessions(year, gp_round, force=True)
+        return {p.name: json.loads(p.read_text(encoding="utf-8")) for p in sorted(session_dir.glob("practice_*.json"))}
+
+    def run_qualifying_results():
+        return get_qualifying_results(year, gp_round, force=True)
+
+    def run_race_results():
+        return get_race_results(year, gp_round, force=True)
+
+    def rerun_processed():
+        # Ronda ya registrada como hecha: se sirve desde el registro de trabajos
+        return [get_race_results(year, gp_round), process_sessions(year, gp_round)]
+
+    def formatting():
+        laps = state["race_session"].laps
+        results = state["race_session"].results
+        return [
+            format_lap_times(laps["LapTime"]).tolist(),
+            format_total_times(results["Time"]).tolist(),
+            format_durations(results["Time"]).tolist()
+        ]
+
+    def mongo_write_cold():
+        db = reset_db()
+        with BulkWriter(db, skip_unchanged=True) as writer:
+            crm.queue_gp_documents(writer, state["circuit"], state["race"], state["chart"])
+        state["db"] = db
+        return {"written": writer.written, "skipped": writer.skipped, "totals": writer.totals}
+
+    def mongo_write_unchanged():
+        with BulkWriter(state["db"], skip_unchanged=True) as writer:
+            crm.queue_gp_documents(writer, state["circuit"], state["race"], state["chart"])
+        return {"written": writer.written, "skipped": writer.skipped, "totals": writer.totals}
+
+    def publish_results():
+        # Node guarda 'round' en la carrera; la publicación filtra por él
+        state["db"].races.update_one({"_id": state["race"]["_id"]}, {"$set": {"round": gp_round}})
+        qualifying = get_qualifying_results(year, gp_round, publish=True, write_file=False, force=True)
+        race = get_race_results(year, gp_round, publish=True, write_file=False, force=True)
+        return [qualifying["race"]["sessions"], race["race"]["race_results"]]
+
+    def standings_rebuild():
+        # Clasificación recalculada desde las aportaciones guardadas al publicar
+        documents, _ = rebuild_season(year, db=state["db"])
+        return documents
+
+    return [
+        ("load_race_session", load_race_session),
+        ("get_fallback_data", get_fallback_data),
+        ("build_circuit_data", build_circuit_data),
+        ("build_race_data", build_race_data),
+        ("build_race_chart", build_race_chart),
+        ("process_sessions", run_process_sessions),
+        ("get_qualifying_results", run_qualifying_results),
+        ("get_race_results", run_race_results),
+        ("rerun_processed", rerun_processed),
+        ("formatting", formatting),
+        ("mongo_write_cold", mongo_write_cold),
+        ("mongo_write_unchanged", mongo_write_unchanged),
+        ("publish_results", publish_results),
+        ("standings_rebuild", standings_rebuild),
+    ]
+
+
+def run_weekend(weekend, repeat):
+    from fingerprints import fingerprint
+
+    timings = {}
+    checksums = {}
+    with open(os.devnull, "w") as devnull:
+        for _ in range(repeat):
+            for name, stage in weekend_stages(weekend):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(devnull):
+                    output = stage()
+                timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+                checksums[name] = fingerprint(output)[:16]
+
+    stages = {
+        name: {
+            "median_ms": round(statistics.median(runs), 3),
+            "min_ms": round(min(runs), 3),
+            "max_ms": round(max(runs), 3)
+        }
+        for name, runs in timings.items()
+    }
+    return {
+        "laps": {name: len(weekend.session(name).laps) for name in weekend.session_names},
+        "stages": stages,
+        "total_median_ms": round(sum(s["median_ms"] for s in stages.values()), 3),
+        "checksums": checksums
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline del pipeline con sesiones sintéticas.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--load-latency-ms", type=float, default=0.0,
+                        help="Espera simulada de cada session.load() (E/S de la API o la caché)")
+    parser.add_argument("--output", help="Fichero JSON del informe (por defecto stdout)")
+    args = parser.parse_args(argv)
+    output_path = Path(args.output).resolve() if args.output else None
+
+    sys.path[:0] = [str(SCRIPTS_DIR), str(BENCH_DIR)]
+    workdir = tempfile.mkdtemp(prefix="gridmetrics_bench_")
+    os.environ["LAP_STORE_DIR"] = str(Path(workdir) / "gp_results")
+    os.environ["FASTF1_CACHE_DIR"] = str(Path(workdir) / "fastf1_cache")
+    os.environ["JOB_LEDGER_PATH"] = str(Path(workdir) / "job_ledger.sqlite")
+    os.environ["SINGLE_FLIGHT_LOCK_DIR"] = str(Path(workdir) / "locks")
+    os.chdir(workdir)
+
+    import numpy
+    import pandas
+    import fastf1
+    from synthetic import SyntheticWeekend
+
+    weekends = {
+        label: SyntheticWeekend(year=args.year, seed=args.seed + i, load_latency=args.load_latency_ms / 1000, **config)
+        for i, (label, config) in enumerate(WEEKENDS.items())
+    }
+    install_fakes(list(weekends.values()))
+
+    report = {
+        "meta": {
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "pandas": pandas.__version__,
+            "fastf1": fastf1.__version__,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "load_latency_ms": args.load_latency_ms
+        },
+        "weekends": {label: run_weekend(weekend, args.repeat) for label, weekend in weekends.items()}
+    }
+
+    # gp_results, logs y caché se generan en un directorio temporal
+    os.chdir(SCRIPTS_DIR)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=4)
+    if output_path:
+        output_path.write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+# Mide el arranque en frío de los scripts de entrada: lo que tarda cada uno
+# en responder a --help en un proceso nuevo. Con las importaciones diferidas
+# no debería cargar fastf1, pandas ni abrir MongoDB. Se descuenta el tiempo
+# de arranque del propio intérprete (python -c pass).
+#
+# Uso: python benchmarks/bench_startup.py --repeat 5 --max-ms 150
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+ENTRY_SCRIPTS = ["get_race_main.py", "get_qualifying_main.py", "get_sessions.py"]
+
+# Módulos que no deben aparecer en sys.modules tras un --help
+HEAVY_MODULES = ["fastf1", "pandas", "pymongo"]
+
+CHECK = """
+import sys, runpy, json
+sys.argv = [{script!r}, "--help"]
+try:
+    runpy.run_path({script!r}, run_name="__main__")
+except SystemExit:
+    pass
+sys.stdout.flush()
+sys.__stdout__.write("\\n" + json.dumps([m for m in {heavy} if m in sys.modules]) + "\\n")
+sys.__stdout__.flush()
+"""
+
+
+def wall_ms(command):
+    start = time.perf_counter()
+    subprocess.run(command, cwd=SCRIPTS_DIR, capture_output=True, check=False)
+    return (time.perf_counter() - start) * 1000
+
+
+def heavy_imports(script):
+    proc = subprocess.run(
+        [sys.executable, "-c", CHECK.format(script=script, heavy=json.dumps(HEAVY_MODULES))],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True, check=False
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío de los scripts de entrada.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Umbral (ms sobre el intérprete); si se supera, termina con código 1")
+    args = parser.parse_args(argv)
+
+    baseline = statistics.median(wall_ms([sys.executable, "-c", "pass"]) for _ in range(args.repeat))
+
+    scripts = {}
+    for script in ENTRY_SCRIPTS:
+        runs = [wall_ms([sys.executable, script, "--help"]) for _ in range(args.repeat)]
+        median = statistics.median(runs)
+        scripts[script] = {
+            "median_ms": round(median, 1),
+            "over_interpreter_ms": round(median - baseline, 1),
+            "heavy_imports": heavy_imports(script)
+        }
+
+    report = {"repeat": args.repeat, "interpreter_ms": round(baseline, 1), "scripts": scripts}
+    print(json.dumps(report, indent=4))
+
+    failed = [
+        name for name, r in scripts.items()
+        if r["heavy_imports"] or (args.max_ms is not None and r["over_interpreter_ms"] > args.max_ms)
+    ]
+    if failed:
+        print(f"Regresión de arranque en: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import copy
+from types import SimpleNamespace
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+# Base de datos en memoria con el subconjunto de la API de PyMongo que usan
+# los scripts (bulk_write de UpdateOne, find con $in, find_one_and_update con
+# el operador posicional, update_one condicional con $gt, $unset y
+# delete_one). Sirve para medir el camino de escritura sin un mongod; no
+# pretende ser un MongoDB completo.
+
+
+def _get_path(document, path):
+    values = [document]
+    for part in path.split("."):
+        next_values = []
+        for value in values:
+            if isinstance(value, list):
+                next_values.extend(v.get(part) for v in value if isinstance(v, dict))
+            elif isinstance(value, dict) and part in value:
+                next_values.append(value[part])
+        values = next_values
+    return values
+
+
+def _matches_value(value, condition):
+    if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+        for op, arg in condition.items():
+            if op == "$in" and value not in arg:
+                return False
+            if op == "$gt" and not (value is not None and value > arg):
+                return False
+            if op == "$gte" and not (value is not None and value >= arg):
+                return False
+            if op == "$lte" and not (value is not None and value <= arg):
+                return False
+        return True
+    return value == condition
+
+
+def matches(document, filter):
+    return all(
+        any(_matches_value(v, condition) for v in _get_path(document, path))
+        for path, condition in filter.items()
+    )
+
+
+def _positional_index(document, filter, array_field):
+    # Primer elemento del array que cumple las condiciones 'array.campo' del filtro
+    conditions = {p[len(array_field) + 1:]: c for p, c in filter.items() if p.startswith(array_field + ".")}
+    for i, element in enumerate(document.get(array_field, [])):
+        if matches(element, conditions):
+            return i
+    return None
+
+
+def apply_set(document, fields, filter):
+    for path, value in fields.items():
+        parts = path.split(".")
+        target = document
+        for i, part in enumerate(parts[:-1]):
+            if part == "$":
+                part = _positional_index(document, filter, ".".join(parts[:i]))
+            if isinstance(target, list):
+                target = target[part]
+            else:
+                target = target.setdefault(part, {})
+        target[parts[-1]] = copy.deepcopy(value)
+
+
+def apply_unset(document, fields):
+    for path in fields:
+        parts = path.split(".")
+        target = document
+        for part in parts[:-1]:
+            target = target.get(part, {}) if isinstance(target, dict) else {}
+        if isinstance(target, dict):
+            target.pop(parts[-1], None)
+
+
+class MemoryCollection:
+    def __init__(self):
+        self.documents = {}
+
+    def _find_one(self, filter):
+        if set(filter) == {"_id"} and not isinstance(filter["_id"], dict):
+            return self.documents.get(filter["_id"])
+        return next((d for d in self.documents.values() if matches(d, filter)), None)
+
+    def _update(self, filter, update, upsert):
+        document = self._find_one(filter)
+        inserted = document is None
+        if inserted:
+            if not upsert:
+                return None, False
+            document = {k: v for k, v in filter.items() if not isinstance(v, dict)}
+            if document.get("_id") in self.documents:
+                raise DuplicateKeyError(f"E11000 duplicate key error: _id {document['_id']!r}")
+        before = copy.deepcopy(document)
+        apply_set(document, update.get("$set", {}), filter)
+        apply_unset(document, update.get("$unset", {}))
+        if inserted:
+            self.documents[document["_id"]] = document
+        return document, document != before
+
+    def bulk_write(self, operations, ordered=True):
+        matched = modified = upserted = 0
+        for operation in operations:
+            existed = self._find_one(operation._filter) is not None
+            document, changed = self._update(operation._filter, operation._doc, operation._upsert)
+            if document is None:
+                continue
+            if existed:
+                matched += 1
+                modified += int(changed)
+            else:
+                upserted += 1
+        return SimpleNamespace(matched_count=matched, modified_count=modified, upserted_count=upserted)
+
+    def update_one(self, filter, update, upsert=False):
+        existed = self._find_one(filter) is not None
+        document, changed = self._update(filter, update, upsert)
+        return SimpleNamespace(matched_count=int(existed), modified_count=int(existed and changed),
+                               upserted_id=document["_id"] if document is not None and not existed else None)
+
+    def find(self, filter=None, projection=None):
+        return [copy.deepcopy(d) for d in self.documents.values() if matches(d, filter or {})]
+
+    def find_one(self, filter=None, projection=None):
+        document = self._find_one(filter or {})
+        return copy.deepcopy(document) if document is not None else None
+
+    def find_one_and_update(self, filter, update, return_document=ReturnDocument.BEFORE, upsert=False):
+        before = self.find_one(filter)
+        document, _ = self._update(filter, update, upsert)
+        if return_document == ReturnDocument.AFTER:
+            return copy.deepcopy(document) if document is not None else None
+        return before
+
+    def delete_one(self, filter):
+        document = self._find_one(filter)
+        if document is not None:
+            del self.documents[document["_id"]]
+        return SimpleNamespace(deleted_count=int(document is not None))
+
+    def count_documents(self, filter):
+        return len(self.find(filter))
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, MemoryCollection())
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+class MemoryClient:
+    def __init__(self):
+        self.gridmetrics = MemoryDatabase()
+
+    def __getitem__(self, name):
+        return self.gridmetrics
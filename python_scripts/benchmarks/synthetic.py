@@ -0,0 +1,271 @@
+import time
+import numpy as np
+import pandas as pd
+
+# Fines de semana sintéticos con la forma de los objetos de FastF1 que usan
+# los scripts (Event, Session, results, laps) para medir el pipeline sin red.
+# Los datos son deterministas para una misma semilla.
+
+GRID = [
+    ("NOR", "4", "norris", "McLaren", "mclaren"),
+    ("PIA", "81", "piastri", "McLaren", "mclaren"),
+    ("LEC", "16", "leclerc", "Ferrari", "ferrari"),
+    ("HAM", "44", "hamilton", "Ferrari", "ferrari"),
+    ("VER", "1", "max_verstappen", "Red Bull Racing", "red_bull"),
+    ("TSU", "22", "tsunoda", "Red Bull Racing", "red_bull"),
+    ("RUS", "63", "russell", "Mercedes", "mercedes"),
+    ("ANT", "12", "antonelli", "Mercedes", "mercedes"),
+    ("ALO", "14", "alonso", "Aston Martin", "aston_martin"),
+    ("STR", "18", "stroll", "Aston Martin", "aston_martin"),
+    ("GAS", "10", "gasly", "Alpine", "alpine"),
+    ("COL", "43", "colapinto", "Alpine", "alpine"),
+    ("ALB", "23", "albon", "Williams", "williams"),
+    ("SAI", "55", "sainz", "Williams", "williams"),
+    ("HAD", "6", "hadjar", "Racing Bulls", "rb"),
+    ("LAW", "30", "lawson", "Racing Bulls", "rb"),
+    ("HUL", "27", "hulkenberg", "Kick Sauber", "sauber"),
+    ("BOR", "5", "bortoleto", "Kick Sauber", "sauber"),
+    ("OCO", "31", "ocon", "Haas F1 Team", "haas"),
+    ("BEA", "87", "bearman", "Haas F1 Team", "haas"),
+]
+
+NORMAL_SESSIONS = ["Practice 1", "Practice 2", "Practice 3", "Qualifying", "Race"]
+SPRINT_SESSIONS = ["Practice 1", "Sprint Qualifying", "Sprint", "Qualifying", "Race"]
+
+# Vueltas por sesión (las prácticas y la sprint son más cortas que la carrera)
+SESSION_LAPS = {
+    "Practice 1": 25, "Practice 2": 30, "Practice 3": 20,
+    "Sprint Qualifying": 12, "Qualifying": 15, "Sprint": 19, "Race": 60
+}
+
+RACE_POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+SPRINT_POINTS = [8, 7, 6, 5, 4, 3, 2, 1]
+COMPOUNDS = np.array(["SOFT", "MEDIUM", "HARD"])
+
+
+class SyntheticSession:
+    """
+    Sesión con los atributos de fastf1.core.Session que leen los scripts.
+    Los datos ya están generados; load() solo simula la espera de E/S.
+    """
+
+    def __init__(self, event, name, date, results, laps, load_latency=0.0):
+        self.event = event
+        self.name = name
+        self.date = date
+        self.results = results
+        self.laps = laps
+        self.total_laps = int(laps["LapNumber"].max()) if not laps.empty else None
+        self.load_latency = load_latency
+
+    def load(self, laps=True, telemetry=True, weather=True, messages=True):
+        if self.load_latency:
+            time.sleep(self.load_latency)
+
+
+class SyntheticEvent(pd.Series):
+    """
+    Evento del calendario (una fila de EventSchedule, como en FastF1) que
+    construye sus sesiones a partir de la semilla del fin de semana.
+    """
+
+    _metadata = ["weekend"]
+
+    @property
+    def _constructor(self):
+        return SyntheticEvent
+
+    @property
+    def year(self):
+        return self["EventDate"].year
+
+    def get_session(self, name):
+        return self.weekend.session(name)
+
+
+class SyntheticSchedule(pd.DataFrame):
+    """
+    Calendario de varios fines de semana sintéticos (EventSchedule en FastF1):
+    get_event_by_round devuelve el SyntheticEvent de la ronda.
+    """
+
+    _metadata = ["events"]
+
+    @property
+    def _constructor(self):
+        return SyntheticSchedule
+
+    @classmethod
+    def from_weekends(cls, weekends):
+        schedule = cls(pd.concat([w.schedule for w in weekends], ignore_index=True))
+        schedule.events = {w.gp_round: w.event for w in weekends}
+        return schedule
+
+    def get_event_by_round(self, round):
+        if round not in self.events:
+            raise ValueError(f"Invalid round: {round}")
+        return self.events[round]
+
+
+class SyntheticWeekend:
+    """
+    Fin de semana completo: evento, fila de calendario y las cinco sesiones.
+
+    Parámetros:
+      year, gp_round: Temporada y ronda.
+      sprint: True para formato sprint_qualifying.
+      location: Clave de data.json (Location en FastF1).
+      seed: Semilla de los datos aleatorios.
+      load_latency: Segundos que tarda cada session.load() (API/caché simulada).
+    """
+
+    def __init__(self, year=2025, gp_round=1, sprint=False, location="Monza", seed=0, load_latency=0.0):
+        self.year = year
+        self.gp_round = gp_round
+        self.sprint = sprint
+        self.seed = seed
+        self.load_latency = load_latency
+        self.session_names = SPRINT_SESSIONS if sprint else NORMAL_SESSIONS
+        self.start = pd.Timestamp(f"{year}-01-01") + pd.Timedelta(days=14 * gp_round + 2, hours=11, minutes=30)
+
+        row = {
+            "RoundNumber": gp_round,
+            "Country": "Italy",
+            "Location": location,
+            "OfficialEventName": f"FORMULA 1 SYNTHETIC GRAND PRIX {year}",
+            "EventDate": self.start + pd.Timedelta(days=2),
+            "EventName": f"{location} Grand Prix",
+            "EventFormat": "sprint_qualifying" if sprint else "conventional",
+        }
+        for i, name in enumerate(self.session_names, start=1):
+            date = self.session_date(name)
+            row[f"Session{i}"] = name
+            row[f"Session{i}Date"] = date
+            row[f"Session{i}DateUtc"] = date - pd.Timedelta(hours=2)
+
+        self.event = SyntheticEvent(row, name=gp_round)
+        self.event.weekend = self
+        self.schedule = pd.DataFrame([row])
+        self._sessions = {}
+
+    def session_date(self, name):
+        index = self.session_names.index(name)
+        return self.start + pd.Timedelta(days=index // 2, hours=4 * (index % 2))
+
+    def session(self, name):
+        if name not in self._sessions:
+            seed = self.seed * 100 + self.session_names.index(name)
+            results, laps = build_session_frames(name, self.session_date(name), SESSION_LAPS[name], seed)
+            self._sessions[name] = SyntheticSession(self.event, name, self.session_date(name), results, laps,
+                                                    self.load_latency)
+        return self._sessions[name]
+
+
+def build_session_frames(name, date, n_laps, seed):
+    """
+    Genera (results, laps) con las columnas y tipos de FastF1.
+
+    Retorna:
+      results: Una fila por piloto (Position, Q1-Q3, Time, Points, ...).
+      laps: Una fila por vuelta y piloto (LapTime, sectores, stint, neumático, ...).
+    """
+    rng = np.random.default_rng(seed)
+    n_drivers = len(GRID)
+    abbreviations = np.array([g[0] for g in GRID])
+
+    # Ritmo base por piloto + degradación por vuelta de stint + ruido
+    pace = 80.0 + rng.normal(0, 0.6, n_drivers)
+    lap_numbers = np.tile(np.arange(1, n_laps + 1), n_drivers)
+    driver_idx = np.repeat(np.arange(n_drivers), n_laps)
+    pit_lap = rng.integers(max(2, n_laps // 3), max(3, 2 * n_laps // 3), n_drivers)
+    stint = np.where(lap_numbers > pit_lap[driver_idx], 2, 1)
+    tyre_life = np.where(stint == 1, lap_numbers, lap_numbers - pit_lap[driver_idx])
+    compound = np.where(stint == 1, rng.integers(0, 2, n_drivers)[driver_idx], 2)
+
+    seconds = pace[driver_idx] + 0.05 * tyre_life + rng.normal(0, 0.35, n_drivers * n_laps)
+    seconds = np.where(lap_numbers == 1, seconds + 6.0, seconds)
+    seconds = np.where(lap_numbers == pit_lap[driver_idx], seconds + 20.0, seconds)
+    split = np.array([0.31, 0.37, 0.32])
+    sectors = seconds[:, None] * (split + rng.normal(0, 0.004, (len(seconds), 3)))
+    sectors[:, 2] = seconds - sectors[:, 0] - sectors[:, 1]
+
+    lap_time = pd.to_timedelta(np.round(seconds * 1000), unit="ms")
+    cumulative = pd.Series(seconds).groupby(driver_idx).cumsum().to_numpy()
+    session_time = pd.to_timedelta(np.round((cumulative + 3600) * 1000), unit="ms")
+
+    # Algunas vueltas sin tiempo (borradas o sin cronometrar)
+    missing = rng.random(len(seconds)) < 0.02
+    lap_time = lap_time.where(~missing)
+
+    laps = pd.DataFrame({
+        "Time": session_time,
+        "Driver": abbreviations[driver_idx],
+        "DriverNumber": np.array([g[1] for g in GRID])[driver_idx],
+        "LapTime": lap_time,
+        "LapNumber": lap_numbers.astype(float),
+        "Stint": stint.astype(float),
+        "Sector1Time": pd.to_timedelta(np.round(sectors[:, 0] * 1000), unit="ms"),
+        "Sector2Time": pd.to_timedelta(np.round(sectors[:, 1] * 1000), unit="ms"),
+        "Sector3Time": pd.to_timedelta(np.round(sectors[:, 2] * 1000), unit="ms"),
+        "SpeedST": rng.normal(320, 6, len(seconds)),
+        "Compound": COMPOUNDS[compound],
+        "TyreLife": tyre_life.astype(float),
+        "FreshTyre": stint == 2,
+        "Team": np.array([g[3] for g in GRID])[driver_idx],
+        "LapStartTime": session_time - lap_time.fillna(pd.Timedelta(seconds=80)),
+        "LapStartDate": date + (session_time - pd.Timedelta(hours=1)),
+        "TrackStatus": "1",
+        "Deleted": missing,
+        "IsAccurate": ~missing,
+    })
+
+    # IsPersonalBest como en FastF1: mejor vuelta del piloto hasta ese momento
+    best_so_far = laps["LapTime"].groupby(laps["Driver"]).cummin()
+    previous_best = best_so_far.groupby(laps["Driver"]).shift()
+    laps["IsPersonalBest"] = laps["LapTime"].notna() & (previous_best.isna() | (laps["LapTime"] < previous_best))
+
+    # Posición en pista por tiempo acumulado al final de cada vuelta
+    laps["Position"] = laps.groupby("LapNumber")["Time"].rank(method="first").astype(float)
+
+    best = laps["LapTime"].groupby(laps["Driver"]).min().reindex(abbreviations)
+    order = np.argsort(best.to_numpy(), kind="stable")
+
+    results = pd.DataFrame({
+        "DriverNumber": [GRID[i][1] for i in order],
+        "Abbreviation": abbreviations[order],
+        "DriverId": [GRID[i][2] for i in order],
+        "TeamName": [GRID[i][3] for i in order],
+        "TeamId": [GRID[i][4] for i in order],
+        "FullName": [GRID[i][2].replace("_", " ").title() for i in order],
+        "CountryCode": "",
+    })
+
+    is_practice = name.startswith("Practice")
+    is_race = name in ("Race", "Sprint")
+    positions = np.arange(1, n_drivers + 1, dtype=float)
+    results["Position"] = np.nan if is_practice else positions
+    results["ClassifiedPosition"] = "" if is_practice else positions.astype(int).astype(str)
+    results["GridPosition"] = rng.permutation(positions) if is_race else np.nan
+
+    if name in ("Qualifying", "Sprint Qualifying"):
+        q = best.iloc[order].reset_index(drop=True)
+        results["Q1"] = q + pd.to_timedelta(np.round(rng.uniform(200, 800, n_drivers)), unit="ms")
+        results["Q2"] = (q + pd.to_timedelta(np.round(rng.uniform(0, 400, n_drivers)), unit="ms")).where(positions <= 15)
+        results["Q3"] = q.where(positions <= 10)
+    else:
+        for q in ("Q1", "Q2", "Q3"):
+            results[q] = pd.Series(pd.NaT, index=results.index, dtype="timedelta64[ns]")
+
+    if is_race:
+        total = laps.groupby("Driver")["Time"].max().reindex(abbreviations[order]).reset_index(drop=True)
+        total = total - pd.Timedelta(hours=1)
+        results["Time"] = total.where(positions == 1, total - total.iloc[0])
+        points = RACE_POINTS if name == "Race" else SPRINT_POINTS
+        results["Points"] = [float(points[i]) if i < len(points) else 0.0 for i in range(n_drivers)]
+        results["Status"] = "Finished"
+    else:
+        results["Time"] = pd.Series(pd.NaT, index=results.index, dtype="timedelta64[ns]")
+        results["Points"] = np.nan
+        results["Status"] = ""
+
+    return results, laps.sort_values(["Driver", "LapNumber"]).reset_index(drop=True)
@@ -0,0 +1,121 @@
+import os
+import logging
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from fingerprints import FINGERPRINT_FIELD, fingerprint, load_fingerprints
+from instrumentation import span, count
+
+DEFAULT_BATCH_SIZE = int(os.getenv("MONGO_BULK_BATCH_SIZE", "500"))
+
+
+class BulkWriter:
+    """
+    Acumula upserts por colección y los envía con bulk_write desordenado
+    cada batch_size operaciones (y al llamar a flush o salir del with).
+
+    Funciona con cualquier objeto base de datos compatible con PyMongo
+    (un mongod local o la base de datos en memoria de benchmarks/memory_db.py
+    en las pruebas).
+
+    Con skip_unchanged=True cada operación sobre un _id lleva la huella de
+    su contenido, que se guarda en el propio documento ('_fp'); si coincide
+    con la de la última escritura, la operación se descarta sin tocar la
+    colección. Un documento borrado o sin huella se vuelve a escribir.
+
+    Uso:
+      with BulkWriter(db) as writer:
+          writer.upsert("drivers", "driver_norris", {...})
+      print(writer.totals)
+    """
+
+    def __init__(self, db, batch_size=DEFAULT_BATCH_SIZE, skip_unchanged=False):
+        self.db = db
+        self.batch_size = batch_size
+        self.skip_unchanged = skip_unchanged
+        self.pending = {}
+        self.totals = {"matched": 0, "modified": 0, "upserted": 0}
+        self.by_collection = {}
+        self.written = 0
+        self.skipped = 0
+
+    def upsert(self, collection_name, document_id, fields, upsert=True):
+        self.update(collection_name, {"_id": document_id}, {"$set": fields}, upsert=upsert)
+
+    def update(self, collection_name, filter, update, upsert=False):
+        """
+        Encola una operación. Solo las que filtran por un _id concreto se
+        pueden omitir si no cambian; el resto se escribe siempre.
+        """
+        digest = None
+        if self.skip_unchanged and "_id" in filter and not isinstance(filter["_id"], dict):
+            digest = fingerprint(update)
+            update = {**update, "$set": {**update.get("$set", {}), FINGERPRINT_FIELD: digest}}
+        operations = self.pending.setdefault(collection_name, [])
+        operations.append((UpdateOne(filter, update, upsert=upsert), filter.get("_id"), digest))
+        if len(operations) >= self.batch_size:
+            self._flush_collection(collection_name)
+
+    def flush(self):
+        for collection_name in list(self.pending):
+            self._flush_collection(collection_name)
+        if self.skip_unchanged:
+            logging.info(f"Escrituras: {self.written}, omitidas sin cambios: {self.skipped}")
+        return self.totals
+
+    def _flush_collection(self, collection_name):
+        pending = self.pending.pop(collection_name, [])
+        if not pending:
+            return
+
+        with span("db.bulk_write", collection=collection_name, queued=len(pending)) as s:
+            written = self._write_pending(collection_name, pending)
+            s.set(written=written, skipped=len(pending) - written)
+        count("db.documents_written", written, collection=collection_name)
+        count("db.documents_skipped", len(pending) - written, collection=collection_name)
+
+    def _write_pending(self, collection_name, pending):
+        if self.skip_unchanged:
+            stored = load_fingerprints(self.db[collection_name], {key for _, key, digest in pending if digest})
+            changed = [p for p in pending if p[2] is None or stored.get(p[1]) != p[2]]
+            self.skipped += len(pending) - len(changed)
+            pending = changed
+            if not pending:
+                return 0
+
+        operations = [operation for operation, _, _ in pending]
+        self.written += len(operations)
+
+        try:
+            result = self.db[collection_name].bulk_write(operations, ordered=False)
+            counts = {
+                "matched": result.matched_count,
+                "modified": result.modified_count,
+                "upserted": result.upserted_count
+            }
+        except BulkWriteError as e:
+            # Con ordered=False el resto de operaciones sí se ha aplicado
+            details = e.details
+            counts = {
+                "matched": details.get("nMatched", 0),
+                "modified": details.get("nModified", 0),
+                "upserted": details.get("nUpserted", 0)
+            }
+            self._add_counts(collection_name, counts)
+            raise
+
+        self._add_counts(collection_name, counts)
+        return len(operations)
+
+    def _add_counts(self, collection_name, counts):
+        collection_totals = self.by_collection.setdefault(collection_name, {"matched": 0, "modified": 0, "upserted": 0})
+        for key, value in counts.items():
+            self.totals[key] += value
+            collection_totals[key] += value
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
@@ -0,0 +1,253 @@
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+# Configuración única de la caché de FastF1.
+#
+# - Ruta absoluta: FASTF1_CACHE_DIR o <raíz del repositorio>/fastf1_cache,
+#   independiente del directorio desde el que se lance el proceso (Node, cron
+#   o a mano comparten la misma caché).
+# - Presupuesto en bytes (FASTF1_CACHE_MAX_MB, 0 = sin límite): al habilitar
+#   la caché se borran las sesiones usadas hace más tiempo hasta quedar por
+#   debajo. FastF1 guarda cada sesión en <año>/<evento>/<sesión>/; la caché
+#   HTTP (fastf1_http_cache.sqlite) cuenta para el total pero no se recorta.
+# - prewarm: descarga el calendario y las sesiones ya disputadas de una
+#   temporada para que los trabajos del scheduler encuentren la caché caliente.
+#
+# Uso: python cache_config.py prewarm 2025 [--rounds 1-5] [--profile laps]
+#      python cache_config.py stats
+#      python cache_config.py evict [--max-mb 2048]
+
+CACHE_DIR = Path(os.getenv("FASTF1_CACHE_DIR", Path(__file__).resolve().parent.parent / "fastf1_cache")).resolve()
+CACHE_MAX_BYTES = int(float(os.getenv("FASTF1_CACHE_MAX_MB", "4096")) * 1024 * 1024)
+
+# Una sesión terminada (y publicada por la API) unas horas después de su inicio
+SESSION_READY_AFTER = timedelta(hours=4)
+
+_enabled_dir = None
+
+
+def get_cache_dir():
+    return CACHE_DIR
+
+
+def enable_cache():
+    global _enabled_dir
+
+    if _enabled_dir is None:
+        import fastf1
+
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)  # Crear carpeta si no existe
+        fastf1.Cache.enable_cache(str(CACHE_DIR))  # Habilitar caché
+        _enabled_dir = CACHE_DIR
+        try:
+            evict()
+        except OSError as e:
+            logging.warning(f"No se pudo recortar la caché de FastF1: {e}")
+    return _enabled_dir
+
+
+def mark_used(session):
+    """
+    Actualiza la fecha de uso de la carpeta de una sesión cargada, que es la
+    que ordena la expulsión LRU (el atime de los ficheros no es fiable).
+    """
+    api_path = getattr(session, "api_path", None)
+    if _enabled_dir is None or not api_path:
+        return
+    session_dir = CACHE_DIR / api_path.replace("/static/", "", 1)
+    if session_dir.is_dir():
+        os.utime(session_dir)
+
+
+def _dir_size(path):
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def cache_entries(cache_dir=None):
+    """
+    Sesiones presentes en la caché.
+
+    Retorna:
+      Lista de dicts {path, year, event, session, bytes, last_used} ordenada
+      de la menos a la más recientemente usada.
+    """
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    entries = []
+    for year_dir in cache_dir.iterdir() if cache_dir.is_dir() else []:
+        if not (year_dir.is_dir() and year_dir.name.isdigit()):
+            continue
+        for event_dir in filter(Path.is_dir, year_dir.iterdir()):
+            for session_dir in filter(Path.is_dir, event_dir.iterdir()):
+                files = [f for f in session_dir.rglob("*") if f.is_file()]
+                entries.append({
+                    "path": session_dir,
+                    "year": int(year_dir.name),
+                    "event": event_dir.name,
+                    "session": session_dir.name,
+                    "bytes": sum(f.stat().st_size for f in files),
+                    "last_used": max([session_dir.stat().st_mtime] + [f.stat().st_mtime for f in files])
+                })
+    return sorted(entries, key=lambda e: e["last_used"])
+
+
+def cache_size(cache_dir=None):
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    return _dir_size(cache_dir) if cache_dir.is_dir() else 0
+
+
+def evict(max_bytes=None, cache_dir=None):
+    """
+    Borra sesiones por orden LRU hasta que la caché ocupe como mucho max_bytes.
+
+    Retorna:
+      Lista de las entradas borradas.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    if max_bytes <= 0 or not cache_dir.is_dir():
+        return []
+
+    total = cache_size(cache_dir)
+    evicted = []
+    for entry in cache_entries(cache_dir):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry["path"], ignore_errors=True)
+        total -= entry["bytes"]
+        evicted.append(entry)
+
+        # Carpetas de evento/año que se quedan vacías
+        for parent in (entry["path"].parent, entry["path"].parent.parent):
+            if parent.is_dir() and not any(parent.iterdir()):
+                parent.rmdir()
+
+    if evicted:
+        logging.info(f"Caché de FastF1: {len(evicted)} sesiones expulsadas, {total / 2**20:.1f} MB en uso")
+    if total > max_bytes:
+        logging.warning(f"La caché de FastF1 ({total / 2**20:.1f} MB) sigue por encima del límite; "
+                        f"la caché HTTP no se recorta")
+    return evicted
+
+
+def finished_sessions(schedule, now=None):
+    """
+    Sesiones ya disputadas de un calendario de FastF1.
+
+    Retorna:
+      Lista de (ronda, nombre de sesión) en orden cronológico.
+    """
+    import pandas as pd
+
+    now = now or datetime.now(timezone.utc)
+    sessions = []
+    for _, event in schedule.iterrows():
+        if event["RoundNumber"] == 0:  # Test de pretemporada
+            continue
+        for i in range(1, 6):
+            name = event.get(f"Session{i}")
+            date_utc = event.get(f"Session{i}DateUtc")
+            if not name or pd.isna(date_utc):
+                continue
+            start = pd.Timestamp(date_utc)
+            if start.tzinfo is None:
+                start = start.tz_localize("UTC")
+            if start + SESSION_READY_AFTER <= now:
+                sessions.append((int(event["RoundNumber"]), name))
+    return sessions
+
+
+def prewarm(year, rounds=None, profile="laps"):
+    """
+    Carga en la caché el calendario y las sesiones terminadas de una temporada.
+
+    Parámetros:
+      rounds: Rondas a precargar (None = todas).
+      profile: Perfil de session_cache.LOAD_PROFILES con los datos a descargar.
+
+    Retorna:
+      Dict con las sesiones cargadas, las que fallaron y lo expulsado después.
+    """
+    import fastf1
+    from session_cache import LOAD_PROFILES
+    from schedule_index import get_schedule
+
+    enable_cache()
+    schedule = get_schedule(year).schedule
+
+    report = {"loaded": [], "failed": []}
+    for gp_round, name in finished_sessions(schedule):
+        if rounds and gp_round not in rounds:
+            continue
+        start = time.perf_counter()
+        try:
+            session = fastf1.get_session(year, gp_round, name)
+            session.load(**LOAD_PROFILES[profile])
+            mark_used(session)
+            report["loaded"].append({"round": gp_round, "session": name,
+                                     "seconds": round(time.perf_counter() - start, 1)})
+        except Exception as e:
+            report["failed"].append({"round": gp_round, "session": name, "error": str(e)})
+
+    report["evicted"] = len(evict())
+    report["cache_mb"] = round(cache_size() / 2**20, 1)
+    return report
+
+
+def print_stats():
+    entries = cache_entries()
+    print(f"Caché de FastF1: {CACHE_DIR}")
+    print(f"Tamaño: {cache_size() / 2**20:.1f} MB (límite {CACHE_MAX_BYTES / 2**20:.0f} MB), "
+          f"{len(entries)} sesiones\n")
+    for entry in reversed(entries):
+        used = datetime.fromtimestamp(entry["last_used"]).strftime("%Y-%m-%d %H:%M")
+        print(f"{entry['bytes'] / 2**20:>8.1f} MB  {used}  {entry['year']}/{entry['event']}/{entry['session']}")
+
+
+def main(argv=None):
+    from backfill_season import parse_rounds
+
+    parser = argparse.ArgumentParser(description="Gestión de la caché compartida de FastF1.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prewarm_parser = commands.add_parser("prewarm", help="Precarga las sesiones disputadas de una temporada")
+    prewarm_parser.add_argument("year", type=int)
+    prewarm_parser.add_argument("--rounds", help="Rango de rondas, p.ej. 1-24 o 1,3,5-8")
+    prewarm_parser.add_argument("--profile", default="laps", help="Perfil de carga (results, laps, telemetry, full)")
+
+    commands.add_parser("stats", help="Muestra el tamaño y las sesiones de la caché")
+
+    evict_parser = commands.add_parser("evict", help="Recorta la caché al límite configurado")
+    evict_parser.add_argument("--max-mb", type=float, help="Límite en MB (por defecto FASTF1_CACHE_MAX_MB)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "prewarm":
+        rounds = parse_rounds(args.rounds) if args.rounds else None
+        report = prewarm(args.year, rounds, args.profile)
+        for r in report["loaded"]:
+            print(f"OK     Ronda {r['round']:>2}  {r['session']:<18} {r['seconds']:>6.1f}s")
+        for r in report["failed"]:
+            print(f"FALLO  Ronda {r['round']:>2}  {r['session']:<18} {r['error']}")
+        print(f"\nSesiones precargadas: {len(report['loaded'])}, con error: {len(report['failed'])}, "
+              f"expulsadas: {report['evicted']}, caché: {report['cache_mb']} MB")
+        return 0 if not report["failed"] else 1
+
+    if args.command == "stats":
+        print_stats()
+        return 0
+
+    max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+    evicted = evict(max_bytes)
+    print(f"Sesiones expulsadas: {len(evicted)}, caché: {cache_size() / 2**20:.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
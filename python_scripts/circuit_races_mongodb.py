@@ -1,45 +1,33 @@
-import os
-import fastf1
 from fastf1.core import DataNotLoadedError
-import pandas as pd
-from dotenv import load_dotenv
-from pymongo import MongoClient
+import numpy as np
 from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
 import json
+from session_cache import load_session, load_sessions, release, results_profile
+from formatting import format_total_times
+from stints import stint_summary
+from race_charts import CHARTS_COLLECTION, build_chart_document
+from lap_records import record_from_laps, offer_record
+import memory_budget
+from bulk_writer import BulkWriter
+from cache_config import enable_cache
+from mongo import get_db
+import schedule_index
+from instrumentation import span, traced
 
-load_dotenv()
-mongo_uri = os.getenv("MONGO_URI")
+DATA_PATH = Path(__file__).resolve().parent / 'data.json'
 
-with open('data.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
-
-# --- Configuración de Caché ---
-cache_dir = os.path.join(os.getcwd(), 'fastf1_cache')  # Ruta absoluta
-os.makedirs(cache_dir, exist_ok=True)  # Crear carpeta si no existe
-fastf1.Cache.enable_cache(cache_dir)  # Habilitar caché
-
-client = MongoClient(mongo_uri)  # Conectar a MongoDB
-db = client.gridmetrics  # Nombre de la base de datos
-
-# Función auxiliar para formatear timedelta al formato mm:ss:fff
-def format_total_time(td: timedelta) -> str:
-    total_seconds = td.total_seconds()
-    total_minutes = int(total_seconds // 60)
-    seconds = int(total_seconds % 60)
-    milliseconds = int(round((total_seconds - total_minutes * 60 - seconds) * 1000))
-    
-    hours = total_minutes // 60
-    minutes = total_minutes % 60
-    
-    if hours > 0:
-        return f"{hours}:{minutes:02d}:{seconds:02d}:{milliseconds:03d}"
-    else:
-        return f"{minutes:02d}:{seconds:02d}:{milliseconds:03d}"
+# Índice de data.json: se lee la primera vez que se usa, no al importar
+@lru_cache(maxsize=1)
+def get_gp_data():
+    with open(DATA_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 def load_race_session(event, gp_round):
     try:
-        race_session = event.get_session("Race")
-        race_session.load(laps=True)
+        # Las vueltas se necesitan para la vuelta rápida; telemetría y meteorología no
+        race_session = load_session(event.year, event.RoundNumber, "Race", profile="laps", event=event)
     except Exception as e:
         print(f"Error al cargar la sesión Race: {e}")
         return None
@@ -79,59 +67,11 @@ def load_race_session(event, gp_round):
     return race_session
 
 def get_fallback_data(year, gp_round):
-    schedule = fastf1.get_event_schedule(year)
-    schedule_event = schedule[schedule["RoundNumber"] == gp_round]
-    if schedule_event.empty:
+    # Datos del calendario ya indexados por ronda (una carga por temporada y proceso)
+    fallback_data = schedule_index.get_fallback_data(year, gp_round)
+    if fallback_data is None:
         print(f"No se encontró el GP para la ronda {gp_round} en el calendario.")
-        return None
-    schedule_event = schedule_event.iloc[0]
-    
-    # Formatear la fecha del evento principal (EventDate)
-    fallback_date = pd.to_datetime(schedule_event["EventDate"]).date().strftime("%Y-%m-%d")
-    fallback_official_name = schedule_event["OfficialEventName"]
-    fallback_event_name = schedule_event["EventName"]
-    fallback_location = schedule_event["Location"]
-    fallback_country = schedule_event["Country"]
-    fallback_event_format = schedule_event["EventFormat"]
-    
-    # Extraer las sesiones del evento: Se asume que hay hasta 5 sesiones, según la estructura del calendario.
-    sessions = []
-    for i in range(1, 6):  
-        session_key = f"Session{i}"
-        session_date_key = f"Session{i}Date"
-        session_dateutc_key = f"Session{i}DateUtc"
-        
-        session_name = schedule_event.get(session_key)
-        session_date = schedule_event.get(session_date_key)
-        session_date_utc = schedule_event.get(session_dateutc_key)
-        
-        # Si la sesión está definida (no es un valor vacío o nulo), se agrega a la lista.
-        if session_name and pd.notnull(session_name):
-            # Se formatea la fecha si es posible.
-            if hasattr(session_date, "strftime"):
-                session_date_str = session_date.strftime("%Y-%m-%d %H:%M:%S")
-            else:
-                session_date_str = str(session_date)
-            if hasattr(session_date_utc, "strftime"):
-                session_date_utc_str = session_date_utc.strftime("%Y-%m-%d %H:%M:%S")
-            else:
-                session_date_utc_str = str(session_date_utc)
-                
-            sessions.append({
-                "name": session_name,
-                "date_local": session_date_str,
-                "date_utc": session_date_utc_str
-            })
-    
-    return {
-        "date": fallback_date,
-        "official_name": fallback_official_name,
-        "name": fallback_event_name,
-        "location": fallback_location,
-        "country": fallback_country,
-        "format": fallback_event_format,
-        "sessions": sessions
-    }
+    return fallback_data
 
 def build_circuit_data(event, fallback_data, race_session, data):
     # Usamos datos del evento si hay sesión válida; si no, usamos los fallback
@@ -141,18 +81,12 @@ def build_circuit_data(event, fallback_data, race_session, data):
             number_of_laps = race_session.total_laps
         except Exception as e:
             print(f"Error al obtener total_laps: {e}")
-        try:
-            fastest_lap = race_session.laps.pick_fastest()
-        except Exception as e:
-            print(f"No se pudo obtener la vuelta más rápida: {e}")
-            fastest_lap = pd.DataFrame()
         event_name = event.EventName
         official_event_name = event.OfficialEventName
         country_name = event.Country
         location_key = event.Location
     else:
         number_of_laps = None
-        fastest_lap = pd.DataFrame()
         event_name = fallback_data["name"]
         official_event_name = fallback_data["official_name"]
         country_name = fallback_data["country"]
@@ -176,12 +110,8 @@ def build_circuit_data(event, fallback_data, race_session, data):
         },
         "number_of_laps": number_of_laps,
         "length": None,
-        "race_distance": None,
-        "lap_record": {
-            "time": format_total_time(fastest_lap['LapTime']) if not fastest_lap.empty else "N/A",
-            "driver": fastest_lap['DriverNumber'] if not fastest_lap.empty else "N/A",
-            "year": event.year if hasattr(event, "year") else None
-        } if not fastest_lap.empty else {"time": "N/A", "driver": "N/A", "year": event.year if hasattr(event, "year") else None}
+        "race_distance": None
+        # lap_record no se escribe aquí: lo mantiene lap_records.py con el récord histórico
     }
     return circuit_data
 
@@ -211,11 +141,18 @@ def build_race_data(event, fallback_data, race_session, circuit_data):
         else:
             session_names = ["Practice 1", "Practice 2", "Practice 3", "Qualifying", "Race"]
 
-        for name in session_names:
+        # Solo se usan los resultados (las clasificaciones con vueltas, ver results_profile);
+        # "Race" ya está cargada (race_session) y no se pide de nuevo.
+        # Las sesiones se cargan en paralelo y se procesan en el orden del fin de semana.
+        requests = [(name, results_profile(name)) for name in session_names if name != "Race"]
+        loaded = load_sessions(event.year, event.RoundNumber, requests, event=event)
+        loaded.append(("Race", race_session, None))
+
+        for name, s, load_error in loaded:
             try:
-                s = event.get_session(name)
-                s.load()
-                
+                if load_error is not None:
+                    raise load_error
+
                 start_time_obj = s.date
                 end_time_obj = (s.date + s.session_duration) if hasattr(s, "session_duration") and s.session_duration else s.date + timedelta(hours=1)
 
@@ -229,22 +166,23 @@ def build_race_data(event, fallback_data, race_session, circuit_data):
                 
                 session_results = []
                 if s.results is not None and not s.results.empty:
-                    for i, (_, driver) in enumerate(s.results.iterrows(), start=1):
-                        pos_value = driver.get('Position')
-                        if pd.isna(pos_value):
-                            pos_value = i
-                        else:
-                            pos_value = int(pos_value)
-                        
-                        t = driver.get('Time')
-                        total_time_str = format_total_time(t) if pd.notna(t) else None
-                        
-                        session_results.append({
-                            "driver": driver.get('DriverId', None),
+                    results = s.results
+                    # Sin posición oficial (prácticas) se usa el orden de la tabla
+                    positions = results['Position'].to_numpy(dtype=float)
+                    positions = np.where(np.isnan(positions), np.arange(1, len(results) + 1), positions).astype(int)
+                    total_times = format_total_times(results['Time'])
+
+                    session_results = [
+                        {
+                            "driver": driver_id,
                             "position": pos_value,
                             "total_time": total_time_str
-                        })
-                    
+                        }
+                        for driver_id, pos_value, total_time_str in zip(
+                            results['DriverId'].tolist(), positions.tolist(), total_times.tolist()
+                        )
+                    ]
+
                     top_3 = sorted(session_results, key=lambda d: d["position"])[:3]
                     session_info["session_result"] = {
                         "first": top_3[0],
@@ -262,6 +200,19 @@ def build_race_data(event, fallback_data, race_session, circuit_data):
             except Exception as e:
                 print(f"Error al procesar la sesión '{name}': {e}")
                 continue
+
+        # Stints de carrera (compuesto, ritmo medio y degradación) con las vueltas ya cargadas
+        try:
+            race_data["stints"] = stint_summary(race_session.laps, race_session.results)
+        except Exception as e:
+            print(f"Error al calcular los stints de carrera: {e}")
+
+        # Vuelta rápida de la carrera; se propone como récord del circuito al guardarla
+        try:
+            race_data["fastest_lap"] = record_from_laps(race_session.laps, race_session.results,
+                                                        event.year, event.RoundNumber)
+        except Exception as e:
+            print(f"No se pudo obtener la vuelta más rápida: {e}")
     else:
         # Si no hay datos de sesión, guardamos una sesión mínima
         for fallback_session in fallback_data.get("sessions", []):
@@ -287,25 +238,82 @@ def build_race_data(event, fallback_data, race_session, circuit_data):
     
     return race_data
 
-def fetch_and_save_gp(year: int, gp_round):
+def build_race_chart(event, race_data, race_session):
+    # Posiciones y diferencias con el líder vuelta a vuelta (colección aparte, mismo _id que la carrera)
+    if race_session is None:
+        return None
+    try:
+        return build_chart_document(race_data["_id"], event.year, event.RoundNumber,
+                                    race_session.laps, race_session.results)
+    except Exception as e:
+        print(f"Error al calcular el gráfico de posiciones: {e}")
+        return None
+
+@traced("gp.build", year="year", round="gp_round")
+def build_gp_documents(year: int, gp_round):
+    """
+    Construye los documentos de circuito y carrera de una ronda sin escribir en MongoDB.
+
+    Retorna:
+      (circuit_data, race_data, chart_data) o None si no se pudo obtener el
+      evento; chart_data es None si la carrera aún no tiene vueltas.
+    """
+    enable_cache()
     try:
-        event = fastf1.get_event(2025, gp_round)
+        event = schedule_index.get_event(year, gp_round)
     except Exception as e:
         print(f"Error al obtener el evento para la ronda {gp_round}: {e}")
-        return
+        return None
 
     # Intenta cargar la sesión "Race" y valida si tiene datos reales
     race_session = load_race_session(event, gp_round)
+    if memory_budget.MEMORY_MODE and race_session is not None:
+        # Solo las columnas que usan los documentos, con tipos compactos; la sesión completa se suelta ya
+        race_session = memory_budget.CompactSession(race_session)
+        release(year, gp_round, "Race")
     fallback_data = get_fallback_data(year, gp_round)
     if fallback_data is None:
+        return None
+
+    # Procesa la información del circuito y de la carrera
+    with span("transform.circuit", year=year, round=gp_round):
+        circuit_data = build_circuit_data(event, fallback_data, race_session, get_gp_data())
+    with span("transform.race", year=year, round=gp_round):
+        race_data = build_race_data(event, fallback_data, race_session, circuit_data)
+    with span("transform.race_chart", year=year, round=gp_round):
+        chart_data = build_race_chart(event, race_data, race_session)
+
+    if memory_budget.MEMORY_MODE:
+        # Documentos construidos: las sesiones de la ronda ya no se necesitan
+        memory_budget.release_round(year, gp_round)
+    return circuit_data, race_data, chart_data
+
+def queue_gp_documents(writer, circuit_data, race_data, chart_data=None):
+    writer.upsert("circuit", circuit_data["_id"], circuit_data)
+    writer.upsert("races", race_data["_id"], race_data)
+    if chart_data is not None:
+        writer.upsert(CHARTS_COLLECTION, chart_data["_id"], chart_data)
+    # Récord del circuito: una escritura condicional, solo si la vuelta rápida lo mejora
+    if race_data.get("fastest_lap"):
+        if offer_record(circuit_data["_id"], race_data["fastest_lap"], writer.db):
+            print(f"Nuevo récord de vuelta en {circuit_data['_id']}: {race_data['fastest_lap']['time']}")
+
+def fetch_and_save_gp(year: int, gp_round, writer=None):
+    # Con un writer compartido (p.ej. al sembrar una temporada) la escritura se agrupa con el resto
+    documents = build_gp_documents(year, gp_round)
+    if documents is None:
         return
+    circuit_data, race_data, chart_data = documents
 
-    # Procesa la información del circuito
-    circuit_data = build_circuit_data(event, fallback_data, race_session, data)
-    db.circuit.update_one({"_id": circuit_data["_id"]}, {"$set": circuit_data}, upsert=True)
-    
-    # Procesa la información de la carrera
-    race_data = build_race_data(event, fallback_data, race_session, circuit_data)
-    db.races.update_one({"_id": race_data["_id"]}, {"$set": race_data}, upsert=True)
+    if writer is not None:
+        queue_gp_documents(writer, circuit_data, race_data, chart_data)
+        return
+
+    # Si el GP no ha cambiado desde la última ejecución no se reescribe nada
+    with span("db.write", year=year, round=gp_round):
+        with BulkWriter(get_db(), skip_unchanged=True) as own_writer:
+            queue_gp_documents(own_writer, circuit_data, race_data, chart_data)
+
+    print(f"Escrituras: {own_writer.written}, omitidas sin cambios: {own_writer.skipped}")
 
     print(f"\n\nDatos del GP {race_data['name']} ({year}) actualizados en MongoDB!\n\n")
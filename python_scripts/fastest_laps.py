@@ -0,0 +1,49 @@
+from formatting import format_lap_times
+
+# Selección vectorizada de vueltas rápidas sobre el DataFrame de vueltas de
+# FastF1, sin crear un objeto Laps ni ejecutar Python por piloto.
+
+
+def fastest_laps_per_driver(laps, only_by_time=False):
+    """
+    Vuelta más rápida de cada piloto, ordenadas de más rápida a más lenta.
+
+    Aplica el mismo filtro que Laps.pick_fastest: solo cuentan las vueltas
+    marcadas como IsPersonalBest (las vueltas borradas o no válidas nunca lo
+    están) salvo que only_by_time sea True.
+    """
+    valid = laps['LapTime'].notna()
+    if not only_by_time:
+        valid &= laps['IsPersonalBest'] == True  # noqa: E712
+
+    # Orden estable: en caso de empate gana la primera vuelta cronometrada (como idxmin)
+    return (
+        laps.loc[valid]
+        .sort_values('LapTime', kind='stable')
+        .drop_duplicates('Driver', keep='first')
+    )
+
+
+def fastest_lap(laps, only_by_time=False):
+    # Vuelta más rápida de la sesión o None si no hay ninguna válida
+    fastest = fastest_laps_per_driver(laps, only_by_time)
+    if fastest.empty:
+        return None
+    return fastest.iloc[0]
+
+
+def practice_classification(laps, driver_ids):
+    """
+    Clasificación por vuelta más rápida con las columnas Position, Driver,
+    FormattedTime, Team y Compound.
+
+    Parámetros:
+      laps: DataFrame de vueltas de la sesión.
+      driver_ids: Diccionario abreviatura -> id del piloto.
+    """
+    fastest = fastest_laps_per_driver(laps)[['Driver', 'LapTime', 'Team', 'Compound']].copy()
+
+    fastest['FormattedTime'] = format_lap_times(fastest['LapTime'])
+    fastest['Position'] = range(1, len(fastest) + 1)
+    fastest['Driver'] = fastest['Driver'].map(driver_ids)
+    return fastest[['Position', 'Driver', 'FormattedTime', 'Team', 'Compound']]
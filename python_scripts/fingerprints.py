@@ -0,0 +1,32 @@
+import json
+import hashlib
+
+# Huella estable de un documento: SHA-256 sobre su serialización canónica
+# (claves ordenadas, sin espacios). BulkWriter la guarda en el propio
+# documento (campo '_fp') para saber si un documento reconstruido ha cambiado
+# desde la última escritura. Al estar en el documento, borrarlo borra también
+# su huella; quien lo modifique fuera de BulkWriter debe quitarla con
+# invalidate() para que la siguiente reconstrucción se escriba.
+
+FINGERPRINT_FIELD = "_fp"
+
+
+def canonical_json(document):
+    return json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def fingerprint(document):
+    return hashlib.sha256(canonical_json(document).encode("utf-8")).hexdigest()
+
+
+def load_fingerprints(collection, document_ids):
+    # Una sola consulta para todos los documentos de un lote
+    if not document_ids:
+        return {}
+    cursor = collection.find({"_id": {"$in": list(document_ids)}}, {FINGERPRINT_FIELD: 1})
+    return {doc["_id"]: doc.get(FINGERPRINT_FIELD) for doc in cursor}
+
+
+def invalidate(update):
+    # Añade a una operación de actualización el borrado de la huella del documento
+    return {**update, "$unset": {**update.get("$unset", {}), FINGERPRINT_FIELD: ""}}
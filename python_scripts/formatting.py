@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Formateo vectorizado de tiempos (timedelta) compartido por todos los builders.
+# Se trabaja con milisegundos enteros en NumPy para toda la serie a la vez; NaT
+# se convierte en None. Para tiempos con resolución de milisegundo (los que da
+# FastF1) la salida es idéntica a la de los antiguos helpers por fila.
+
+NS_PER_MS = 1_000_000
+
+
+def _to_milliseconds(values, rounded=True):
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    td = pd.to_timedelta(series).to_numpy(dtype="timedelta64[ns]")
+
+    missing = np.isnat(td)
+    ns = np.where(missing, 0, td.view("i8"))
+    if rounded:
+        ms = (ns + NS_PER_MS // 2) // NS_PER_MS
+    else:
+        ms = ns // NS_PER_MS
+    return series.index, ms, missing
+
+
+def _to_series(text, missing, index):
+    out = np.empty(len(text), dtype=object)
+    out[:] = text
+    out[missing] = None
+    return pd.Series(out, index=index, dtype=object)
+
+
+def format_lap_times(values):
+    """
+    Formato m:ss.fff (minutos sin relleno), p.ej. '1:23.456'.
+    Usado en vueltas de práctica y tiempos Q1/Q2/Q3.
+    """
+    index, ms, missing = _to_milliseconds(values)
+    minutes, rest = np.divmod(ms, 60_000)
+    seconds, millis = np.divmod(rest, 1000)
+
+    text = [
+        f"{m}:{s:02d}.{f:03d}"
+        for m, s, f in zip(minutes.tolist(), seconds.tolist(), millis.tolist())
+    ]
+    return _to_series(text, missing, index)
+
+
+def format_total_times(values):
+    """
+    Formato mm:ss:fff, o h:mm:ss:fff a partir de una hora, p.ej. '1:32:07:123'.
+    Usado en los resultados de sesión y el récord del circuito.
+    """
+    index, ms, missing = _to_milliseconds(values)
+    total_minutes, rest = np.divmod(ms, 60_000)
+    seconds, millis = np.divmod(rest, 1000)
+    hours, minutes = np.divmod(total_minutes, 60)
+
+    text = [
+        f"{h}:{m:02d}:{s:02d}:{f:03d}" if h > 0 else f"{m:02d}:{s:02d}:{f:03d}"
+        for h, m, s, f in zip(hours.tolist(), minutes.tolist(), seconds.tolist(), millis.tolist())
+    ]
+    return _to_series(text, missing, index)
+
+
+def format_durations(values):
+    """
+    Formato hh:mm:ss.fff con milisegundos truncados, p.ej. '01:32:07.123'.
+    Usado en el tiempo total de carrera.
+    """
+    index, ms, missing = _to_milliseconds(values, rounded=False)
+    total_seconds, millis = np.divmod(ms, 1000)
+    hours, rest = np.divmod(total_seconds, 3600)
+    minutes, seconds = np.divmod(rest, 60)
+
+    text = [
+        f"{h:02}:{m:02}:{s:02}.{f:03}"
+        for h, m, s, f in zip(hours.tolist(), minutes.tolist(), seconds.tolist(), millis.tolist())
+    ]
+    return _to_series(text, missing, index)
+
+
+def format_total_time(td):
+    # Versión escalar de format_total_times
+    return format_total_times([td]).iloc[0]
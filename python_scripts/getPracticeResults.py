@@ -1,10 +1,15 @@
-import os
-import pandas as pd
 import json
 from pathlib import Path
-import fastf1
-import logging
-from logging.handlers import RotatingFileHandler
+from log_config import get_logger
+from cache_config import enable_cache
+from session_cache import load_sessions, results_profile, SESSION_ALIASES
+from job_ledger import get_ledger
+from schedule_index import get_event
+from instrumentation import span, traced
+from formatting import format_lap_times
+from fastest_laps import practice_classification
+from stints import stint_summary
+from sectors import session_sectors
 
 driver_id_dict = {
     'NOR': 'norris',
@@ -36,124 +41,157 @@ driver_id_dict = {
     'COL': 'colapinto'
 }
 
-def process_sessions(year, round):
+# Sesiones de libres/sprint de cada formato de fin de semana
+WEEKEND_SESSIONS = [
+    ['Practice 1', 'Practice 2', 'Practice 3'],
+    ['Practice 1', 'Sprint Qualifying', 'Sprint']
+]
+
+@traced("job.practice", year="year", round="round")
+def process_sessions(year, round, force=False):
     # Configuracion de logging con rotacion de archivos
-    log_handler = RotatingFileHandler('getSessions_processing.log', maxBytes=5*1024*1024, backupCount=3)
-    logging.basicConfig(
-        handlers=[log_handler],
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+    logger = get_logger("getSessions", 'getSessions_processing.log')
+
+    # Registro de trabajos: una ronda ya procesada termina sin consultar FastF1
+    ledger = get_ledger()
+    if not force and any(all(ledger.is_done(year, round, name, "practice") for name in names)
+                         for names in WEEKEND_SESSIONS):
+        logger.info(f"Sesiones de {year} ronda {round} ya procesadas, omitiendo...")
+        return
 
     # Crear caché de FastF1
-    cache_dir = os.path.join(os.getcwd(), 'fastf1_cache')
-    os.makedirs(cache_dir, exist_ok=True)
-    fastf1.Cache.enable_cache(cache_dir)
+    enable_cache()
 
     output_dir = Path("gp_results")
     session_dir = output_dir / f"{year}" / f"{round}"
     session_dir.mkdir(parents=True, exist_ok=True)
 
-    # Archivo de estado
-    status_file = session_dir / "status.json"
-    if status_file.exists():
-        with open(status_file, 'r', encoding='utf-8') as f:
-            processed_status = json.load(f)
-    else:
-        processed_status = {}
-
     # Obtener evento de la temporada
-    event = fastf1.get_event(year, round)
+    event = get_event(year, round)
     has_sprint = (event["EventFormat"] == "sprint_qualifying")
 
-    # Sesiones a procesar
-    sessions_to_process = [('FP1', lambda: event.get_practice(1))]
+    # Sesiones a procesar con su perfil de carga (todas con vueltas: la clasificación
+    # sprint las necesita para sus posiciones si aún no hay resultado oficial)
+    sessions_to_process = [('FP1', 'laps')]
     if has_sprint:
-        sessions_to_process += [('Sprint Qualifying', event.get_sprint_qualifying), ('Sprint', event.get_sprint)]
+        sessions_to_process += [('Sprint Qualifying', results_profile('SQ')), ('Sprint', 'laps')]
     else:
-        sessions_to_process += [('FP2', lambda: event.get_practice(2)), ('FP3', lambda: event.get_practice(3))]
-
-    # Procesamiento de sesiones
-    for session_name, session_loader in sessions_to_process:
-        if processed_status.get(session_name):
-            logging.info(f"Sesion {session_name} ya procesada, omitiendo...")
-            continue
-
-        try:
-            logging.info(f"Iniciando procesamiento para la sesion: {session_name}")
-
-            session = session_loader()
-            session.load()
-
-            if session_name in ['Sprint Qualifying', 'SQ', 'Q']:
-                # Para sesiones de clasificacion, usar directamente los resultados oficiales
-                logging.info(f"Usando datos oficiales de clasificacion para la sesion {session_name}")
-
-                results = session.results.copy()
-                results['FormattedTime'] = results['Time'].dt.total_seconds().apply(
-                    lambda x: f"{int(x // 60)}:{x % 60:06.3f}" if pd.notna(x) else None
-                )
-
-                session_results = results[['Position', 'Abbreviation', 'FormattedTime', 'TeamName']].copy()
-                session_results.rename(columns={
-                    'Abbreviation': 'Driver',
-                    'TeamName': 'Team'
-                }, inplace=True)
-                session_results['Compound'] = None  # No disponible en clasificacion
-
-                session_results['Driver'] = session_results['Driver'].map(driver_id_dict)
-            else:
-                if session.laps.empty:
-                    logging.info(f"Sesion {session_name} sin datos de vuelta, se omite.")
-                    continue
-
-                # Obtener las vueltas más rápidas
-                fastest_laps = session.laps.groupby('Driver').apply(lambda x: x.pick_fastest())
-                fastest_laps = fastest_laps.sort_values('LapTime')
-
-                if fastest_laps['LapTime'].isna().all() or fastest_laps['LapTime'].empty:
-                    logging.warning(f"Sesion {session_name} no contiene tiempos válidos. Se omite.")
-                    continue
-
-                fastest_laps['FormattedTime'] = fastest_laps['LapTime'].dt.total_seconds().apply(
-                    lambda x: f"{int(x // 60)}:{x % 60:06.3f}"
-                )
-                fastest_laps['Position'] = range(1, len(fastest_laps) + 1)
-                fastest_laps['Driver'] = fastest_laps['Driver'].map(driver_id_dict)
-                session_results = fastest_laps[['Position', 'Driver', 'FormattedTime', 'Team', 'Compound']].copy()
-
-            session_results.columns = [col.lower() for col in session_results.columns]
-            records = session_results.to_dict(orient='records')
-
-            ordinales = [
-                'first','second','third','fourth','fifth','sixth','seventh','eighth','ninth','tenth','eleventh','twelfth',
-                'thirteenth','fourteenth','fifteenth','sixteenth','seventeenth','eighteenth','nineteenth','twentieth'
-            ]
-
-            session_results_obj = {
-                ordinales[i]: records[i]
-                for i in range(len(records))
-            }
-
-            # Guardar resultados de la sesion en un archivo JSON
-            session_dict = {
-                'session': session_name,
-                'event':   f'{event.year} {event.EventName}',
-                'results': session_results_obj
-            }
-
-            filename = session_dir / f"practice_{session_name.lower()}.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(session_dict, f, indent=4, ensure_ascii=False)
-
-            # Actualizar el estado de la sesion
-            processed_status[session_name] = True
-            logging.info(f"Sesion {session_name} procesada y guardada en {filename}")
-
-        except Exception as e:
-            logging.error(f"Error procesando sesion {session_name}: {str(e)}")
-
-    # Guardar el estado actualizado
-    with open(status_file, 'w', encoding='utf-8') as f:
-        json.dump(processed_status, f, indent=4, ensure_ascii=False)
+        sessions_to_process += [('FP2', 'laps'), ('FP3', 'laps')]
+
+    # Solo las sesiones que este proceso consigue reclamar (ni hechas ni en curso en otro)
+    pending = []
+    for session_name, load_profile in sessions_to_process:
+        claim = ledger.claim(year, round, SESSION_ALIASES.get(session_name, session_name), "practice", force=force)
+        if claim:
+            pending.append((session_name, load_profile))
+        else:
+            logger.info(f"Sesion {session_name} omitida ({claim.reason})")
+
+    # Lease renovado mientras se cargan y procesan (una carga en frío puede superar JOB_LEASE_SECONDS)
+    claimed = [(year, round, SESSION_ALIASES.get(name, name), "practice") for name, _ in pending]
+    with ledger.keep_alive(claimed):
+        # Carga en paralelo de las sesiones pendientes; un fallo no detiene las demás
+        loaded = load_sessions(year, round, pending, event=event)
+
+        # Procesamiento de sesiones
+        for session_name, session, load_error in loaded:
+            job_session = SESSION_ALIASES.get(session_name, session_name)
+            try:
+                logger.info(f"Iniciando procesamiento para la sesion: {session_name}")
+
+                if load_error is not None:
+                    raise load_error
+
+                with span("transform.practice", year=year, round=round, session=session_name):
+                    if session_name in ['Sprint Qualifying', 'SQ', 'Q']:
+                        # Para sesiones de clasificacion, usar directamente los resultados oficiales
+                        logger.info(f"Usando datos oficiales de clasificacion para la sesion {session_name}")
+
+                        # Sin posición no hay clasificación (y NaN no es JSON válido para Node)
+                        results = session.results.dropna(subset=['Position']).sort_values('Position')
+                        if results.empty:
+                            logger.info(f"Sesion {session_name} todavía sin clasificación, se omite.")
+                            ledger.fail(year, round, job_session, "practice", "Sin clasificación")
+                            continue
+                        results['Position'] = results['Position'].astype(int)
+                        results['FormattedTime'] = format_lap_times(results['Time'])
+
+                        session_results = results[['Position', 'Abbreviation', 'FormattedTime', 'TeamName']].copy()
+                        session_results.rename(columns={
+                            'Abbreviation': 'Driver',
+                            'TeamName': 'Team'
+                        }, inplace=True)
+                        session_results['Compound'] = None  # No disponible en clasificacion
+
+                        session_results['Driver'] = session_results['Driver'].map(driver_id_dict)
+                    else:
+                        if session.laps.empty:
+                            logger.info(f"Sesion {session_name} sin datos de vuelta, se omite.")
+                            ledger.fail(year, round, job_session, "practice", "Sin datos de vuelta")
+                            continue
+
+                        # Vuelta más rápida de cada piloto (vectorizado)
+                        session_results = practice_classification(session.laps, driver_id_dict)
+
+                        if session_results.empty:
+                            logger.warning(f"Sesion {session_name} no contiene tiempos válidos. Se omite.")
+                            ledger.fail(year, round, job_session, "practice", "Sin tiempos válidos")
+                            continue
+
+                session_results.columns = [col.lower() for col in session_results.columns]
+                records = session_results.to_dict(orient='records')
+
+                ordinales = [
+                    'first','second','third','fourth','fifth','sixth','seventh','eighth','ninth','tenth','eleventh','twelfth',
+                    'thirteenth','fourteenth','fifteenth','sixteenth','seventeenth','eighteenth','nineteenth','twentieth'
+                ]
+
+                session_results_obj = {
+                    ordinales[i]: records[i]
+                    for i in range(len(records))
+                }
+
+                # Guardar resultados de la sesion en un archivo JSON
+                session_dict = {
+                    'session': session_name,
+                    'event':   f'{event.year} {event.EventName}',
+                    'results': session_results_obj
+                }
+
+                # Mejores sectores y vuelta ideal (libres y clasificación sprint), sin recargar la sesión
+                if job_session != "Sprint":
+                    with span("transform.sectors", year=year, round=round, session=session_name):
+                        session_dict['sectors'] = session_sectors(year, round, session_name, session.results)
+
+                filename = session_dir / f"practice_{session_name.lower()}.json"
+                with span("serialize.json", year=year, round=round, session=session_name):
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        json.dump(session_dict, f, indent=4, ensure_ascii=False)
+
+                # Ritmo y degradación por stint (tandas largas) de las sesiones con vueltas
+                if session_name not in ['Sprint Qualifying', 'SQ', 'Q']:
+                    with span("transform.stints", year=year, round=round, session=session_name):
+                        stints_dict = {
+                            'session': session_name,
+                            'event': f'{event.year} {event.EventName}',
+                            'drivers': stint_summary(session.laps, session.results)
+                        }
+                    with open(session_dir / f"stints_{session_name.lower()}.json", 'w', encoding='utf-8') as f:
+                        json.dump(stints_dict, f, indent=4, ensure_ascii=False)
+
+                # Actualizar el estado de la sesion
+                ledger.complete(year, round, job_session, "practice", {"file": str(filename)})
+                logger.info(f"Sesion {session_name} procesada y guardada en {filename}")
+
+                # Los puntos del sprint cuentan para el mundial
+                if job_session == "Sprint":
+                    try:
+                        from standings import update_standings
+                        update_standings(year, round, "Sprint", session.results)
+                    except Exception as e:
+                        logger.error(f"Error actualizando la clasificación del mundial: {str(e)}")
+
+            except Exception as e:
+                ledger.fail(year, round, job_session, "practice", e)
+                logger.error(f"Error procesando sesion {session_name}: {str(e)}")
 
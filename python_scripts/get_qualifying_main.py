@@ -1,11 +1,26 @@
 import sys
-from get_qualifying_results import get_qualifying_results
+import json
+import argparse
 
 if __name__ == "__main__":
-    year = int(sys.argv[1])
-    round_number = int(sys.argv[2])
+    parser = argparse.ArgumentParser(description="Procesa los resultados de clasificación de una ronda.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("round", type=int)
+    parser.add_argument("--publish", action="store_true", help="Escribe en MongoDB e imprime el resultado como JSON")
+    parser.add_argument("--no-file", action="store_true", help="No genera gp_results/<year>/<round>/qualifying.json")
+    parser.add_argument("--force", action="store_true", help="Procesa la ronda aunque el registro de trabajos la dé por hecha")
+    args = parser.parse_args()
 
-    get_qualifying_results(year, round_number)
+    # fastf1/pandas solo se importan cuando los argumentos son válidos
+    from get_qualifying_results import get_qualifying_results
 
-    print(f"Script ejecutado correctamente para {year}, ronda {round_number}")
+    result = get_qualifying_results(args.year, args.round, publish=args.publish, write_file=not args.no_file,
+                                    force=args.force)
+
+    if args.publish:
+        # Un único documento JSON compacto en stdout
+        print(json.dumps(result, separators=(",", ":"), ensure_ascii=False, default=str))
+        sys.exit(1 if "error" in result else 0)
+
+    print(f"Script ejecutado correctamente para {args.year}, ronda {args.round}")
     sys.exit(0)
@@ -1,82 +1,115 @@
-import fastf1
-import pandas as pd
-import os
 import json
-import logging
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
-
-log_handler = RotatingFileHandler('updateQualy_processing.log', maxBytes=5*1024*1024, backupCount=3)
-logging.basicConfig(
-    handlers=[log_handler],
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-def format_time(t):
-    if pd.isna(t):
-        return None
-    total_seconds = t.total_seconds()
-    minutes = int(total_seconds // 60)
-    seconds = total_seconds % 60
-    return f"{minutes}:{seconds:06.3f}"
-
-def get_qualifying_results(year: int, round_number: int) -> dict:
-    cache_dir = os.path.join(os.getcwd(), 'fastf1_cache')
-    os.makedirs(cache_dir, exist_ok=True)
-    fastf1.Cache.enable_cache(cache_dir)
-
-    output_dir = Path("gp_results")
-    session_dir = output_dir / str(year) / str(round_number)
-    session_dir.mkdir(parents=True, exist_ok=True)
-
-    logging.info(f"Procesando clasificacion para {year} Ronda {round_number}")
+from log_config import get_logger
+from cache_config import enable_cache
+from session_cache import load_session, results_profile
+from instrumentation import span, traced
+from job_ledger import run_job
+from formatting import format_lap_times
+from sectors import session_sectors
+
+@traced("job.qualifying", year="year", round="round_number")
+def get_qualifying_results(year: int, round_number: int, publish: bool = False, write_file: bool = True,
+                              force: bool = False) -> dict:
+    """
+    Genera los resultados de clasificación de una ronda.
+
+    Parámetros:
+      publish: Si True, escribe los resultados directamente en la sesión
+               'Qualifying' de la carrera en MongoDB y los devuelve.
+      write_file: Si False, no se genera gp_results/<year>/<round>/qualifying.json.
+      force: Reprocesa aunque el registro de trabajos ya lo dé por hecho.
+    """
+    # Una ronda ya procesada devuelve el resultado guardado sin cargar la sesión
+    kind = "qualifying:publish" if publish else "qualifying:file"
+    return run_job(year, round_number, "Qualifying", kind,
+                   lambda: _get_qualifying_results(year, round_number, publish, write_file), force=force)
+
+
+def _get_qualifying_results(year, round_number, publish, write_file):
+    logger = get_logger("updateQualy", 'updateQualy_processing.log')
+    enable_cache()
+
+    logger.info(f"Procesando clasificacion para {year} Ronda {round_number}")
 
     try:
-        session = fastf1.get_session(year, round_number, 'Q')
-        session.load()
+        # Con vueltas: sin resultado oficial FastF1 calcula posiciones y tiempos a partir de ellas
+        session = load_session(year, round_number, 'Q', profile=results_profile('Q'))
     except Exception as e:
-        logging.error(f"Error cargando la sesión: {e}")
+        logger.error(f"Error cargando la sesión: {e}")
         return {"error": "Error al cargar la sesión"}
 
     if not hasattr(session, 'results'):
-        logging.error("No se han encontrado resultados en la sesión.")
+        logger.error("No se han encontrado resultados en la sesión.")
         return {"error": "No se encontraron resultados en la sesión"}
 
-    df = session.results.sort_values(by="Position")
-
-    ordinales = [
-        'first','second','third','fourth','fifth','sixth','seventh','eighth','ninth','tenth','eleventh','twelfth',
-        'thirteenth','fourteenth','fifteenth','sixteenth','seventeenth','eighteenth','nineteenth','twentieth'
-    ]
-
-    result = {}
-    for row in df.itertuples():
-        pos = int(row.Position)
-        if pos > 20:
-            continue
-        result[ordinales[pos - 1]] = {
-            "driver": row.DriverId.lower(),
-            "position": pos,
-            "total_time": {
-                "Q1": format_time(row.Q1),
-                "Q2": format_time(row.Q2),
-                "Q3": format_time(row.Q3)
+    with span("transform.results", year=year, round=round_number, session="Qualifying"):
+        # Pilotos sin posición (sin vuelta cronometrada) no entran en la clasificación
+        df = session.results.dropna(subset=["Position"]).sort_values(by="Position")
+
+        ordinales = [
+            'first','second','third','fourth','fifth','sixth','seventh','eighth','ninth','tenth','eleventh','twelfth',
+            'thirteenth','fourteenth','fifteenth','sixteenth','seventeenth','eighteenth','nineteenth','twentieth'
+        ]
+
+        q_times = {q: format_lap_times(df[q]).tolist() for q in ("Q1", "Q2", "Q3")}
+
+        result = {}
+        for i, row in enumerate(df.itertuples()):
+            pos = int(row.Position)
+            if pos > 20:
+                continue
+            result[ordinales[pos - 1]] = {
+                "driver": row.DriverId.lower(),
+                "position": pos,
+                "total_time": {
+                    "Q1": q_times["Q1"][i],
+                    "Q2": q_times["Q2"][i],
+                    "Q3": q_times["Q3"][i]
+                }
             }
+
+        full_data = {
+            "session": session.name,
+            "event": f"{year} {session.event['EventName']}",
+            "results": result
         }
 
-    full_data = {
-        "session": session.name,
-        "event": f"{year} {session.event['EventName']}",
-        "results": result
-    }
-
-    output_file = session_dir / "qualifying.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(full_data, f, indent=4, ensure_ascii=False)
-
-    logging.info(f"Archivo guardado correctamente en {output_file}")
-    return {
-        "message": "Clasificacion procesada correctamente",
-        "file_path": str(output_file)
-    }
+    # Sin resultados aún: fallo para que el registro lo reintente
+    if not result:
+        logger.warning("La sesión todavía no tiene resultados.")
+        return {"error": "La sesión todavía no tiene resultados"}
+
+    # Mejores sectores y vuelta ideal con las vueltas en memoria o en el almacén de vueltas
+    try:
+        with span("transform.sectors", year=year, round=round_number, session="Qualifying"):
+            full_data["sectors"] = session_sectors(year, round_number, 'Q', session.results)
+    except Exception as e:
+        logger.error(f"Error calculando los sectores: {e}")
+
+    response = {"message": "Clasificacion procesada correctamente"}
+
+    if write_file:
+        with span("serialize.json", year=year, round=round_number, session="Qualifying"):
+            session_dir = Path("gp_results") / str(year) / str(round_number)
+            session_dir.mkdir(parents=True, exist_ok=True)
+            output_file = session_dir / "qualifying.json"
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(full_data, f, indent=4, ensure_ascii=False)
+            logger.info(f"Archivo guardado correctamente en {output_file}")
+        response["file_path"] = str(output_file)
+
+    if publish:
+        from publish_results import publish_session_result
+
+        with span("db.publish", year=year, round=round_number, session="Qualifying"):
+            extra_fields = {"sessions.$.sectors": full_data["sectors"]} if "sectors" in full_data else None
+            race = publish_session_result(year, round_number, "Qualifying", result, extra_fields)
+        if race is None:
+            logger.error("Carrera no encontrada en MongoDB")
+            return {"error": "Carrera no encontrada en MongoDB"}
+        logger.info(f"Clasificacion publicada en MongoDB ({race['_id']})")
+        response.update(full_data)
+        response["race"] = race
+
+    return response
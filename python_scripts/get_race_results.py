@@ -1,86 +1,121 @@
-import fastf1
-import os
-import pandas as pd
 import json
-import logging
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
-
-log_handler = RotatingFileHandler('updateRace_processing.log', maxBytes=5*1024*1024, backupCount=3)
-logging.basicConfig(
-    handlers=[log_handler],
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-def formatear_duracion(tiempo):
-    if isinstance(tiempo, pd.Timedelta):
-        total_segundos = int(tiempo.total_seconds())
-        milisegundos = int(tiempo.microseconds / 1000)
-        horas = total_segundos // 3600
-        minutos = (total_segundos % 3600) // 60
-        segundos = total_segundos % 60
-        return f"{horas:02}:{minutos:02}:{segundos:02}.{milisegundos:03}"
-    return None
-
-def get_race_results(year: int, round_number: int) -> dict:
-    cache_dir = os.path.join(os.getcwd(), 'fastf1_cache')
-    os.makedirs(cache_dir, exist_ok=True)
-    fastf1.Cache.enable_cache(cache_dir)
-
-    output_dir = Path("gp_results")
-    session_dir = output_dir / str(year) / str(round_number)
-    session_dir.mkdir(parents=True, exist_ok=True)
-
-    logging.info(f"Procesando carrera para {year} Ronda {round_number}")
+from log_config import get_logger
+from cache_config import enable_cache
+from session_cache import load_session
+from instrumentation import span, traced
+from job_ledger import run_job
+from formatting import format_durations
+
+@traced("job.race", year="year", round="round_number")
+def get_race_results(year: int, round_number: int, publish: bool = False, write_file: bool = True,
+                        force: bool = False) -> dict:
+    """
+    Genera los resultados de carrera de una ronda.
+
+    Parámetros:
+      publish: Si True, escribe los resultados directamente en la sesión 'Race'
+               (y en race_results, winner y finished) en MongoDB y los devuelve.
+      write_file: Si False, no se genera gp_results/<year>/<round>/race.json.
+      force: Reprocesa aunque el registro de trabajos ya lo dé por hecho.
+    """
+    # Una ronda ya procesada devuelve el resultado guardado sin cargar la sesión
+    kind = "race:publish" if publish else "race:file"
+    return run_job(year, round_number, "Race", kind,
+                   lambda: _get_race_results(year, round_number, publish, write_file), force=force)
+
+
+def _get_race_results(year, round_number, publish, write_file):
+    logger = get_logger("updateRace", 'updateRace_processing.log')
+    enable_cache()
+
+    logger.info(f"Procesando carrera para {year} Ronda {round_number}")
 
     try:
-        session = fastf1.get_session(year, round_number, 'R')
-        session.load()
+        session = load_session(year, round_number, 'R', profile="results")
     except Exception as e:
-        logging.error(f"Error cargando la sesión: {e}")
+        logger.error(f"Error cargando la sesión: {e}")
         return {"error": "Error al cargar la sesión"}
 
     if not hasattr(session, 'results'):
-        logging.error("No se han encontrado resultados en la sesión.")
+        logger.error("No se han encontrado resultados en la sesión.")
         return {"error": "No se encontraron resultados en la sesión"}
 
-    df = session.results.sort_values(by="Position")
-
-    ordinales = [
-        'first','second','third','fourth','fifth','sixth','seventh','eighth','ninth','tenth','eleventh','twelfth',
-        'thirteenth','fourteenth','fifteenth','sixteenth','seventeenth','eighteenth','nineteenth','twentieth'
-    ]
-
-    result = {}
-    for row in df.itertuples():
-        posicion = int(row.Position)
-        if posicion > 20:
-            continue
-        result[ordinales[posicion - 1]] = {
-            "driver": row.DriverId.lower(),
-            "position": {
-                "Position": row.Position,
-                "ClassifiedPosition": row.ClassifiedPosition,
-                "GridPosition": row.GridPosition
-            },
-            "status": row.Status,
-            "time": formatear_duracion(row.Time),
-            "points": row.Points
+    with span("transform.results", year=year, round=round_number, session="Race"):
+        # Sin posición oficial todavía (resultados provisionales) el piloto no se publica
+        df = session.results.dropna(subset=["Position"]).sort_values(by="Position")
+
+        ordinales = [
+            'first','second','third','fourth','fifth','sixth','seventh','eighth','ninth','tenth','eleventh','twelfth',
+            'thirteenth','fourteenth','fifteenth','sixteenth','seventeenth','eighteenth','nineteenth','twentieth'
+        ]
+
+        race_times = format_durations(df['Time']).tolist()
+
+        result = {}
+        for i, row in enumerate(df.itertuples()):
+            posicion = int(row.Position)
+            if posicion > 20:
+                continue
+            result[ordinales[posicion - 1]] = {
+                "driver": row.DriverId.lower(),
+                "position": {
+                    "Position": row.Position,
+                    "ClassifiedPosition": row.ClassifiedPosition,
+                    "GridPosition": row.GridPosition
+                },
+                "status": row.Status,
+                "time": race_times[i],
+                "points": row.Points
+            }
+
+        full_data = {
+            "session": session.name,
+            "event": f"{year} {session.event['EventName']}",
+            "results": result
         }
 
-    full_data = {
-        "session": session.name,
-        "event": f"{year} {session.event['EventName']}",
-        "results": result
-    }
-
-    output_file = session_dir / "race.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(full_data, f, indent=4, ensure_ascii=False)
-
-    logging.info(f"Archivo guardado correctamente en {output_file}")
-    return {
-        "message": "Clasificacion procesada correctamente",
-        "file_path": str(output_file)
-    }
+    # Sin resultados aún (p.ej. justo al terminar la carrera): fallo para que el registro lo reintente
+    if not result:
+        logger.warning("La sesión todavía no tiene resultados.")
+        return {"error": "La sesión todavía no tiene resultados"}
+
+    response = {"message": "Clasificacion procesada correctamente"}
+
+    if write_file:
+        with span("serialize.json", year=year, round=round_number, session="Race"):
+            session_dir = Path("gp_results") / str(year) / str(round_number)
+            session_dir.mkdir(parents=True, exist_ok=True)
+            output_file = session_dir / "race.json"
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(full_data, f, indent=4, ensure_ascii=False)
+            logger.info(f"Archivo guardado correctamente en {output_file}")
+        response["file_path"] = str(output_file)
+
+    if publish:
+        from publish_results import publish_session_result, race_results_array
+
+        # Sin ganador la carrera no se da por terminada: fallo para que el registro lo reintente
+        winner = result.get("first", {}).get("driver")
+        if not winner:
+            logger.warning("La carrera todavía no tiene ganador; no se publica.")
+            return {"error": "La carrera todavía no tiene ganador"}
+        extra_fields = {"race_results": race_results_array(result), "finished": True, "winner": winner}
+
+        with span("db.publish", year=year, round=round_number, session="Race"):
+            race = publish_session_result(year, round_number, "Race", result, extra_fields)
+        if race is None:
+            logger.error("Carrera no encontrada en MongoDB")
+            return {"error": "Carrera no encontrada en MongoDB"}
+        logger.info(f"Carrera publicada en MongoDB ({race['_id']})")
+
+        # Clasificación del mundial con los puntos de esta carrera
+        try:
+            from standings import update_standings
+            update_standings(year, round_number, "Race", session.results)
+        except Exception as e:
+            logger.error(f"Error actualizando la clasificación del mundial: {e}")
+        response.update(full_data)
+        response["race"] = race
+
+    return response
@@ -1,17 +1,20 @@
 import sys
 import io
-from getPracticeResults import process_sessions
+import argparse
 
 if __name__ == '__main__':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
-    if len(sys.argv) != 3:
-        print("Uso: get_sessions.py <year> <round>")
-        sys.exit(1)
 
-    year = int(sys.argv[1])
-    rnd = int(sys.argv[2])
-    
-    process_sessions(year, rnd)
-    print(f"Sesiones del año {year}, ronda {rnd} procesadas correctamente.")
-    sys.exit(0)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Procesa las sesiones de libres y sprint de una ronda.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("round", type=int)
+    parser.add_argument("--force", action="store_true", help="Procesa las sesiones aunque el registro de trabajos las dé por hechas")
+    args = parser.parse_args()
+
+    # fastf1/pandas solo se importan cuando los argumentos son válidos
+    from getPracticeResults import process_sessions
+
+    process_sessions(args.year, args.round, force=args.force)
+    print(f"Sesiones del año {args.year}, ronda {args.round} procesadas correctamente.")
+    sys.exit(0)
@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import time
+import atexit
+import inspect
+import functools
+import threading
+from collections import deque
+
+# Trazas por etapa de los trabajos de ingesta.
+#
+# - span("session.load", year=2025, round=5, session="Race") como context
+#   manager, o @traced("results.race", year="year", round="round_number")
+#   como decorador (los atributos se toman de los argumentos de la función).
+# - Cada span terminado se escribe como una línea JSON en TRACE_SPANS
+#   ("stderr" o la ruta de un fichero). Los spans anidados llevan el id del padre.
+# - TRACE_SUMMARY=1 imprime en stderr una tabla por nombre de span al salir.
+#   Por nombre se guardan llamadas, total y máximo, y para el p95 solo las
+#   últimas TRACE_WINDOW duraciones: la memoria no crece en workers de larga
+#   duración.
+# - set_metrics_sink(funcion) reenvía duraciones y contadores a un sistema de
+#   métricas externo: funcion(nombre, valor, atributos).
+#
+# Desactivado (por defecto) span() devuelve siempre el mismo objeto vacío y el
+# decorador llama directamente a la función: no se mide ni se reserva nada.
+
+_enabled = False
+_output = None
+_sink = None
+_lock = threading.Lock()
+_local = threading.local()
+_durations = {}
+_next_id = 0
+_summary_registered = False
+
+# Duraciones recientes por span para el p95 del resumen
+TRACE_WINDOW = int(os.getenv("TRACE_WINDOW", "1000"))
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+_STDERR = object()  # se resuelve al escribir: el worker redirige sys.stderr
+
+
+class Span:
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.id = None
+        self.parent = None
+
+    def set(self, **attrs):
+        # Atributos conocidos al final de la etapa (filas, documentos escritos...)
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        global _next_id
+
+        stack = _stack()
+        with _lock:
+            _next_id += 1
+            self.id = _next_id
+        self.parent = stack[-1].id if stack else None
+        stack.append(self)
+        self.ts = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        _stack().pop()
+
+        record = {
+            "span": self.name,
+            "id": self.id,
+            "parent": self.parent,
+            "ts": round(self.ts, 6),
+            "ms": round(elapsed_ms, 3),
+            "ok": exc_type is None,
+            "pid": os.getpid(),
+            **self.attrs
+        }
+        if exc_type is not None:
+            record["error"] = str(exc)
+        _emit(record)
+
+        with _lock:
+            stats = _durations.get(self.name)
+            if stats is None:
+                stats = _durations[self.name] = {"count": 0, "total": 0.0, "max": 0.0,
+                                                 "recent": deque(maxlen=TRACE_WINDOW)}
+            stats["count"] += 1
+            stats["total"] += elapsed_ms
+            stats["max"] = max(stats["max"], elapsed_ms)
+            stats["recent"].append(elapsed_ms)
+        if _sink is not None:
+            _sink(f"{self.name}.ms", elapsed_ms, self.attrs)
+        return False
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _emit(record):
+    if _output is None:
+        return
+    stream = sys.stderr if _output is _STDERR else _output
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _lock:
+        stream.write(line + "\n")
+        stream.flush()
+
+
+def span(name, **attrs):
+    """
+    Context manager que mide una etapa.
+
+    Parámetros:
+      name: Nombre de la etapa ('session.load', 'db.bulk_write', ...).
+      attrs: Atributos del span (year, round, session, ...).
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+
+def traced(name, **attr_params):
+    """
+    Decorador equivalente a span(). attr_params asocia cada atributo con el
+    parámetro de la función del que se toma, p.ej. round="round_number".
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            attrs = {attr: arguments.get(param) for attr, param in attr_params.items()}
+            with Span(name, attrs):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1, **attrs):
+    # Contador reenviado al sink de métricas (sin sink no hace nada)
+    if _sink is not None:
+        _sink(name, value, attrs)
+
+
+def set_metrics_sink(sink):
+    """
+    Registra funcion(nombre, valor, atributos) para recibir la duración de
+    cada span ('<span>.ms') y los contadores de count(). Activa las trazas.
+    """
+    global _sink, _enabled
+    _sink = sink
+    if sink is not None:
+        _enabled = True
+
+
+def summary():
+    # Agregado por nombre de span: llamadas, total, media, p95 (últimas TRACE_WINDOW) y máximo en ms
+    with _lock:
+        items = {name: (dict(stats), sorted(stats["recent"])) for name, stats in _durations.items()}
+    return {
+        name: {
+            "count": stats["count"],
+            "total_ms": round(stats["total"], 3),
+            "mean_ms": round(stats["total"] / stats["count"], 3),
+            "p95_ms": round(recent[min(len(recent) - 1, int(0.95 * len(recent)))], 3),
+            "max_ms": round(stats["max"], 3)
+        }
+        for name, (stats, recent) in items.items()
+    }
+
+
+def print_summary(stream=None):
+    stream = stream or sys.stderr
+    rows = sorted(summary().items(), key=lambda item: -item[1]["total_ms"])
+    if not rows:
+        return
+    width = max(len(name) for name, _ in rows)
+    stream.write(f"\n{'Etapa':<{width}}  {'N':>5}  {'Total ms':>10}  {'Media':>9}  {'p95':>9}  {'Máx':>9}\n")
+    for name, s in rows:
+        stream.write(f"{name:<{width}}  {s['count']:>5}  {s['total_ms']:>10.1f}  {s['mean_ms']:>9.1f}  "
+                     f"{s['p95_ms']:>9.1f}  {s['max_ms']:>9.1f}\n")
+    stream.flush()
+
+
+def configure(output=None, summary_at_exit=False):
+    """
+    Activa las trazas.
+
+    Parámetros:
+      output: "stderr", ruta de un fichero JSON lines o None (solo resumen/sink).
+      summary_at_exit: Si True, imprime la tabla resumen al terminar el proceso.
+    """
+    global _enabled, _output, _summary_registered
+
+    _enabled = True
+    if output == "stderr":
+        _output = _STDERR
+    elif output:
+        _output = open(output, "a", encoding="utf-8")
+    # Configurar varias veces (worker, CLI, benchmark) no debe repetir la tabla al salir
+    if summary_at_exit and not _summary_registered:
+        atexit.register(print_summary)
+        _summary_registered = True
+
+
+def disable():
+    global _enabled, _output, _sink
+    _enabled = False
+    _output = None
+    _sink = None
+
+
+def enabled():
+    return _enabled
+
+
+if os.getenv("TRACE_SPANS") or os.getenv("TRACE_SUMMARY") == "1":
+    configure(os.getenv("TRACE_SPANS"), summary_at_exit=os.getenv("TRACE_SUMMARY") == "1")
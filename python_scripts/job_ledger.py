@@ -0,0 +1,445 @@
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from single_flight import get_flights
+
+# Registro de trabajos de ingesta en SQLite (sustituye a status.json).
+#
+# Cada trabajo se identifica por (año, ronda, sesión, tipo), p.ej.
+# (2025, 5, 'Race', 'race:publish'). Estados:
+#   pending -> running (reclamado con un lease) -> done | failed
+#
+# - claim() es atómico (BEGIN IMMEDIATE): dos procesos nunca procesan a la vez
+#   el mismo trabajo. Mientras se ejecuta, keep_alive() renueva el lease cada
+#   tercio de JOB_LEASE_SECONDS (una carga en frío puede durar más que el
+#   lease); si el proceso muere, el lease caduca y otro puede reclamarlo.
+# - fail() programa el siguiente intento con backoff exponencial; tras
+#   JOB_MAX_ATTEMPTS fallos solo se reintenta con force.
+# - complete() guarda el resultado, que se devuelve sin recalcular si se vuelve
+#   a pedir el mismo trabajo.
+#
+# Uso: python job_ledger.py pending 2025
+#      python job_ledger.py reset 2025 --round 5 [--session Race] [--kind race:publish]
+
+LEDGER_PATH = Path(os.getenv("JOB_LEDGER_PATH", Path(__file__).resolve().parent.parent / "job_ledger.sqlite")).resolve()
+LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "900"))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+BACKOFF_SECONDS = int(os.getenv("JOB_BACKOFF_SECONDS", "300"))
+MAX_BACKOFF_SECONDS = 6 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    year INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    next_attempt_at REAL,
+    last_error TEXT,
+    result TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (year, round, session, kind)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (year, status);
+"""
+
+# Motivos por los que claim() no reclama un trabajo
+DONE = "done"
+RUNNING = "running"
+BACKOFF = "backoff"
+EXHAUSTED = "exhausted"
+
+
+def owner_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class JobLedger:
+    """
+    Registro de trabajos compartido entre procesos a través de un fichero SQLite.
+
+    Uso:
+      ledger = JobLedger()
+      if ledger.claim(2025, 5, "Race", "race:publish").claimed:
+          try:
+              result = ...
+              ledger.complete(2025, 5, "Race", "race:publish", result)
+          except Exception as e:
+              ledger.fail(2025, 5, "Race", "race:publish", e)
+    """
+
+    def __init__(self, path=LEDGER_PATH, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS,
+                 backoff_seconds=BACKOFF_SECONDS):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # Una conexión por operación: el registro se usa desde varios hilos
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Connection(conn)
+
+    def get(self, year, gp_round, session, kind):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE year=? AND round=? AND session=? AND kind=?",
+                (year, gp_round, session, kind)
+            ).fetchone()
+        return _row_dict(row)
+
+    def claim(self, year, gp_round, session, kind, owner=None, force=False):
+        """
+        Intenta reclamar un trabajo para este proceso.
+
+        Parámetros:
+          owner: Identificador del reclamante (por defecto host:pid:hilo).
+          force: Reclama aunque ya esté hecho, en espera de reintento o agotado
+                 (nunca si otro proceso lo tiene con un lease vigente).
+
+        Retorna:
+          Claim(claimed, reason, job): reason es None si se ha reclamado, o
+          'done', 'running', 'backoff' o 'exhausted'.
+        """
+        owner = owner or owner_id()
+        now = time.time()
+        key = (year, gp_round, session, kind)
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = _row_dict(conn.execute(
+                "SELECT * FROM jobs WHERE year=? AND round=? AND session=? AND kind=?", key
+            ).fetchone())
+
+            reason = None
+            if row is not None:
+                if row["status"] == "running" and (row["lease_until"] or 0) > now:
+                    reason = RUNNING
+                elif force:
+                    reason = None
+                elif row["status"] == "done":
+                    reason = DONE
+                elif row["status"] == "failed" and row["attempts"] >= self.max_attempts:
+                    reason = EXHAUSTED
+                elif row["status"] == "failed" and (row["next_attempt_at"] or 0) > now:
+                    reason = BACKOFF
+
+            if reason is not None:
+                conn.execute("ROLLBACK")
+                return Claim(False, reason, row)
+
+            conn.execute(
+                """
+                INSERT INTO jobs (year, round, session, kind, status, attempts, lease_owner, lease_until, updated_at)
+                VALUES (?, ?, ?, ?, 'running', 1, ?, ?, ?)
+                ON CONFLICT (year, round, session, kind) DO UPDATE SET
+                    status='running', attempts=attempts + 1, lease_owner=excluded.lease_owner,
+                    lease_until=excluded.lease_until, updated_at=excluded.updated_at
+                """,
+                (*key, owner, now + self.lease_seconds, now)
+            )
+            conn.execute("COMMIT")
+        return Claim(True, None, row)
+
+    def renew(self, year, gp_round, session, kind, owner=None):
+        # Alarga el lease de un trabajo largo; False si ya no es nuestro
+        return self._finish(
+            "lease_until=?", (time.time() + self.lease_seconds,), year, gp_round, session, kind, owner
+        )
+
+    def keep_alive(self, jobs, owner=None, interval=None):
+        """
+        Renueva en segundo plano el lease de los trabajos reclamados mientras
+        dura el bloque with (cada tercio del lease por defecto).
+
+        Parámetros:
+          jobs: Lista de (año, ronda, sesión, tipo) reclamados por owner.
+          owner: Reclamante (por defecto el hilo que llama, el mismo que en claim).
+        """
+        return _LeaseHeartbeat(self, jobs, owner or owner_id(), interval or self.lease_seconds / 3)
+
+    def complete(self, year, gp_round, session, kind, result=None, owner=None):
+        """
+        Marca el trabajo como hecho y guarda su resultado (serializable a JSON).
+
+        Retorna:
+          False si el lease ya no pertenecía a owner (otro proceso lo reclamó).
+        """
+        payload = json.dumps(result, ensure_ascii=False, default=str) if result is not None else None
+        return self._finish(
+            "status='done', result=?, attempts=0, last_error=NULL, lease_owner=NULL, lease_until=NULL, "
+            "next_attempt_at=NULL",
+            (payload,), year, gp_round, session, kind, owner
+        )
+
+    def fail(self, year, gp_round, session, kind, error, owner=None):
+        # Backoff exponencial a partir de BACKOFF_SECONDS según los intentos hechos
+        job = self.get(year, gp_round, session, kind)
+        attempts = job["attempts"] if job else 1
+        delay = min(self.backoff_seconds * 2 ** max(attempts - 1, 0), MAX_BACKOFF_SECONDS)
+        return self._finish(
+            "status='failed', last_error=?, next_attempt_at=?, lease_owner=NULL, lease_until=NULL",
+            (str(error), time.time() + delay), year, gp_round, session, kind, owner
+        )
+
+    def _finish(self, assignments, values, year, gp_round, session, kind, owner):
+        owner = owner or owner_id()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at=? "
+                "WHERE year=? AND round=? AND session=? AND kind=? AND status='running' AND lease_owner=?",
+                (*values, time.time(), year, gp_round, session, kind, owner)
+            )
+            return cursor.rowcount == 1
+
+    def is_done(self, year, gp_round, session, kind):
+        job = self.get(year, gp_round, session, kind)
+        return job is not None and job["status"] == "done"
+
+    def result(self, year, gp_round, session, kind):
+        job = self.get(year, gp_round, session, kind)
+        if job is None or job["result"] is None:
+            return None
+        return json.loads(job["result"])
+
+    def register(self, year, gp_round, session, kind):
+        # Da de alta un trabajo previsto (p.ej. una sesión aún no disputada) como pendiente
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (year, round, session, kind, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (year, gp_round, session, kind, time.time())
+            )
+
+    def pending(self, year):
+        """
+        Trabajos de la temporada que aún no están hechos, por ronda.
+
+        Retorna:
+          Lista de dicts con el estado de cada trabajo; 'runnable' indica si
+          puede reclamarse ya (pendiente, lease caducado o reintento vencido).
+        """
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE year=? AND status != 'done' ORDER BY round, session, kind", (year,)
+            ).fetchall()
+
+        jobs = []
+        for row in map(_row_dict, rows):
+            row.pop("result")
+            row["runnable"] = (
+                row["status"] == "pending"
+                or (row["status"] == "running" and (row["lease_until"] or 0) <= now)
+                or (row["status"] == "failed" and row["attempts"] < self.max_attempts
+                    and (row["next_attempt_at"] or 0) <= now)
+            )
+            jobs.append(row)
+        return jobs
+
+    def reset(self, year, gp_round=None, session=None, kind=None):
+        # Borra trabajos para que vuelvan a procesarse desde cero
+        conditions = ["year=?"]
+        values = [year]
+        for column, value in (("round", gp_round), ("session", session), ("kind", kind)):
+            if value is not None:
+                conditions.append(f"{column}=?")
+                values.append(value)
+        with self._connect() as conn:
+            return conn.execute(f"DELETE FROM jobs WHERE {' AND '.join(conditions)}", values).rowcount
+
+
+class Claim:
+    def __init__(self, claimed, reason, job):
+        self.claimed = claimed
+        self.reason = reason
+        self.job = job
+
+    def __bool__(self):
+        return self.claimed
+
+
+class _Connection:
+    # sqlite3.Connection como context manager que además cierra la conexión
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        self.conn.close()
+        return False
+
+
+def _row_dict(row):
+    return dict(row) if row is not None else None
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = JobLedger()
+    return _ledger
+
+
+class _LeaseHeartbeat:
+    def __init__(self, ledger, jobs, owner, interval):
+        self.ledger = ledger
+        self.jobs = list(jobs)
+        self.owner = owner
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # Los que ya no están en curso (hechos, fallidos o reclamados por otro) se dejan
+            self.jobs = [job for job in self.jobs if self.ledger.renew(*job, owner=self.owner)]
+            if not self.jobs:
+                return
+
+    def __enter__(self):
+        if self.jobs:
+            self._thread = threading.Thread(target=self._run, name="ledger-lease", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return False
+
+
+CLAIM_ERRORS = {
+    RUNNING: "El trabajo ya se está procesando en otro proceso",
+    BACKOFF: "El trabajo falló recientemente; el siguiente reintento aún no toca",
+    EXHAUSTED: "El trabajo ha agotado sus reintentos"
+}
+
+
+def run_job(year, gp_round, session, kind, func, force=False, ledger=None):
+    """
+    Ejecuta func() como el trabajo (year, gp_round, session, kind).
+
+    Si ya está hecho devuelve el resultado guardado (con "ledger": "done")
+    sin ejecutar nada; si otro
+    proceso lo tiene o está en espera de reintento devuelve {"error": ...}.
+    Un resultado con clave "error" o una excepción cuentan como fallo.
+
+    Las peticiones simultáneas del mismo trabajo (en este u otros procesos)
+    esperan a la primera y comparten su resultado. Con force nunca se comparte
+    una ejecución que ya estaba en marcha al pedirlo (pudo leer datos
+    anteriores): se espera a que termine y se reprocesa, salvo que otra
+    ejecución empezada después haya terminado mientras se esperaba.
+    """
+    ledger = ledger or get_ledger()
+    flights = get_flights()
+    key = (year, gp_round, session, kind)
+    requested_at = time.time()
+    if force:
+        # Si otro proceso ya lo está ejecutando, su resultado no vale para esta petición
+        job = ledger.get(*key)
+        if job is not None and job["status"] == "running":
+            requested_at = None
+    executed = []
+
+    def run():
+        executed.append(True)
+        return _run_job(ledger, *key, func, force, requested_at)
+
+    result = flights.do(key, run, use_cache=not force)
+    if isinstance(result, dict) and "error" in result:
+        flights.forget(key)  # los errores no se reutilizan
+    elif isinstance(result, dict) and not executed:
+        # Resultado de otra llamada (en curso o recién terminada): también es una repetición
+        result = {**result, "ledger": DONE}
+    return result
+
+
+def _run_job(ledger, year, gp_round, session, kind, func, force, requested_at):
+    if force and requested_at is not None:
+        # Otra ejecución que terminó mientras se esperaba al lock ya vale
+        job = ledger.get(year, gp_round, session, kind)
+        if job is not None and job["status"] == "done" and job["updated_at"] >= requested_at:
+            force = False
+
+    claim = ledger.claim(year, gp_round, session, kind, force=force)
+    if not claim:
+        if claim.reason == DONE:
+            stored = ledger.result(year, gp_round, session, kind)
+            if isinstance(stored, dict):
+                # Marca de repetición: quien lo recibe no debe volver a aplicar sus efectos
+                return {**stored, "ledger": DONE}
+            if stored is not None:
+                return stored
+        return {"error": CLAIM_ERRORS.get(claim.reason, "Trabajo ya procesado"), "ledger": claim.reason}
+
+    try:
+        with ledger.keep_alive([(year, gp_round, session, kind)]):
+            result = func()
+    except Exception as e:
+        ledger.fail(year, gp_round, session, kind, e)
+        raise
+
+    if isinstance(result, dict) and "error" in result:
+        ledger.fail(year, gp_round, session, kind, result["error"])
+    else:
+        ledger.complete(year, gp_round, session, kind, result)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta y mantenimiento del registro de trabajos de ingesta.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pending_parser = commands.add_parser("pending", help="Trabajos de una temporada que no están hechos")
+    pending_parser.add_argument("year", type=int)
+
+    reset_parser = commands.add_parser("reset", help="Borra trabajos para volver a procesarlos")
+    reset_parser.add_argument("year", type=int)
+    reset_parser.add_argument("--round", type=int)
+    reset_parser.add_argument("--session")
+    reset_parser.add_argument("--kind")
+
+    args = parser.parse_args(argv)
+    ledger = get_ledger()
+
+    if args.command == "pending":
+        jobs = ledger.pending(args.year)
+        print(f"{'Ronda':>5}  {'Sesión':<18}  {'Tipo':<18}  {'Estado':<8}  {'Intentos':>8}  Detalle")
+        for job in jobs:
+            detail = job["last_error"] or ("listo para reintentar" if job["runnable"] else "")
+            print(f"{job['round']:>5}  {job['session']:<18}  {job['kind']:<18}  {job['status']:<8}  "
+                  f"{job['attempts']:>8}  {detail}")
+        print(f"\nTrabajos sin completar en {args.year}: {len(jobs)}")
+        return 0
+
+    removed = ledger.reset(args.year, args.round, args.session, args.kind)
+    print(f"Trabajos borrados: {removed}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import sys
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pymongo.errors import DuplicateKeyError
+from formatting import format_total_time
+from fastest_laps import fastest_lap
+from fingerprints import invalidate
+
+# Récord de vuelta en carrera de cada circuito.
+#
+# La colección 'lap_records' guarda por _id de circuito ('circuit_<Location>')
+# la vuelta más rápida en carrera vista hasta ahora: piloto, año, ronda,
+# vuelta y tiempo en nanosegundos.
+#
+# - Se siembra una vez recorriendo en paralelo las carreras ya disputadas de
+#   varias temporadas (un proceso por carrera, lee del almacén de vueltas si
+#   la carrera ya está en él).
+# - Después, cada carrera que se ingiere propone su vuelta rápida con un
+#   único update_one condicional (time_ns mayor que el propuesto, con upsert):
+#   si el récord guardado es igual o mejor no hay coincidencia, el upsert
+#   choca con el _id existente (DuplicateKeyError) y no se escribe nada.
+# - Cuando el récord mejora se copia a 'lap_record' del documento del circuito.
+#   update_circuit_document(lap_record=...) queda para correcciones manuales.
+#
+# Uso: python lap_records.py seed 2018 2025 --workers 4
+
+RECORDS_COLLECTION = "lap_records"
+
+# Columnas que se leen del almacén de vueltas
+LAP_COLUMNS = ["Driver", "LapNumber", "LapTime", "IsPersonalBest"]
+
+
+def record_from_laps(laps, results, year, gp_round):
+    """
+    Vuelta rápida de una carrera en el formato de 'lap_records'.
+
+    Parámetros:
+      laps: Vueltas de la carrera (Driver, LapNumber, LapTime, IsPersonalBest).
+      results: session.results para el DriverId del piloto (opcional).
+
+    Retorna:
+      Dict con driver ('driver_<id>'), driver_code, lap, time, time_ns, year
+      y round, o None si no hay ninguna vuelta válida.
+    """
+    if laps is None or laps.empty:
+        return None
+    lap = fastest_lap(laps)
+    if lap is None:
+        return None
+
+    code = str(lap["Driver"])
+    driver_id = None
+    if results is not None and not results.empty:
+        match = results.loc[results["Abbreviation"].astype(str) == code, "DriverId"]
+        if not match.empty:
+            driver_id = f"driver_{str(match.iloc[0]).lower()}"
+
+    return {
+        "driver": driver_id,
+        "driver_code": code,
+        "lap": int(lap["LapNumber"]),
+        "time": format_total_time(lap["LapTime"]),
+        "time_ns": int(lap["LapTime"].value),
+        "year": int(year),
+        "round": int(gp_round)
+    }
+
+
+def offer_record(circuit_id, record, db=None):
+    """
+    Guarda record como récord del circuito si mejora el actual (O(1)).
+
+    Retorna:
+      True si es el nuevo récord, False si el guardado es igual o mejor.
+    """
+    if record is None:
+        return False
+    if db is None:
+        from mongo import get_db
+        db = get_db()
+
+    try:
+        db[RECORDS_COLLECTION].update_one(
+            {"_id": circuit_id, "time_ns": {"$gt": record["time_ns"]}},
+            {"$set": record},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # Ya existe un récord igual o más rápido
+        return False
+
+    db.circuit.update_one(
+        {"_id": circuit_id},
+        invalidate({"$set": {"lap_record": {"time": record["time"], "driver": record["driver"], "year": record["year"]}}}),
+        upsert=True
+    )
+    return True
+
+
+def get_record(circuit_id, db=None):
+    if db is None:
+        from mongo import get_db
+        db = get_db()
+    return db[RECORDS_COLLECTION].find_one({"_id": circuit_id})
+
+
+def scan_race(year, gp_round):
+    """
+    Se ejecuta en un worker del pool: vuelta rápida de una carrera ya disputada.
+
+    Retorna:
+      (circuit_id, record) o None si la carrera no tiene vueltas válidas.
+    """
+    from cache_config import enable_cache
+    from schedule_index import get_fallback_data
+    from session_cache import load_session, session_laps
+
+    enable_cache()
+    fallback = get_fallback_data(year, gp_round)
+    if fallback is None:
+        return None
+    laps = session_laps(year, gp_round, "Race", columns=LAP_COLUMNS)
+    # Con las vueltas en memoria los resultados ya están; si salieron del almacén es una carga ligera
+    results = load_session(year, gp_round, "Race", profile="results").results
+    record = record_from_laps(laps, results, year, gp_round)
+    return (f"circuit_{fallback['location']}", record) if record is not None else None
+
+
+def seed(years, workers=4, db=None):
+    """
+    Siembra 'lap_records' con las carreras ya disputadas de las temporadas
+    indicadas, repartidas entre un pool de procesos. En el proceso principal
+    se queda la mejor vuelta de cada circuito y se propone con offer_record,
+    así que volver a sembrar no empeora ningún récord.
+
+    Retorna:
+      (records, failed): dict circuito -> récord propuesto y lista de
+      (año, ronda, error) de las carreras que no se pudieron leer.
+    """
+    from cache_config import finished_sessions
+    from schedule_index import get_schedule
+
+    races = [
+        (year, gp_round)
+        for year in years
+        for gp_round, name in finished_sessions(get_schedule(year).schedule)
+        if name == "Race"
+    ]
+
+    best, failed = {}, []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {executor.submit(scan_race, year, gp_round): (year, gp_round) for year, gp_round in races}
+        for future in as_completed(futures):
+            try:
+                found = future.result()
+            except Exception as e:
+                failed.append((*futures[future], str(e)))
+                continue
+            if found is None:
+                continue
+            circuit_id, record = found
+            if circuit_id not in best or record["time_ns"] < best[circuit_id]["time_ns"]:
+                best[circuit_id] = record
+
+    for circuit_id, record in best.items():
+        offer_record(circuit_id, record, db)
+    return best, sorted(failed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Récords de vuelta en carrera por circuito.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Siembra los récords con las carreras de varias temporadas")
+    seed_parser.add_argument("first_year", type=int)
+    seed_parser.add_argument("last_year", type=int)
+    seed_parser.add_argument("--workers", type=int, default=4, help="Número de procesos del pool")
+
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    records, failed = seed(range(args.first_year, args.last_year + 1), args.workers)
+    print(f"Récords de {len(records)} circuitos ({args.first_year}-{args.last_year}) "
+          f"en {time.perf_counter() - start:.1f} s\n")
+    for circuit_id, record in sorted(records.items()):
+        print(f"{circuit_id:<36} {record['time']:>10}  {record['driver_code']:<4} {record['year']}")
+    for year, gp_round, error in failed:
+        print(f"Carrera {year} ronda {gp_round} omitida: {error}")
+    return 0 if not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
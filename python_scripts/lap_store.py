@@ -0,0 +1,114 @@
+import os
+import logging
+from pathlib import Path
+import pandas as pd
+
+# Almacén columnar (Parquet) de vueltas y resultados de cada sesión cargada.
+#
+# Estructura: <LAP_STORE_DIR>/<year>/<round>/<sesion>/{laps,results}.parquet
+# Tipos:      Driver/Team/Compound/... como categorías (diccionario en Arrow),
+#             tiempos como duration/timestamp de Arrow (int64 nanosegundos).
+#
+# La lectura usa memory map y proyección de columnas, así que un builder que
+# solo necesite Driver y LapTime no lee el resto del fichero.
+#
+# Ruta absoluta: LAP_STORE_DIR o <raíz del repositorio>/gp_results, como la
+# caché de FastF1, para que Node, cron y los scripts lanzados a mano lean y
+# escriban el mismo almacén sea cual sea el directorio de trabajo.
+#
+# pyarrow es opcional: sin él, el almacén simplemente no se usa.
+
+LAP_STORE_DIR = Path(os.getenv("LAP_STORE_DIR", Path(__file__).resolve().parent.parent / "gp_results")).resolve()
+LAP_STORE_ENABLED = os.getenv("LAP_STORE", "1") != "0"
+
+CATEGORICAL_COLUMNS = [
+    "Driver", "DriverNumber", "Team", "Compound", "TrackStatus", "DeletedReason",
+    "Abbreviation", "DriverId", "TeamName", "TeamId", "Status", "ClassifiedPosition", "CountryCode"
+]
+
+
+def session_dir(year, gp_round, session_name):
+    slug = session_name.lower().replace(" ", "_")
+    return LAP_STORE_DIR / str(year) / str(gp_round) / slug
+
+
+def _compact(df):
+    # Tipos compactos y compatibles con Arrow para el DataFrame de FastF1
+    out = pd.DataFrame(df).copy()
+    for column in out.columns:
+        series = out[column]
+        if column in CATEGORICAL_COLUMNS:
+            out[column] = series.astype("string").astype("category")
+        elif series.dtype == object:
+            values = series.dropna()
+            if values.map(lambda v: isinstance(v, bool)).all():
+                out[column] = series.astype("boolean")
+            else:
+                out[column] = series.astype("string").astype("category")
+    return out
+
+
+def _write(df, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(_compact(df), preserve_index=False)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def save_session(session, year, gp_round, session_name, laps=True):
+    """
+    Guarda los resultados (y las vueltas si laps=True) de una sesión ya cargada.
+    Los errores se registran y no interrumpen el procesamiento.
+    """
+    if not LAP_STORE_ENABLED:
+        return False
+
+    try:
+        directory = session_dir(year, gp_round, session_name)
+        if session.results is not None and not session.results.empty:
+            _write(session.results, directory / "results.parquet")
+        if laps and session.laps is not None and not session.laps.empty:
+            _write(session.laps, directory / "laps.parquet")
+        return True
+    except ImportError:
+        return False
+    except Exception as e:
+        logging.warning(f"No se pudo guardar {session_name} {year}-{gp_round} en el almacén de vueltas: {e}")
+        return False
+
+
+def has_table(year, gp_round, session_name, table="laps"):
+    return (session_dir(year, gp_round, session_name) / f"{table}.parquet").exists()
+
+
+def read_table(year, gp_round, session_name, table="laps", columns=None):
+    # Tabla Arrow con memory map y solo las columnas pedidas (las que no existan se ignoran)
+    import pyarrow.parquet as pq
+
+    path = session_dir(year, gp_round, session_name) / f"{table}.parquet"
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+
+def read_laps(year, gp_round, session_name, columns=None):
+    """
+    Devuelve las vueltas guardadas como DataFrame, o None si no existen.
+
+    Parámetros:
+      columns: Lista de columnas a leer (None = todas).
+    """
+    if not has_table(year, gp_round, session_name, "laps"):
+        return None
+    return read_table(year, gp_round, session_name, "laps", columns).to_pandas()
+
+
+def read_results(year, gp_round, session_name, columns=None):
+    if not has_table(year, gp_round, session_name, "results"):
+        return None
+    return read_table(year, gp_round, session_name, "results", columns).to_pandas()
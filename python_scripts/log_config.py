@@ -0,0 +1,17 @@
+import logging
+from logging.handlers import RotatingFileHandler
+
+# Cada script escribe en su propio fichero de log rotativo. El handler se
+# instala la primera vez que se pide el logger, no al importar el módulo, y
+# sin tocar el logger raíz (en un worker conviven varios scripts).
+
+
+def get_logger(name, filename):
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = RotatingFileHandler(filename, maxBytes=5*1024*1024, backupCount=3)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
@@ -0,0 +1,229 @@
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from lap_store import CATEGORICAL_COLUMNS
+
+# Modo de memoria para cargas grandes (p.ej. recargar una temporada).
+#
+# Con MEMORY_MODE=1:
+#   - de las sesiones de FastF1 solo se guardan las columnas que usan los
+#     builders, con tipos compactos (categorías para Driver/Team/Compound/
+#     Status..., float32 para contadores; los tiempos ya son int64 en ns);
+#   - cada ronda libera sus sesiones de session_cache en cuanto se han
+#     construido sus documentos.
+# Con MEMORY_BUDGET_MB > 0 la carga de sesiones en paralelo y el reparto de
+# rondas de backfill_season esperan mientras el RSS supere el presupuesto
+# (siempre se deja avanzar al menos una tarea, así que nunca se bloquea).
+#
+# El RSS se mide con psutil; sin psutil solo se dispone del pico del proceso
+# (resource) y el presupuesto no se aplica.
+
+MEMORY_MODE = os.getenv("MEMORY_MODE", "0") == "1"
+MEMORY_BUDGET_MB = float(os.getenv("MEMORY_BUDGET_MB", "0"))
+
+# Cada cuánto se mide el RSS al vigilar el pico o esperar al presupuesto
+SAMPLE_SECONDS = 0.05
+
+# Columnas de la carrera que usan los documentos (circuito, carrera, stints,
+# gráfico de posiciones y récord de vuelta)
+RACE_LAP_COLUMNS = [
+    "Driver", "Team", "LapNumber", "LapTime", "Time", "Position", "Stint", "Compound", "TyreLife",
+    "PitInTime", "PitOutTime", "Deleted", "TrackStatus", "IsPersonalBest"
+]
+RACE_RESULT_COLUMNS = [
+    "DriverId", "Abbreviation", "TeamId", "TeamName", "Position", "ClassifiedPosition",
+    "GridPosition", "Time", "Status", "Points"
+]
+
+
+def _process(pid=None):
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process(pid)
+
+
+def rss_mb(include_children=False):
+    """
+    RSS actual del proceso en MB (y de sus hijos si include_children), o
+    None si psutil no está disponible.
+    """
+    process = _process()
+    if process is None:
+        return None
+    total = process.memory_info().rss
+    if include_children:
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except Exception:
+                continue  # El hijo ha terminado entre la lista y la lectura
+    return total / (1024 * 1024)
+
+
+def max_rss_mb():
+    # Pico de RSS del proceso desde que arrancó (Linux: ru_maxrss en KB)
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class PeakTracker:
+    """
+    Pico de RSS durante un bloque, medido por un hilo cada SAMPLE_SECONDS.
+
+    Uso:
+      with PeakTracker() as tracker:
+          build_gp_documents(2025, 5)
+      print(tracker.peak_mb)
+    """
+
+    def __init__(self, include_children=False):
+        self.include_children = include_children
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        current = rss_mb(self.include_children)
+        if current is not None and (self.peak_mb is None or current > self.peak_mb):
+            self.peak_mb = current
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_SECONDS):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        if self.peak_mb is not None:
+            self._thread = threading.Thread(target=self._run, name="rss-peak", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._sample()
+        else:
+            # Sin psutil: pico del proceso completo
+            self.peak_mb = max_rss_mb()
+        return False
+
+
+class MemoryBudget:
+    """
+    Limita cuántas tareas avanzan a la vez según el RSS.
+
+    Una tarea nueva espera mientras el RSS supere limit_mb y haya otras en
+    curso; sin tareas en curso entra siempre. Con limit_mb <= 0 (o sin
+    psutil) no se limita nada.
+    """
+
+    def __init__(self, limit_mb=MEMORY_BUDGET_MB, include_children=False):
+        self.limit_mb = limit_mb
+        self.include_children = include_children
+        self.active = 0
+        self.throttled = 0
+        self._condition = threading.Condition()
+
+    @property
+    def enabled(self):
+        return self.limit_mb > 0 and _process() is not None
+
+    def over(self):
+        current = rss_mb(self.include_children) if self.enabled else None
+        return current is not None and current > self.limit_mb
+
+    def acquire(self):
+        if not self.enabled:
+            return
+        with self._condition:
+            waited = False
+            while self.active > 0 and self.over():
+                waited = True
+                self._condition.wait(SAMPLE_SECONDS)
+            self.throttled += int(waited)
+            self.active += 1
+
+    def release(self):
+        if not self.enabled:
+            return
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_budget():
+    # Presupuesto compartido por los hilos del proceso
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = MemoryBudget()
+        return _budget
+
+
+def compact_frame(df, columns=None):
+    """
+    Copia de un DataFrame de FastF1 con solo las columnas indicadas (las que
+    existan) y tipos compactos: texto repetido como categoría y float64 como
+    float32. Los tiempos (timedelta64[ns], int64 por dentro) se mantienen.
+    """
+    if df is None:
+        return None
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    # DataFrame normal: Laps/SessionResults de FastF1 guardan una referencia a la sesión
+    out = pd.DataFrame(df, copy=True)
+    for column in out.columns:
+        series = out[column]
+        if column in CATEGORICAL_COLUMNS and series.dtype == object:
+            out[column] = series.astype("category")
+        elif series.dtype == np.float64:
+            out[column] = series.astype(np.float32)
+    return out
+
+
+class CompactSession:
+    """
+    Lo que los builders usan de una sesión de FastF1 (nombre, fechas,
+    evento, vueltas, resultados y vueltas totales), sin mantener viva la
+    sesión: vueltas y resultados recortados con compact_frame.
+    """
+
+    def __init__(self, session, lap_columns=RACE_LAP_COLUMNS, result_columns=RACE_RESULT_COLUMNS):
+        self.name = session.name
+        self.date = session.date
+        self.event = session.event
+        self.session_duration = getattr(session, "session_duration", None)
+        try:
+            self.total_laps = session.total_laps
+        except Exception:
+            self.total_laps = None
+        self.laps = compact_frame(session.laps, lap_columns)
+        self.results = compact_frame(session.results, result_columns)
+
+
+def release_round(year, gp_round):
+    # Suelta las sesiones de la ronda del memo y recoge los ciclos de FastF1 al momento
+    import gc
+    from session_cache import release
+
+    release(year, gp_round)
+    gc.collect()
+
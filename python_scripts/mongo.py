@@ -0,0 +1,22 @@
+import os
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# Cliente MongoDB por proceso: cada worker de un pool crea el suyo propio
+# (PyMongo no es seguro tras un fork, por eso se comprueba el pid).
+_client = None
+_client_pid = None
+
+
+def get_client():
+    global _client, _client_pid
+
+    if _client is None or _client_pid != os.getpid():
+        load_dotenv()
+        _client = MongoClient(os.getenv("MONGO_URI"))
+        _client_pid = os.getpid()
+    return _client
+
+
+def get_db():
+    return get_client().gridmetrics  # Nombre de la base de datos
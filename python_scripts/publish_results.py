@@ -0,0 +1,44 @@
+from pymongo import ReturnDocument
+from mongo import get_db
+from fingerprints import invalidate
+
+
+def publish_session_result(year, round_number, session_name, session_result, extra_fields=None):
+    """
+    Escribe el objeto ordinal de resultados directamente en
+    'sessions.$.session_result' de la carrera correspondiente.
+
+    Parámetros:
+      year, round_number: Temporada y ronda de la carrera.
+      session_name: Nombre de la sesión en el documento ('Qualifying', 'Race', ...).
+      session_result: Objeto ordinal { first: {...}, second: {...}, ... }.
+      extra_fields: Campos adicionales del documento a actualizar (p.ej. race_results).
+
+    Retorna:
+      El documento de la carrera ya actualizado, o None si no existe.
+    """
+    update_fields = {"sessions.$.session_result": session_result}
+    if extra_fields:
+        update_fields.update(extra_fields)
+
+    # Una sola operación: actualiza y devuelve el documento (sin volver a consultarlo).
+    # Se quita la huella para que la próxima reconstrucción de la carrera no se omita.
+    return get_db().races.find_one_and_update(
+        {"sessions.name": session_name, "round": round_number, "date": {"$gte": f"{year}-01-01", "$lte": f"{year}-12-31"}},
+        invalidate({"$set": update_fields}),
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def race_results_array(session_result):
+    # Misma forma que construía Node para 'race_results'
+    entries = [
+        {
+            "driver": r["driver"],
+            "time": r.get("time"),
+            "position": int(r["position"]["Position"])
+        }
+        for r in session_result.values()
+        if isinstance(r, dict) and r.get("driver") and r.get("position", {}).get("Position")
+    ]
+    return sorted(entries, key=lambda r: r["position"])
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# Datos del gráfico de posiciones de una carrera.
+#
+# A partir de las vueltas de la sesión (ya cargadas para el documento de la
+# carrera) se construyen de una vez dos matrices vuelta x piloto:
+#   - posición al final de cada vuelta (0 = sin dato / abandonado)
+#   - diferencia con el líder al final de cada vuelta
+# y se guardan compactas en la colección 'race_charts' con el mismo _id que
+# la carrera:
+#   - positions: por piloto, runs [posición, nº de vueltas, posición, ...]
+#   - gaps: por piloto, décimas de segundo (None sin dato)
+
+CHARTS_COLLECTION = "race_charts"
+
+
+def run_length_encode(values):
+    """
+    Codifica un array 1D como [valor, repeticiones, valor, repeticiones, ...].
+    """
+    values = np.asarray(values)
+    if len(values) == 0:
+        return []
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    lengths = np.diff(np.append(starts, len(values)))
+    return np.column_stack((values[starts], lengths)).ravel().tolist()
+
+
+def run_length_decode(runs):
+    runs = np.asarray(runs, dtype=np.int64).reshape(-1, 2)
+    return np.repeat(runs[:, 0], runs[:, 1])
+
+
+def lap_matrices(laps):
+    """
+    Matrices vuelta x piloto con un único pivot vectorizado.
+
+    Retorna:
+      (drivers, positions, gaps): positions int16 (0 sin dato) y gaps float64
+      en segundos (NaN sin dato), de forma (vueltas, pilotos).
+    """
+    laps = laps[laps["LapNumber"].notna()]
+    driver_codes, drivers = pd.factorize(laps["Driver"].astype(str), sort=True)
+    lap_index = laps["LapNumber"].to_numpy(dtype=np.int64) - 1
+    n_laps = int(lap_index.max()) + 1 if len(lap_index) else 0
+
+    positions = np.zeros((n_laps, len(drivers)), dtype=np.int16)
+    position_values = laps["Position"].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(position_values)
+    positions[lap_index[valid], driver_codes[valid]] = position_values[valid]
+
+    # Tiempo de sesión al cerrar cada vuelta; el líder es el primero en cerrarla
+    times = np.full((n_laps, len(drivers)), np.nan)
+    times[lap_index, driver_codes] = pd.to_timedelta(laps["Time"]).dt.total_seconds().to_numpy()
+    leader = np.min(np.where(np.isnan(times), np.inf, times), axis=1, keepdims=True)
+    gaps = np.where(np.isfinite(leader), times - leader, np.nan)
+    return list(drivers), positions, gaps
+
+
+def build_chart_document(race_id, year, gp_round, laps, results=None):
+    """
+    Documento de 'race_charts' para una carrera, o None si no hay vueltas.
+    """
+    if laps is None or laps.empty or "Position" not in laps:
+        return None
+
+    drivers, positions, gaps = lap_matrices(laps)
+    tenths = np.where(np.isnan(gaps), -1, np.round(gaps * 10)).astype(np.int64)
+
+    driver_ids, grid = {}, {}
+    if results is not None and not results.empty:
+        abbreviations = results["Abbreviation"].astype(str)
+        driver_ids = dict(zip(abbreviations, results["DriverId"].astype(str).str.lower()))
+        if "GridPosition" in results:
+            grid = dict(zip(abbreviations, results["GridPosition"].fillna(0).astype(int)))
+
+    return {
+        "_id": race_id,
+        "year": int(year),
+        "round": int(gp_round),
+        "laps": int(positions.shape[0]),
+        "encoding": {"positions": "rle", "gaps": "decisegundos"},
+        "drivers": [
+            {
+                "driver": driver,
+                "driver_id": driver_ids.get(driver),
+                "grid": int(grid[driver]) if driver in grid else None,
+                "positions": run_length_encode(positions[:, i]),
+                "gaps": [int(g) if g >= 0 else None for g in tenths[:, i]]
+            }
+            for i, driver in enumerate(drivers)
+        ]
+    }
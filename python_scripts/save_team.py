@@ -1,4 +1,6 @@
-def save_team(db, team_id, team_data):
+from bulk_writer import BulkWriter
+
+def save_team(db, team_id, team_data, writer=None):
     """
     Inserta o actualiza un documento de equipo en la colección 'teams'.
 
@@ -6,18 +8,21 @@ def save_team(db, team_id, team_data):
       db: Conexión MongoDB.
       team_id: ID único del equipo (por ejemplo 'red_bull').
       team_data: Diccionario con los campos del equipo según el modelo.
+      writer: BulkWriter opcional; si se indica, la escritura queda en cola
+              hasta su flush y los totales se consultan en writer.totals.
 
     Retorna:
       matched_count, modified_count
     """
-    collection = db["teams"]
     document_id = f"team_{team_id}"
 
-    result = collection.update_one(
-        {"_id": document_id},
-        {"$set": team_data},
-        upsert=True
-    )
+    if writer is not None:
+        writer.upsert("teams", document_id, team_data)
+        return 0, 0
+
+    with BulkWriter(db) as own_writer:
+        own_writer.upsert("teams", document_id, team_data)
 
-    print(f"Equipo guardado. Coincidentes: {result.matched_count}, modificados: {result.modified_count}")
-    return result.matched_count, result.modified_count
\ No newline at end of file
+    totals = own_writer.totals
+    print(f"Equipo guardado. Coincidentes: {totals['matched']}, modificados: {totals['modified']}")
+    return totals["matched"], totals["modified"]
@@ -0,0 +1,150 @@
+import os
+import time
+import threading
+from collections import namedtuple
+import pandas as pd
+
+# Índice del calendario de FastF1 por temporada.
+#
+# fastf1.get_event() y fastf1.get_event_schedule() descargan (o leen de la
+# caché HTTP) y parsean el calendario completo en cada llamada. Aquí cada
+# temporada se carga una vez por proceso y se mantiene SCHEDULE_TTL_SECONDS;
+# al cargarla se extraen por ronda el Event de FastF1, los datos de respaldo
+# del GP y la lista de sesiones, de modo que cada consulta es un acceso a dict.
+
+SCHEDULE_TTL = float(os.getenv("SCHEDULE_TTL_SECONDS", "3600"))
+
+# Lo que se guarda de cada ronda del calendario
+RoundRecord = namedtuple("RoundRecord", ["round", "event", "fallback", "session_names"])
+
+
+class SeasonSchedule:
+    """
+    Calendario de una temporada ya indexado por ronda.
+
+    Atributos:
+      year: Temporada.
+      schedule: EventSchedule de FastF1 (sin tests de pretemporada).
+      rounds: Dict ronda -> RoundRecord.
+      loaded_at: time.monotonic() de la carga.
+    """
+
+    def __init__(self, year, schedule):
+        self.year = year
+        self.schedule = schedule
+        self.loaded_at = time.monotonic()
+        self.rounds = {}
+        for row in schedule.to_dict("records"):
+            gp_round = int(row["RoundNumber"])
+            if gp_round == 0:
+                continue
+            fallback = _fallback_record(row)
+            self.rounds[gp_round] = RoundRecord(
+                round=gp_round,
+                event=schedule.get_event_by_round(gp_round),
+                fallback=fallback,
+                session_names=tuple(s["name"] for s in fallback["sessions"])
+            )
+
+    def expired(self, ttl=SCHEDULE_TTL):
+        return time.monotonic() - self.loaded_at > ttl
+
+    def record(self, gp_round):
+        return self.rounds.get(int(gp_round))
+
+
+def _date_str(value):
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+def _fallback_record(row):
+    # Mismo formato que devolvía get_fallback_data al filtrar el calendario
+    sessions = []
+    for i in range(1, 6):
+        session_name = row.get(f"Session{i}")
+        if session_name and pd.notnull(session_name):
+            sessions.append({
+                "name": session_name,
+                "date_local": _date_str(row.get(f"Session{i}Date")),
+                "date_utc": _date_str(row.get(f"Session{i}DateUtc"))
+            })
+
+    return {
+        "date": pd.to_datetime(row["EventDate"]).date().strftime("%Y-%m-%d"),
+        "official_name": row["OfficialEventName"],
+        "name": row["EventName"],
+        "location": row["Location"],
+        "country": row["Country"],
+        "format": row["EventFormat"],
+        "sessions": sessions
+    }
+
+
+_seasons = {}
+_lock = threading.Lock()
+_year_locks = {}
+
+
+def get_schedule(year, ttl=SCHEDULE_TTL):
+    """
+    Devuelve el SeasonSchedule de la temporada, cargándolo si no está en
+    memoria o ha caducado. Varias peticiones a la vez solo lo cargan una vez.
+    """
+    year = int(year)
+    with _lock:
+        season = _seasons.get(year)
+        if season is not None and not season.expired(ttl):
+            return season
+        year_lock = _year_locks.setdefault(year, threading.Lock())
+
+    with year_lock:
+        with _lock:
+            season = _seasons.get(year)
+        if season is not None and not season.expired(ttl):
+            return season
+
+        import fastf1
+
+        season = SeasonSchedule(year, fastf1.get_event_schedule(year, include_testing=False))
+        with _lock:
+            _seasons[year] = season
+        return season
+
+
+def get_event(year, gp_round):
+    """
+    Equivalente a fastf1.get_event(year, ronda) servido desde el índice.
+
+    Lanza ValueError si la ronda no está en el calendario, igual que FastF1.
+    """
+    record = get_schedule(year).record(gp_round)
+    if record is None:
+        raise ValueError(f"Ronda no válida: {gp_round}")
+    return record.event
+
+
+def get_fallback_data(year, gp_round):
+    """
+    Datos del GP según el calendario (fecha, nombres, lugar, formato y
+    sesiones), o None si la ronda no existe.
+    """
+    record = get_schedule(year).record(gp_round)
+    if record is None:
+        return None
+    # Copia: quien la recibe puede modificarla sin tocar el índice
+    return {**record.fallback, "sessions": [dict(s) for s in record.fallback["sessions"]]}
+
+
+def session_names(year, gp_round):
+    record = get_schedule(year).record(gp_round)
+    return list(record.session_names) if record is not None else []
+
+
+def clear(year=None):
+    with _lock:
+        if year is None:
+            _seasons.clear()
+        else:
+            _seasons.pop(int(year), None)
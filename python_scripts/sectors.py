@@ -0,0 +1,143 @@
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+# Análisis por sectores de una sesión de libres o clasificación.
+#
+# Sobre el DataFrame de vueltas completo (todos los pilotos a la vez):
+#   - mejor vuelta y mejor Sector1/2/3 de cada piloto con un único
+#     np.minimum.at por grupos (sin recorrer los pilotos en Python);
+#   - vuelta ideal = suma de los tres mejores sectores;
+#   - para cada sector y para la vuelta ideal: posición (empates con la misma
+#     posición) y diferencia con el mejor.
+# Las vueltas borradas (límites de pista) no cuentan.
+#
+# Las vueltas se piden a session_cache.session_laps: si la sesión ya está en
+# memoria o en el almacén de vueltas no se vuelve a cargar.
+#
+# Uso: python sectors.py 2025 5 Q
+
+SECTOR_COLUMNS = ["Sector1Time", "Sector2Time", "Sector3Time"]
+
+# Columnas que se leen del almacén de vueltas
+LAP_COLUMNS = ["Driver", "LapTime", *SECTOR_COLUMNS, "Deleted"]
+
+
+def _seconds(series):
+    return pd.to_timedelta(series).dt.total_seconds().to_numpy(dtype=np.float64)
+
+
+def best_times(laps):
+    """
+    Mejor vuelta y mejores sectores de cada piloto.
+
+    Retorna:
+      (drivers, best): best float64 de forma (pilotos, 4) con LapTime,
+      Sector1, Sector2 y Sector3 en segundos (inf = sin tiempo).
+    """
+    if "Deleted" in laps:
+        laps = laps[~laps["Deleted"].fillna(False).astype(bool).to_numpy()]
+    codes, drivers = pd.factorize(laps["Driver"].astype(str), sort=True)
+
+    times = np.column_stack([_seconds(laps[column]) for column in ("LapTime", *SECTOR_COLUMNS)])
+    times[np.isnan(times)] = np.inf
+    best = np.full((len(drivers), times.shape[1]), np.inf)
+    np.minimum.at(best, codes, times)
+    return list(drivers), best
+
+
+def _rankings(values):
+    # Posición (1 = mejor, empates comparten posición) y diferencia con el mejor por columna
+    ordered = np.sort(values, axis=0)
+    ranks = np.column_stack([
+        np.searchsorted(ordered[:, j], values[:, j], side="left") + 1 for j in range(values.shape[1])
+    ])
+    with np.errstate(invalid="ignore"):
+        gaps = values - ordered[0]
+    return ranks, gaps
+
+
+def sector_analysis(laps, results=None):
+    """
+    Mejores sectores, vuelta ideal y clasificación por sector de una sesión.
+
+    Parámetros:
+      laps: Vueltas de la sesión (Driver, LapTime, Sector1Time, Sector2Time,
+            Sector3Time y, si existe, Deleted).
+      results: session.results opcional para añadir el DriverId de cada piloto.
+
+    Retorna:
+      Lista ordenada por vuelta ideal de {"driver", "driver_id", "best_lap",
+      "sectors": [{"time", "rank", "gap"} x3], "theoretical": {"time",
+      "rank", "gap"}, "potential"}; tiempos en segundos, None si no hay
+      tiempo. potential es lo que separa la mejor vuelta de la ideal.
+    """
+    if laps is None or laps.empty or not set(SECTOR_COLUMNS) <= set(laps.columns):
+        return []
+
+    drivers, best = best_times(laps)
+    theoretical = best[:, 1:].sum(axis=1)
+
+    # Columnas: Sector1, Sector2, Sector3 y vuelta ideal
+    values = np.column_stack([best[:, 1:], theoretical])
+    ranks, gaps = _rankings(values)
+
+    driver_ids = {}
+    if results is not None and not results.empty and {"Abbreviation", "DriverId"} <= set(results.columns):
+        driver_ids = dict(zip(results["Abbreviation"].astype(str), results["DriverId"].astype(str).str.lower()))
+
+    analysis = []
+    for i in np.lexsort((np.arange(len(drivers)), values[:, 3])):
+        timed = np.isfinite(values[i])
+        entries = [
+            {
+                "time": _round(values[i, j]),
+                "rank": int(ranks[i, j]) if timed[j] else None,
+                "gap": _round(gaps[i, j])
+            }
+            for j in range(values.shape[1])
+        ]
+        analysis.append({
+            "driver": drivers[i],
+            "driver_id": driver_ids.get(drivers[i]),
+            "best_lap": _round(best[i, 0]),
+            "sectors": entries[:3],
+            "theoretical": entries[3],
+            "potential": _round(best[i, 0] - theoretical[i]) if timed[3] else None
+        })
+    return analysis
+
+
+def session_sectors(year, gp_round, session_name, results=None):
+    """
+    Análisis por sectores de una sesión a partir de las vueltas ya en memoria
+    o en el almacén de vueltas (solo se carga la sesión si no están en ninguno).
+    """
+    from session_cache import session_laps
+
+    return sector_analysis(session_laps(year, gp_round, session_name, columns=LAP_COLUMNS), results)
+
+
+def _round(value, digits=3):
+    return round(float(value), digits) if np.isfinite(value) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mejores sectores y vuelta ideal de una sesión.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("round", type=int)
+    parser.add_argument("session", help="Sesión ('Q', 'SQ', 'FP1', ...)")
+    args = parser.parse_args(argv)
+
+    from cache_config import enable_cache
+
+    enable_cache()
+    analysis = session_sectors(args.year, args.round, args.session)
+    print(json.dumps(analysis, separators=(",", ":"), ensure_ascii=False))
+    return 0 if analysis else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import fastf1
+import lap_store
+import cache_config
+from instrumentation import span
+from single_flight import get_flights
+from memory_budget import get_budget
+
+# Memo de sesiones por proceso: cada sesión de un fin de semana se parsea como
+# mucho una vez, identificada por (año, ronda, nombre de sesión).
+#
+# Cada consumidor pide un perfil de carga con solo los datos que usa; si la
+# sesión ya está cargada con un perfil que lo cubre, se reutiliza.
+#
+# El memo es seguro entre hilos: load_sessions carga las sesiones de un fin
+# de semana en paralelo y, si dos hilos piden la misma sesión, solo uno la
+# carga mientras el otro espera. Entre procesos, la carga de cada
+# (año, ronda, sesión, perfil) se coordina con single_flight: el segundo
+# proceso espera al primero y lee la caché de FastF1 ya descargada.
+
+LOAD_PROFILES = {
+    # Solo clasificación oficial (results)
+    "results": {"laps": False, "telemetry": False, "weather": False, "messages": False},
+    # Vueltas; los mensajes de dirección de carrera marcan las vueltas borradas
+    "laps": {"laps": True, "telemetry": False, "weather": False, "messages": True},
+    "telemetry": {"laps": True, "telemetry": True, "weather": False, "messages": True},
+    "full": {"laps": True, "telemetry": True, "weather": True, "messages": True}
+}
+
+# Alias aceptados por fastf1 -> nombre canónico de la sesión
+SESSION_ALIASES = {
+    "FP1": "Practice 1",
+    "FP2": "Practice 2",
+    "FP3": "Practice 3",
+    "SQ": "Sprint Qualifying",
+    "SS": "Sprint Shootout",
+    "S": "Sprint",
+    "Q": "Qualifying",
+    "R": "Race"
+}
+
+# Sesiones cuya clasificación se calcula con las vueltas si no hay resultado oficial
+QUALIFYING_SESSIONS = {"Qualifying", "Sprint Qualifying", "Sprint Shootout"}
+
+# Rondas que se mantienen en memoria (los workers persistentes viven mucho tiempo)
+MAX_ROUNDS = int(os.getenv("SESSION_MEMO_ROUNDS", "2"))
+
+# Sesiones de un fin de semana que se cargan a la vez
+LOAD_CONCURRENCY = int(os.getenv("SESSION_LOAD_CONCURRENCY", "4"))
+
+_sessions = OrderedDict()
+_lock = threading.RLock()
+# Lock de carga por sesión -> [lock, hilos que lo usan]; solo se borra sin usuarios
+_key_locks = {}
+
+
+def session_key(year, gp_round, name):
+    return int(year), int(gp_round), SESSION_ALIASES.get(name, name)
+
+
+def _covers(loaded, wanted):
+    return all(loaded[k] or not wanted[k] for k in wanted)
+
+
+def load_session(year, gp_round, name, profile="results", event=None):
+    """
+    Devuelve la sesión cargada con, al menos, los datos del perfil pedido.
+
+    Parámetros:
+      year, gp_round: Temporada y ronda.
+      name: Nombre o alias de la sesión ('Race', 'Q', 'FP1', ...).
+      profile: Clave de LOAD_PROFILES.
+      event: Evento de fastf1 ya obtenido (evita consultar de nuevo el calendario).
+    """
+    key = session_key(year, gp_round, name)
+    wanted = LOAD_PROFILES[profile]
+
+    session = _cached(key, wanted)
+    if session is not None:
+        return session
+
+    # El memo ya guarda la sesión: sin caché de resultados en single_flight
+    return get_flights().do((*key, profile), lambda: _load_once(key, wanted, profile, event), ttl=0)
+
+
+def _load_once(key, wanted, profile, event):
+    with _lock:
+        entry = _key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+
+    try:
+        with entry[0]:
+            # Otro hilo puede haberla cargado mientras se esperaba el lock
+            session = _cached(key, wanted)
+            if session is not None:
+                return session
+            return _load(key, wanted, profile, event)
+    finally:
+        with _lock:
+            entry[1] -= 1
+            if entry[1] == 0 and key not in _sessions and _key_locks.get(key) is entry:
+                del _key_locks[key]
+
+
+def _cached(key, wanted):
+    with _lock:
+        cached = _sessions.get(key)
+        if cached is not None and _covers(cached[1], wanted):
+            _sessions.move_to_end(key)
+            return cached[0]
+    return None
+
+
+def _load(key, wanted, profile, event):
+    with _lock:
+        cached = _sessions.get(key)
+
+    # Si hay que recargar, se pide la unión de lo ya cargado y lo nuevo
+    flags = dict(wanted) if cached is None else {k: cached[1][k] or wanted[k] for k in wanted}
+
+    with span("session.load", year=key[0], round=key[1], session=key[2], profile=profile):
+        if event is not None:
+            session = event.get_session(key[2])
+        else:
+            session = fastf1.get_session(key[0], key[1], key[2])
+        session.load(**flags)
+    cache_config.mark_used(session)
+
+    # Copia columnar de vueltas/resultados para análisis posteriores sin recargar la sesión
+    with span("lap_store.save", year=key[0], round=key[1], session=key[2]):
+        lap_store.save_session(session, key[0], key[1], key[2], laps=flags["laps"])
+
+    with _lock:
+        _sessions[key] = (session, flags)
+        _sessions.move_to_end(key)
+        _evict(key)
+    return session
+
+
+def results_profile(name):
+    # Clasificaciones: FastF1 solo rellena Position/Q1-Q3 a partir de las
+    # vueltas cuando Ergast aún no tiene el resultado, así que necesitan 'laps'
+    if session_key(0, 0, name)[2] in QUALIFYING_SESSIONS:
+        return "laps"
+    return "results"
+
+
+def session_laps(year, gp_round, name, columns=None, event=None):
+    """
+    Vueltas de una sesión sin volver a cargarla si ya se tienen: primero la
+    sesión en memoria (si se cargó con vueltas), después el almacén de vueltas
+    (solo las columnas pedidas) y, si no están en ninguno, se carga la sesión
+    con el perfil 'laps'.
+
+    Parámetros:
+      columns: Columnas a devolver (las que no existan se ignoran; None = todas).
+
+    Retorna:
+      DataFrame de vueltas.
+    """
+    key = session_key(year, gp_round, name)
+    session = _cached(key, LOAD_PROFILES["laps"])
+
+    if session is None and lap_store.LAP_STORE_ENABLED:
+        try:
+            laps = lap_store.read_laps(*key, columns=columns)
+        except Exception as e:
+            logging.warning(f"No se pudieron leer las vueltas de {key[2]} {key[0]}-{key[1]} del almacén: {e}")
+            laps = None
+        if laps is not None:
+            return laps
+
+    if session is None:
+        session = load_session(year, gp_round, name, profile="laps", event=event)
+    laps = session.laps
+    if columns is not None:
+        laps = laps[[c for c in columns if c in laps.columns]]
+    return laps
+
+
+def load_sessions(year, gp_round, requests, event=None, max_workers=LOAD_CONCURRENCY):
+    """
+    Carga varias sesiones de una ronda en paralelo.
+
+    Parámetros:
+      requests: Lista de (nombre, perfil) en el orden en que se quieren los resultados.
+      max_workers: Sesiones cargadas a la vez.
+
+    Retorna:
+      Lista de (nombre, sesión, error) en el mismo orden que requests. Si una
+      sesión falla, su sesión es None y error la excepción; el resto se carga igual.
+    """
+    def load_one(name, profile):
+        # Con MEMORY_BUDGET_MB, una carga espera si el proceso ya supera el presupuesto
+        try:
+            with get_budget().slot():
+                return name, load_session(year, gp_round, name, profile=profile, event=event), None
+        except Exception as e:
+            return name, None, e
+
+    if max_workers <= 1 or len(requests) <= 1:
+        return [load_one(name, profile) for name, profile in requests]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+        futures = [executor.submit(load_one, name, profile) for name, profile in requests]
+        return [future.result() for future in futures]
+
+
+def _evict(latest):
+    # Descarta las rondas menos usadas recientemente por encima de MAX_ROUNDS
+    rounds = []
+    for key in reversed(_sessions):
+        if key[:2] not in rounds:
+            rounds.append(key[:2])
+    for key in list(_sessions):
+        if key[:2] not in rounds[:MAX_ROUNDS] and key[:2] != latest[:2]:
+            del _sessions[key]
+    # Un lock que algún hilo ya ha obtenido (aunque aún espere por él) no se borra:
+    # el siguiente crearía otro y la sesión se cargaría dos veces a la vez
+    for key, (_, users) in list(_key_locks.items()):
+        if key not in _sessions and users == 0:
+            del _key_locks[key]
+
+
+def release(year, gp_round, name=None):
+    # Libera una sesión concreta o todas las de una ronda
+    with _lock:
+        for key in list(_sessions):
+            if key[:2] == (int(year), int(gp_round)) and (name is None or key[2] == SESSION_ALIASES.get(name, name)):
+                del _sessions[key]
+
+
+def clear():
+    with _lock:
+        _sessions.clear()
@@ -0,0 +1,177 @@
+import os
+import re
+import time
+import threading
+from pathlib import Path
+
+# Coalescencia de trabajos repetidos ("single-flight").
+#
+# Si varias peticiones piden a la vez lo mismo (misma sesión y perfil de carga,
+# mismo trabajo de resultados), solo la primera lo ejecuta y las demás esperan
+# y reciben su resultado (o su excepción).
+#
+# - Dentro de un proceso: los hilos que llegan con la clave en curso esperan
+#   al primero.
+# - Entre procesos (workers del pool, scheduler, scripts a mano): el que
+#   ejecuta mantiene un flock sobre SINGLE_FLIGHT_LOCK_DIR/<clave>.lock; los
+#   demás esperan al lock y después encuentran la caché de FastF1 caliente o
+#   el trabajo hecho en el registro de trabajos. Sin fcntl (Windows) solo se
+#   coalesce dentro del proceso.
+# - Los resultados se guardan ttl segundos (SINGLE_FLIGHT_TTL) para absorber
+#   las ráfagas justo después de terminar.
+
+LOCK_DIR = Path(os.getenv("SINGLE_FLIGHT_LOCK_DIR", Path(__file__).resolve().parent.parent / "locks")).resolve()
+RESULT_TTL = float(os.getenv("SINGLE_FLIGHT_TTL", "60"))
+LOCK_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "600"))
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class _Call:
+    def __init__(self, use_cache=True):
+        self.done = threading.Event()
+        self.use_cache = use_cache
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Ejecuta como mucho una vez a la vez cada clave.
+
+    Uso:
+      flights = SingleFlight()
+      session = flights.do((2025, 5, "Race", "results"), lambda: cargar(...))
+    """
+
+    def __init__(self, ttl=RESULT_TTL, lock_dir=LOCK_DIR, lock_timeout=LOCK_TIMEOUT):
+        self.ttl = ttl
+        self.lock_dir = Path(lock_dir)
+        self.lock_timeout = lock_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._results = {}
+
+    def do(self, key, func, ttl=None, use_cache=True, cross_process=True):
+        """
+        Devuelve func() compartiendo la ejecución con las llamadas concurrentes
+        de la misma clave.
+
+        Parámetros:
+          key: Tupla que identifica el trabajo, p.ej. (año, ronda, sesión, perfil).
+          ttl: Segundos que se reutiliza el resultado (None = el del objeto, 0 = nada).
+          use_cache: Si False no se devuelve un resultado guardado ni se comparte
+                     una ejecución en curso que sí lo admita (podría haber leído
+                     datos anteriores a la llamada): se espera a que termine y se
+                     ejecuta de nuevo. Sí se comparte otra en curso con use_cache=False.
+          cross_process: Si True la ejecución se protege con el lock de fichero.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        while True:
+            with self._lock:
+                cached = self._results.get(key)
+                if use_cache and cached is not None and cached[0] > time.monotonic():
+                    return cached[1]
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call(use_cache)
+
+            if leader:
+                break
+            call.done.wait()
+            if use_cache or not call.use_cache:
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+        try:
+            if cross_process:
+                with self.file_lock(key):
+                    call.result = func()
+            else:
+                call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and ttl > 0:
+                    self._results[key] = (time.monotonic() + ttl, call.result)
+                    self._expire()
+            call.done.set()
+        return call.result
+
+    def forget(self, key=None):
+        # Descarta el resultado guardado de una clave (o todos)
+        with self._lock:
+            if key is None:
+                self._results.clear()
+            else:
+                self._results.pop(key, None)
+
+    def in_flight(self):
+        with self._lock:
+            return list(self._calls)
+
+    def _expire(self):
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._results.items() if expires <= now]:
+            del self._results[key]
+
+    def file_lock(self, key):
+        return _FileLock(self.lock_dir / f"{lock_name(key)}.lock", self.lock_timeout)
+
+
+def lock_name(key):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", "-".join(str(part) for part in key))
+
+
+class _FileLock:
+    # flock exclusivo; el sistema lo libera si el proceso muere
+    def __init__(self, path, timeout):
+        self.path = path
+        self.timeout = timeout
+        self.file = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return self
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "a")
+        deadline = time.monotonic() + self.timeout
+        delay = 0.05
+        while True:
+            try:
+                fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return self
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    self.file.close()
+                    self.file = None
+                    raise TimeoutError(f"Tiempo de espera agotado esperando a otro proceso ({self.path.name})")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.25)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+        return False
+
+
+_flights = None
+_flights_lock = threading.Lock()
+
+
+def get_flights():
+    global _flights
+    with _flights_lock:
+        if _flights is None:
+            _flights = SingleFlight()
+    return _flights
@@ -0,0 +1,398 @@
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+from bulk_writer import BulkWriter
+from fingerprints import FINGERPRINT_FIELD
+from mongo import get_db
+from instrumentation import span
+
+# Clasificación del mundial calculada a partir de los resultados.
+#
+# Cada sesión que puntúa (carrera y sprint) se guarda como una aportación en
+# 'standings_rounds' (_id '<año>_<ronda>_<sesión>': pilotos, equipos, puntos y
+# posiciones). SeasonStandings mantiene esas aportaciones como matrices NumPy
+# (fila = sesión, columna = piloto), aplica cada ronda nueva sobre ellas y
+# calcula puntos acumulados, posiciones (con desempate por número de
+# victorias, segundos puestos, ...) y puntos por ronda para pilotos y equipos.
+#
+# El resultado se materializa en 'standings' con un documento por temporada y
+# tipo ('2025_drivers', '2025_teams'): cada lectura es un único find por _id.
+#
+# Uso: python standings.py rebuild 2025 [--from-sessions]
+
+STANDINGS_COLLECTION = "standings"
+CONTRIBUTIONS_COLLECTION = "standings_rounds"
+
+# Sesiones que puntúan, en el orden en que se aplican dentro de una ronda
+SCORING_SESSIONS = ("Sprint", "Race")
+
+
+def contribution_id(year, gp_round, session_name):
+    return f"{year}_{int(gp_round):02d}_{session_name.lower()}"
+
+
+def contribution_from_results(year, gp_round, session_name, results):
+    """
+    Aportación de una sesión a partir de session.results de FastF1.
+
+    Retorna:
+      Dict listo para 'standings_rounds', o None si la sesión no tiene puntos.
+    """
+    if results is None or results.empty or "Points" not in results or results["Points"].isna().all():
+        return None
+
+    df = results[results["DriverId"].notna()]
+    positions = df["Position"].fillna(0).to_numpy(dtype=np.int64)
+    return {
+        "year": int(year),
+        "round": int(gp_round),
+        "session": session_name,
+        "drivers": [str(d).lower() for d in df["DriverId"]],
+        "teams": [str(t).lower() if t == t and t is not None else None for t in df["TeamId"]],
+        "points": [_number(p) for p in df["Points"].fillna(0).to_numpy(dtype=np.float64)],
+        "positions": positions.tolist()
+    }
+
+
+def _number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class SeasonStandings:
+    """
+    Puntos de una temporada como matrices por sesión puntuable.
+
+    Atributos:
+      keys: Lista ordenada de (ronda, sesión) aplicadas.
+      drivers, teams: Ids en orden de aparición (columnas de las matrices).
+      points: float64 (sesiones x pilotos) con los puntos de cada sesión.
+      positions: int16 (sesiones x pilotos), 0 si no tiene posición o no corrió.
+      team_of: int16 (sesiones x pilotos), índice del equipo, -2 si corrió sin
+               equipo conocido o -1 si no participó.
+      versions: Huella ('_fp') de cada aportación guardada de la que se partió,
+                para saber si otro proceso la ha cambiado.
+    """
+
+    def __init__(self, year):
+        self.year = int(year)
+        self.keys = []
+        self.drivers = []
+        self.teams = []
+        self._driver_index = {}
+        self._team_index = {}
+        self.points = np.zeros((0, 0), dtype=np.float64)
+        self.positions = np.zeros((0, 0), dtype=np.int16)
+        self.team_of = np.zeros((0, 0), dtype=np.int16)
+        self.versions = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _column(self, ids, index, value):
+        if value not in index:
+            index[value] = len(ids)
+            ids.append(value)
+        return index[value]
+
+    def apply(self, contribution):
+        """
+        Aplica (o sustituye) la aportación de una sesión sin recalcular el resto.
+        """
+        key = (contribution["round"], SCORING_SESSIONS.index(contribution["session"]))
+        driver_cols = np.array([self._column(self.drivers, self._driver_index, d)
+                                for d in contribution["drivers"]], dtype=np.int64)
+        team_cols = np.array([self._column(self.teams, self._team_index, t) if t else -2
+                              for t in contribution["teams"]], dtype=np.int16)
+
+        # Columnas nuevas para pilotos que aparecen por primera vez
+        missing = len(self.drivers) - self.points.shape[1]
+        if missing:
+            self.points = np.pad(self.points, ((0, 0), (0, missing)))
+            self.positions = np.pad(self.positions, ((0, 0), (0, missing)))
+            self.team_of = np.pad(self.team_of, ((0, 0), (0, missing)), constant_values=-1)
+
+        if key in self.keys:
+            row = self.keys.index(key)
+        else:
+            row = int(np.searchsorted(np.array([k[0] * 10 + k[1] for k in self.keys], dtype=np.int64),
+                                      key[0] * 10 + key[1]))
+            self.keys.insert(row, key)
+            n = len(self.drivers)
+            self.points = np.insert(self.points, row, np.zeros(n), axis=0)
+            self.positions = np.insert(self.positions, row, np.zeros(n, dtype=np.int16), axis=0)
+            self.team_of = np.insert(self.team_of, row, np.full(n, -1, dtype=np.int16), axis=0)
+
+        self.points[row] = 0
+        self.positions[row] = 0
+        self.team_of[row] = -1
+        self.points[row, driver_cols] = contribution["points"]
+        self.positions[row, driver_cols] = contribution["positions"]
+        self.team_of[row, driver_cols] = team_cols
+
+    def _by_round(self):
+        # Índice de ronda de cada fila y rondas distintas en orden
+        rows = np.array([k[0] for k in self.keys], dtype=np.int64)
+        rounds, row_round = np.unique(rows, return_inverse=True)
+        return rounds, row_round
+
+    def tables(self):
+        """
+        Clasificaciones de pilotos y equipos.
+
+        Retorna:
+          (rounds, drivers, teams): drivers y teams son dicts con 'ids',
+          'round_points' (rondas x ids), 'positions' (rondas x ids, 0 si aún
+          no había participado), 'wins', 'podiums' y, para pilotos, 'team'.
+        """
+        rounds, row_round = self._by_round()
+        n_rounds = len(rounds)
+        n_drivers, n_teams = len(self.drivers), len(self.teams)
+        is_race = np.array([SCORING_SESSIONS[k[1]] == "Race" for k in self.keys], dtype=bool)
+
+        # Pilotos: puntos por ronda y conteo de posiciones en carrera para el desempate
+        driver_points = np.zeros((n_rounds, n_drivers))
+        np.add.at(driver_points, row_round, self.points)
+
+        max_position = int(self.positions.max(initial=0))
+        race_rows, race_cols = np.nonzero(self.positions * is_race[:, None])
+        finishes = self.positions[race_rows, race_cols].astype(np.int64)
+        driver_counts = np.zeros((n_rounds, n_drivers, max_position + 1))
+        np.add.at(driver_counts, (row_round[race_rows], race_cols, finishes), 1)
+
+        appeared = np.zeros((n_rounds, n_drivers), dtype=bool)
+        entered_rows, entered_cols = np.nonzero(self.team_of != -1)
+        appeared[row_round[entered_rows], entered_cols] = True
+
+        # Equipos: suma de sus pilotos en cada sesión
+        valid = self.team_of >= 0
+        team_slots = row_round[:, None] * n_teams + self.team_of
+        team_points = np.bincount(team_slots[valid], weights=self.points[valid],
+                                  minlength=n_rounds * n_teams).reshape(n_rounds, n_teams)
+        team_counts = np.zeros((n_rounds, n_teams, max_position + 1))
+        race_teams = self.team_of[race_rows, race_cols]
+        scored = race_teams >= 0
+        np.add.at(team_counts, (row_round[race_rows][scored], race_teams[scored], finishes[scored]), 1)
+        team_appeared = np.zeros((n_rounds, n_teams), dtype=bool)
+        present_rows, present_cols = np.nonzero(valid)
+        team_appeared[row_round[present_rows], self.team_of[present_rows, present_cols]] = True
+
+        # Último equipo de cada piloto
+        last_team = np.full(n_drivers, -1, dtype=np.int64)
+        for row in range(len(self.keys)):
+            last_team = np.where(self.team_of[row] >= 0, self.team_of[row], last_team)
+
+        drivers = _table(self.drivers, driver_points, driver_counts, appeared)
+        drivers["team"] = [self.teams[t] if t >= 0 else None for t in last_team]
+        teams = _table(self.teams, team_points, team_counts, team_appeared)
+        return rounds.tolist(), drivers, teams
+
+    def documents(self):
+        """
+        Documentos materializados de 'standings' ({_id: campos}).
+        """
+        rounds, drivers, teams = self.tables()
+        return {
+            f"{self.year}_drivers": _document(self.year, "drivers", rounds, drivers, "driver"),
+            f"{self.year}_teams": _document(self.year, "teams", rounds, teams, "team")
+        }
+
+
+def _table(ids, round_points, counts, appeared):
+    cumulative = np.cumsum(round_points, axis=0)
+    cumulative_counts = np.cumsum(counts, axis=0)
+    appeared = np.cumsum(appeared, axis=0) > 0
+    positions = np.zeros(cumulative.shape, dtype=np.int64)
+
+    # Desempate por número de victorias, luego de segundos puestos, etc.
+    names = np.argsort(np.argsort(np.array(ids, dtype=str)))
+    for r in range(cumulative.shape[0]):
+        keys = [names] + [-cumulative_counts[r, :, p] for p in range(counts.shape[2] - 1, 0, -1)]
+        keys += [~appeared[r], -cumulative[r]]
+        order = np.lexsort(keys)
+        positions[r, order] = np.arange(1, len(ids) + 1)
+        positions[r, ~appeared[r]] = 0
+
+    return {
+        "ids": ids,
+        "round_points": round_points,
+        "cumulative": cumulative,
+        "positions": positions,
+        "wins": cumulative_counts[-1, :, 1] if counts.shape[2] > 1 and len(cumulative) else np.zeros(len(ids)),
+        "podiums": cumulative_counts[-1, :, 1:4].sum(axis=1) if len(cumulative) else np.zeros(len(ids))
+    }
+
+
+def _document(year, kind, rounds, table, id_field):
+    if not rounds:
+        return {"year": year, "kind": kind, "round": None, "rounds": [], "standings": []}
+
+    positions = table["positions"]
+    final = positions[-1]
+    previous = positions[-2] if len(rounds) > 1 else np.zeros_like(final)
+
+    entries = []
+    for col in np.argsort(np.where(final > 0, final, len(final) + 1), kind="stable"):
+        if final[col] == 0:
+            continue
+        entry = {id_field: table["ids"][col]}
+        if "team" in table:
+            entry["team"] = table["team"][col]
+        entry.update({
+            "position": int(final[col]),
+            "points": _number(table["cumulative"][-1, col]),
+            "wins": int(table["wins"][col]),
+            "podiums": int(table["podiums"][col]),
+            "last_round_points": _number(table["round_points"][-1, col]),
+            "position_change": int(previous[col] - final[col]) if previous[col] else 0,
+            "round_points": [_number(p) for p in table["round_points"][:, col]],
+            "positions": [int(p) or None for p in positions[:, col]]
+        })
+        entries.append(entry)
+
+    return {"year": year, "kind": kind, "round": rounds[-1], "rounds": rounds, "standings": entries}
+
+
+_seasons = {}
+_lock = threading.RLock()
+
+
+def load_season(year, db=None):
+    # Reconstruye la temporada desde las aportaciones guardadas
+    db = db if db is not None else get_db()
+    season = SeasonStandings(year)
+    contributions = list(db[CONTRIBUTIONS_COLLECTION].find({"year": int(year)}))
+    for contribution in sorted(contributions, key=lambda c: (c["round"], SCORING_SESSIONS.index(c["session"]))):
+        season.apply(contribution)
+    season.versions = {c["_id"]: c.get(FINGERPRINT_FIELD) for c in contributions}
+    return season
+
+
+def stored_versions(year, db):
+    # Huella de cada aportación guardada: cambia al reescribirla con otro contenido
+    cursor = db[CONTRIBUTIONS_COLLECTION].find({"year": int(year)}, {FINGERPRINT_FIELD: 1})
+    return {doc["_id"]: doc.get(FINGERPRINT_FIELD) for doc in cursor}
+
+
+def get_season(year, db=None):
+    """
+    Temporada en memoria del proceso. Si otro proceso ha guardado, borrado o
+    corregido alguna aportación desde que se cargó (su huella ya no coincide),
+    se recarga desde 'standings_rounds'.
+    """
+    db = db if db is not None else get_db()
+    stored = stored_versions(year, db)
+    with _lock:
+        season = _seasons.get(int(year))
+        if season is None or season.versions != stored:
+            season = _seasons[int(year)] = load_season(year, db)
+        return season
+
+
+def write_season(season, db, contributions=()):
+    with BulkWriter(db, skip_unchanged=True) as writer:
+        for contribution in contributions:
+            writer.upsert(CONTRIBUTIONS_COLLECTION,
+                          contribution_id(contribution["year"], contribution["round"], contribution["session"]),
+                          contribution)
+        for document_id, document in season.documents().items():
+            writer.upsert(STANDINGS_COLLECTION, document_id, document)
+    return writer
+
+
+def update_standings(year, gp_round, session_name, results, db=None):
+    """
+    Aplica los resultados de una carrera o sprint y reescribe la clasificación.
+
+    Parámetros:
+      session_name: 'Race' o 'Sprint'.
+      results: session.results de FastF1 (DriverId, TeamId, Points, Position).
+
+    Retorna:
+      El documento de pilotos actualizado, o None si la sesión no puntúa.
+    """
+    contribution = contribution_from_results(year, gp_round, session_name, results)
+    if contribution is None:
+        return None
+
+    db = db if db is not None else get_db()
+    with span("standings.update", year=year, round=gp_round, session=session_name):
+        with _lock:
+            season = get_season(year, db)
+            season.apply(contribution)
+            write_season(season, db, [contribution])
+            document_id = contribution_id(year, gp_round, session_name)
+            written = db[CONTRIBUTIONS_COLLECTION].find_one({"_id": document_id}, {FINGERPRINT_FIELD: 1})
+            season.versions[document_id] = written.get(FINGERPRINT_FIELD) if written else None
+        return season.documents()[f"{year}_drivers"]
+
+
+def rebuild_season(year, from_sessions=False, db=None):
+    """
+    Recalcula la temporada desde cero.
+
+    Parámetros:
+      from_sessions: Si True, lee carrera y sprint de cada ronda ya disputada
+                     con FastF1 (p.ej. la primera vez); si no, parte de las
+                     aportaciones guardadas.
+    """
+    db = db if db is not None else get_db()
+    contributions = []
+
+    if from_sessions:
+        from cache_config import enable_cache, finished_sessions
+        from schedule_index import get_schedule
+        from session_cache import load_session
+
+        enable_cache()
+        for gp_round, name in finished_sessions(get_schedule(year).schedule):
+            if name not in SCORING_SESSIONS:
+                continue
+            try:
+                session = load_session(year, gp_round, name, profile="results")
+                contribution = contribution_from_results(year, gp_round, name, session.results)
+            except Exception as e:
+                print(f"Ronda {gp_round} ({name}) omitida: {e}")
+                continue
+            if contribution is not None:
+                contributions.append(contribution)
+    else:
+        contributions = list(db[CONTRIBUTIONS_COLLECTION].find({"year": int(year)}))
+
+    start = time.perf_counter()
+    season = SeasonStandings(year)
+    for contribution in sorted(contributions, key=lambda c: (c["round"], SCORING_SESSIONS.index(c["session"]))):
+        season.apply(contribution)
+    documents = season.documents()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    write_season(season, db, contributions if from_sessions else ())
+    season.versions = stored_versions(year, db)
+    with _lock:
+        _seasons[int(year)] = season
+    return documents, elapsed_ms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clasificación del mundial calculada desde los resultados.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = commands.add_parser("rebuild", help="Recalcula la clasificación de una temporada")
+    rebuild_parser.add_argument("year", type=int)
+    rebuild_parser.add_argument("--from-sessions", action="store_true",
+                                help="Lee los resultados con FastF1 en lugar de las aportaciones guardadas")
+
+    args = parser.parse_args(argv)
+    documents, elapsed_ms = rebuild_season(args.year, from_sessions=args.from_sessions)
+
+    drivers = documents[f"{args.year}_drivers"]
+    print(f"Clasificación {args.year} tras la ronda {drivers['round']} ({elapsed_ms:.1f} ms)\n")
+    for entry in drivers["standings"]:
+        print(f"{entry['position']:>3}  {entry['driver']:<22} {entry['team'] or '':<16} {entry['points']:>6}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
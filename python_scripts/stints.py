@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# Análisis de stints: ritmo y degradación de cada piloto por juego de neumáticos.
+#
+# Trabaja sobre el DataFrame de vueltas completo de la sesión (todos los
+# pilotos a la vez):
+#   1. Descarta vueltas sin tiempo, borradas, de entrada/salida de boxes, la
+#      primera vuelta y las que no son con bandera verde.
+#   2. Descarta por stint las vueltas más lentas que OUTLIER_FACTOR veces la
+#      mediana del stint (tráfico, errores, vueltas de enfriamiento).
+#   3. Ajusta en todos los stints a la vez la recta tiempo ~ vida del
+#      neumático por mínimos cuadrados con sumas por grupo (np.bincount).
+#
+# Resultado: lista de pilotos con sus stints (compuesto, vueltas, media,
+# mejor vuelta y degradación en s/vuelta).
+
+OUTLIER_FACTOR = 1.07
+
+# Vueltas válidas mínimas para calcular la pendiente de un stint
+MIN_FIT_LAPS = 3
+
+
+def _seconds(series):
+    return pd.to_timedelta(series).dt.total_seconds().to_numpy(dtype=np.float64)
+
+
+def clean_laps_mask(laps):
+    """
+    Vueltas representativas del ritmo (array bool alineado con laps).
+    """
+    mask = laps["LapTime"].notna().to_numpy()
+    if "Deleted" in laps:
+        mask &= ~laps["Deleted"].fillna(False).astype(bool).to_numpy()
+    for column in ("PitInTime", "PitOutTime"):
+        if column in laps:
+            mask &= laps[column].isna().to_numpy()
+    if "LapNumber" in laps:
+        mask &= (laps["LapNumber"] > 1).to_numpy()
+    if "TrackStatus" in laps:
+        mask &= (laps["TrackStatus"].astype(str) == "1").to_numpy()
+    return mask
+
+
+def stint_summary(laps, results=None):
+    """
+    Resumen por piloto y stint de una sesión.
+
+    Parámetros:
+      laps: session.laps (Driver, Stint, Compound, TyreLife, LapTime, LapNumber
+            y, si existen, PitInTime/PitOutTime, Deleted y TrackStatus).
+      results: session.results opcional para añadir el DriverId de cada piloto.
+
+    Retorna:
+      Lista de {"driver", "driver_id", "stints": [...]} ordenada por piloto;
+      cada stint con compound, start_lap, end_lap, laps, clean_laps,
+      tyre_life_start, avg, best (segundos) y deg (s/vuelta, None si hay
+      menos de MIN_FIT_LAPS vueltas válidas).
+    """
+    if laps is None or laps.empty:
+        return []
+
+    laps = laps[laps["Stint"].notna()]
+    drivers = laps["Driver"].astype(str).to_numpy()
+    stints = laps["Stint"].to_numpy(dtype=np.int64)
+
+    # Un grupo por (piloto, stint)
+    keys = pd.MultiIndex.from_arrays([drivers, stints])
+    group, unique_keys = pd.factorize(keys)
+    n_groups = len(unique_keys)
+
+    lap_time = _seconds(laps["LapTime"])
+    lap_number = laps["LapNumber"].to_numpy(dtype=np.float64)
+    tyre_life = laps["TyreLife"].to_numpy(dtype=np.float64) if "TyreLife" in laps else lap_number.copy()
+    tyre_life = np.where(np.isnan(tyre_life), lap_number, tyre_life)
+
+    # Vueltas limpias y, dentro de cada stint, sin las más lentas que la mediana * OUTLIER_FACTOR
+    clean = clean_laps_mask(laps)
+    median = pd.Series(np.where(clean, lap_time, np.nan)).groupby(group).transform("median").to_numpy()
+    clean &= lap_time <= median * OUTLIER_FACTOR
+
+    # Mínimos cuadrados por grupo con sumas: pendiente = (nΣxy - ΣxΣy) / (nΣx² - (Σx)²)
+    weights = clean.astype(np.float64)
+    x = np.where(clean, tyre_life, 0.0)
+    y = np.where(clean, lap_time, 0.0)
+    n = np.bincount(group, weights=weights, minlength=n_groups)
+    sx = np.bincount(group, weights=x, minlength=n_groups)
+    sy = np.bincount(group, weights=y, minlength=n_groups)
+    sxx = np.bincount(group, weights=x * x, minlength=n_groups)
+    sxy = np.bincount(group, weights=x * y, minlength=n_groups)
+    denominator = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where((n >= MIN_FIT_LAPS) & (denominator > 0), (n * sxy - sx * sy) / denominator, np.nan)
+        average = np.where(n > 0, sy / n, np.nan)
+
+    best = np.full(n_groups, np.inf)
+    np.minimum.at(best, group[clean], lap_time[clean])
+    total = np.bincount(group, minlength=n_groups)
+    start_lap = np.full(n_groups, np.inf)
+    end_lap = np.full(n_groups, -np.inf)
+    np.minimum.at(start_lap, group, lap_number)
+    np.maximum.at(end_lap, group, lap_number)
+    life_start = np.full(n_groups, np.inf)
+    np.minimum.at(life_start, group, tyre_life)
+
+    compounds = laps["Compound"].astype(object).to_numpy() if "Compound" in laps else np.full(len(laps), None)
+    first_row = np.full(n_groups, len(laps))
+    np.minimum.at(first_row, group, np.arange(len(laps)))
+
+    driver_ids = {}
+    if results is not None and not results.empty and {"Abbreviation", "DriverId"} <= set(results.columns):
+        driver_ids = dict(zip(results["Abbreviation"].astype(str), results["DriverId"].astype(str).str.lower()))
+
+    summary = {}
+    for g, (driver, stint) in enumerate(unique_keys):
+        compound = compounds[first_row[g]]
+        entry = summary.setdefault(driver, {"driver": driver, "driver_id": driver_ids.get(driver), "stints": []})
+        entry["stints"].append({
+            "stint": int(stint),
+            "compound": compound if isinstance(compound, str) else None,
+            "start_lap": int(start_lap[g]),
+            "end_lap": int(end_lap[g]),
+            "laps": int(total[g]),
+            "clean_laps": int(n[g]),
+            "tyre_life_start": int(life_start[g]),
+            "avg": _round(average[g]),
+            "best": _round(best[g]),
+            "deg": _round(slope[g], 4)
+        })
+
+    for entry in summary.values():
+        entry["stints"].sort(key=lambda s: s["stint"])
+    return [summary[driver] for driver in sorted(summary)]
+
+
+def _round(value, digits=3):
+    return round(float(value), digits) if np.isfinite(value) else None
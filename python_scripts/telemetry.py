@@ -0,0 +1,254 @@
+import os
+import re
+import sys
+import json
+import argparse
+import numpy as np
+import lap_store
+from instrumentation import span
+
+# Telemetría de la vuelta rápida de cada piloto, reducida para el frontend.
+#
+# - La primera petición de una sesión carga la telemetría (perfil
+#   'telemetry' de session_cache), extrae la vuelta rápida de todos los
+#   pilotos y la guarda a resolución completa en
+#   <LAP_STORE_DIR>/<año>/<ronda>/<sesión>/telemetry/<PILOTO>.npz.
+#   Las siguientes peticiones (cualquier piloto, presupuesto o referencia) solo
+#   leen esos ficheros: la sesión no se vuelve a cargar.
+# - Cada traza se reduce con Largest-Triangle-Three-Buckets sobre
+#   velocidad/distancia a TELEMETRY_POINTS puntos; todos los canales usan los
+#   mismos índices, así que siguen alineados por distancia.
+# - Con reference se añade el delta de tiempo frente a la vuelta de otro
+#   piloto (segundos, positivo = más lento que la referencia).
+#
+# Uso: python telemetry.py 2025 5 Q VER [--reference NOR] [--points 400]
+
+TELEMETRY_POINTS = int(os.getenv("TELEMETRY_POINTS", "400"))
+MAX_TELEMETRY_POINTS = 5000
+
+# Canal -> (columna de FastF1, dtype en disco)
+CHANNELS = {
+    "speed": ("Speed", np.float32),
+    "throttle": ("Throttle", np.float32),
+    "brake": ("Brake", np.uint8),
+    "gear": ("nGear", np.uint8),
+    "rpm": ("RPM", np.float32),
+    "drs": ("DRS", np.uint8),
+}
+
+# Abreviatura de piloto de FastF1; se usa como nombre de fichero
+DRIVER_CODE = re.compile(r"^[A-Za-z]{3}$")
+
+
+def lttb(x, y, n_out):
+    """
+    Índices de los puntos que conserva Largest-Triangle-Three-Buckets.
+
+    El primer y último punto se conservan siempre; el resto de la serie se
+    reparte en n_out - 2 cubos y de cada uno se elige el punto que forma el
+    triángulo de mayor área con el punto elegido en el cubo anterior y la
+    media del siguiente. El área de todos los puntos de un cubo se calcula de
+    una vez con NumPy.
+
+    Retorna:
+      Array int64 de índices crecientes (todos si len(x) <= n_out).
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Límites de los cubos (sin el primer y el último punto) y sus medias
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - mean_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (mean_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def telemetry_dir(year, gp_round, session_name):
+    return lap_store.session_dir(year, gp_round, session_name) / "telemetry"
+
+
+def _driver_file(year, gp_round, session_name, driver):
+    if not DRIVER_CODE.match(driver):
+        raise ValueError(f"Abreviatura de piloto no válida: {driver!r}")
+    return telemetry_dir(year, gp_round, session_name) / f"{driver.upper()}.npz"
+
+
+def _complete_marker(year, gp_round, session_name):
+    # Se escribe al terminar la extracción: una extracción a medias se repite
+    return telemetry_dir(year, gp_round, session_name) / ".complete"
+
+
+def lap_arrays(car_data):
+    """
+    Arrays de una vuelta a partir de la telemetría de FastF1 (get_car_data()).
+
+    Retorna:
+      Dict con distance (m), time (s desde el inicio de la vuelta) y un array
+      por canal de CHANNELS con su dtype compacto.
+    """
+    if "Distance" not in car_data:
+        car_data = car_data.add_distance()
+    arrays = {
+        "distance": car_data["Distance"].to_numpy(dtype=np.float32),
+        "time": (car_data["Time"].dt.total_seconds()).to_numpy(dtype=np.float32)
+    }
+    for channel, (column, dtype) in CHANNELS.items():
+        if column in car_data:
+            arrays[channel] = car_data[column].fillna(0).to_numpy(dtype=np.float64).astype(dtype)
+    return arrays
+
+
+def extract_session(year, gp_round, session_name):
+    """
+    Carga la sesión con telemetría y guarda la vuelta rápida de cada piloto.
+
+    Retorna:
+      Lista de pilotos (abreviaturas) guardados.
+    """
+    from session_cache import load_session, session_key
+    from fastest_laps import fastest_laps_per_driver
+
+    session = load_session(year, gp_round, session_name, profile="telemetry")
+    name = session_key(year, gp_round, session_name)[2]
+    directory = telemetry_dir(year, gp_round, name)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    saved = []
+    with span("telemetry.extract", year=year, round=gp_round, session=session_name):
+        fastest = fastest_laps_per_driver(session.laps)
+        for i in range(len(fastest)):
+            lap = fastest.iloc[i]
+            try:
+                arrays = lap_arrays(lap.get_car_data())
+            except Exception as e:
+                print(f"Sin telemetría para {lap['Driver']}: {e}", file=sys.stderr)
+                continue
+            path = directory / f"{lap['Driver']}.npz"
+            tmp_path = path.with_suffix(".tmp.npz")
+            np.savez_compressed(
+                tmp_path,
+                lap_time=np.float64(lap["LapTime"].total_seconds()),
+                lap_number=np.int16(lap["LapNumber"]),
+                team=np.str_(lap["Team"] if isinstance(lap.get("Team"), str) else ""),
+                **arrays
+            )
+            os.replace(tmp_path, path)
+            saved.append(lap["Driver"])
+    # Sin ningún piloto guardado (p.ej. telemetría aún no publicada) se reintentará en la próxima petición
+    if saved:
+        _complete_marker(year, gp_round, name).touch()
+    return saved
+
+
+def load_lap(year, gp_round, session_name, driver):
+    """
+    Arrays a resolución completa de la vuelta rápida de un piloto. Si la
+    sesión aún no está en disco se extrae (una vez, aunque lleguen varias
+    peticiones a la vez).
+
+    Retorna:
+      Dict de arrays, o None si el piloto no tiene vuelta con telemetría.
+    """
+    from session_cache import session_key
+    from single_flight import get_flights
+
+    name = session_key(year, gp_round, session_name)[2]
+    path = _driver_file(year, gp_round, name, driver)
+    if not path.exists() and not _complete_marker(year, gp_round, name).exists():
+        get_flights().do(("telemetry", int(year), int(gp_round), name),
+                         lambda: extract_session(year, gp_round, name), ttl=0)
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def delta_to_reference(lap, reference):
+    # Diferencia de tiempo en cada distancia de lap frente a reference (interpolada)
+    ref_time = np.interp(lap["distance"], reference["distance"], reference["time"])
+    return lap["time"] - ref_time
+
+
+def fastest_lap_trace(year, gp_round, session_name, driver, points=TELEMETRY_POINTS, reference=None):
+    """
+    Traza reducida de la vuelta rápida de un piloto.
+
+    Parámetros:
+      session_name: Nombre o alias de la sesión ('Q', 'Race', 'FP2', ...).
+      driver: Abreviatura del piloto ('VER').
+      points: Presupuesto de puntos de la traza (LTTB).
+      reference: Abreviatura de otro piloto para añadir el delta de tiempo.
+
+    Retorna:
+      Dict con los arrays alineados por distancia (listas) o {"error": ...}.
+    """
+    for code in (driver, reference) if reference else (driver,):
+        if not DRIVER_CODE.match(str(code)):
+            return {"error": f"Abreviatura de piloto no válida: {code!r}"}
+
+    points = max(3, min(int(points), MAX_TELEMETRY_POINTS))
+    lap = load_lap(year, gp_round, session_name, driver)
+    if lap is None:
+        return {"error": f"No hay telemetría de la vuelta rápida de {driver}"}
+
+    with span("telemetry.reduce", year=year, round=gp_round, session=session_name, driver=driver, points=points):
+        index = lttb(lap["distance"], lap["speed"], points)
+        trace = {
+            "driver": driver.upper(),
+            "team": str(lap["team"]),
+            "lap_number": int(lap["lap_number"]),
+            "lap_time": round(float(lap["lap_time"]), 3),
+            "points": len(index),
+            "distance": np.round(lap["distance"][index].astype(np.float64), 1).tolist(),
+        }
+        for channel in CHANNELS:
+            if channel in lap:
+                values = lap[channel][index]
+                trace[channel] = (np.round(values).astype(np.int64) if values.dtype.kind == "f" else values).tolist()
+
+        if reference:
+            reference_lap = load_lap(year, gp_round, session_name, reference)
+            if reference_lap is None:
+                return {"error": f"No hay telemetría de la vuelta rápida de {reference}"}
+            trace["reference"] = reference.upper()
+            trace["delta"] = np.round(delta_to_reference(lap, reference_lap)[index].astype(np.float64), 3).tolist()
+    return trace
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Telemetría reducida de la vuelta rápida de un piloto.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("round", type=int)
+    parser.add_argument("session", help="Sesión ('Q', 'Race', 'FP1', ...)")
+    parser.add_argument("driver", help="Abreviatura del piloto ('VER')")
+    parser.add_argument("--reference", help="Piloto de referencia para el delta")
+    parser.add_argument("--points", type=int, default=TELEMETRY_POINTS, help="Puntos de la traza")
+    args = parser.parse_args(argv)
+
+    from cache_config import enable_cache
+
+    enable_cache()
+    trace = fastest_lap_trace(args.year, args.round, args.session, args.driver, args.points, args.reference)
+    print(json.dumps(trace, separators=(",", ":"), ensure_ascii=False))
+    return 1 if "error" in trace else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+import pytest
+
+# Los scripts son módulos planos de python_scripts/; la base de datos en
+# memoria de benchmarks/memory_db.py sustituye a un mongod en las pruebas.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+
+@pytest.fixture
+def db():
+    from memory_db import MemoryClient
+
+    return MemoryClient().gridmetrics
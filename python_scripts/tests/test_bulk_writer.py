@@ -0,0 +1,73 @@
+from bulk_writer import BulkWriter
+from delete_bbdd import delete_element_by_id
+from fingerprints import FINGERPRINT_FIELD, invalidate
+
+
+def write_circuit(db, fields, **kwargs):
+    with BulkWriter(db, skip_unchanged=True, **kwargs) as writer:
+        writer.upsert("circuit", "circuit_Monza", fields)
+    return writer
+
+
+def test_upsert_writes_document_and_fingerprint(db):
+    writer = write_circuit(db, {"name": "Monza", "length": 5.793})
+
+    document = db.circuit.find_one({"_id": "circuit_Monza"})
+    assert document["name"] == "Monza"
+    assert document[FINGERPRINT_FIELD]
+    assert (writer.written, writer.skipped) == (1, 0)
+    assert writer.totals == {"matched": 0, "modified": 0, "upserted": 1}
+
+
+def test_unchanged_document_is_skipped(db):
+    write_circuit(db, {"name": "Monza"})
+    writer = write_circuit(db, {"name": "Monza"})
+
+    assert (writer.written, writer.skipped) == (0, 1)
+    assert writer.totals == {"matched": 0, "modified": 0, "upserted": 0}
+
+
+def test_changed_document_is_rewritten(db):
+    write_circuit(db, {"name": "Monza"})
+    writer = write_circuit(db, {"name": "Autodromo Nazionale Monza"})
+
+    assert (writer.written, writer.skipped) == (1, 0)
+    assert db.circuit.find_one({"_id": "circuit_Monza"})["name"] == "Autodromo Nazionale Monza"
+
+
+def test_deleted_document_is_written_again(db):
+    write_circuit(db, {"name": "Monza"})
+    assert delete_element_by_id(db, "circuit", "Monza") == 1
+
+    writer = write_circuit(db, {"name": "Monza"})
+
+    assert writer.written == 1
+    assert db.circuit.find_one({"_id": "circuit_Monza"})["name"] == "Monza"
+
+
+def test_out_of_band_edit_forces_rewrite(db):
+    write_circuit(db, {"name": "Monza"})
+    db.circuit.update_one({"_id": "circuit_Monza"}, invalidate({"$set": {"name": "editado a mano"}}))
+
+    writer = write_circuit(db, {"name": "Monza"})
+
+    assert writer.written == 1
+    assert db.circuit.find_one({"_id": "circuit_Monza"})["name"] == "Monza"
+
+
+def test_batches_are_flushed_at_batch_size(db):
+    with BulkWriter(db, batch_size=2) as writer:
+        for i in range(3):
+            writer.upsert("drivers", f"driver_{i}", {"n": i})
+        # Las dos primeras ya se han enviado; la tercera espera al flush
+        assert db.drivers.count_documents({}) == 2
+    assert db.drivers.count_documents({}) == 3
+    assert writer.by_collection["drivers"]["upserted"] == 3
+
+
+def test_updates_without_id_are_never_skipped(db):
+    write_circuit(db, {"name": "Monza", "round": 16})
+    for _ in range(2):
+        with BulkWriter(db, skip_unchanged=True) as writer:
+            writer.update("circuit", {"round": 16}, {"$set": {"name": "Monza"}})
+        assert (writer.written, writer.skipped) == (1, 0)
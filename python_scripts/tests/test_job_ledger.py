@@ -0,0 +1,55 @@
+import time
+import threading
+import pytest
+from job_ledger import DONE, RUNNING, JobLedger, run_job
+
+JOB = (2025, 5, "Race", "race:publish")
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    monkeypatch.setenv("SINGLE_FLIGHT_LOCK_DIR", str(tmp_path / "locks"))
+    return JobLedger(tmp_path / "jobs.sqlite", lease_seconds=0.3, backoff_seconds=0)
+
+
+def claim_from_other_thread(ledger):
+    # Otro reclamante (el owner por defecto incluye el hilo)
+    claims = []
+    thread = threading.Thread(target=lambda: claims.append(ledger.claim(*JOB)))
+    thread.start()
+    thread.join()
+    return claims[0]
+
+
+def test_expired_lease_can_be_claimed_again(ledger):
+    assert ledger.claim(*JOB)
+    time.sleep(0.4)
+
+    assert claim_from_other_thread(ledger)
+
+
+def test_job_that_outlives_its_lease_is_not_claimed_twice(ledger):
+    claims = []
+
+    def slow_job():
+        # Dura más de tres leases; a mitad otro proceso intenta reclamarlo
+        time.sleep(0.5)
+        claims.append(claim_from_other_thread(ledger))
+        time.sleep(0.5)
+        return {"message": "ok"}
+
+    result = run_job(*JOB, slow_job, ledger=ledger)
+
+    assert result == {"message": "ok"}
+    assert not claims[0]
+    assert claims[0].reason == RUNNING
+    assert ledger.get(*JOB)["status"] == DONE
+
+
+def test_keep_alive_stops_renewing_finished_jobs(ledger):
+    assert ledger.claim(*JOB)
+    with ledger.keep_alive([JOB]) as heartbeat:
+        ledger.complete(*JOB, {"message": "ok"})
+        time.sleep(0.25)
+    assert heartbeat.jobs == []
+    assert ledger.get(*JOB)["status"] == DONE
@@ -0,0 +1,46 @@
+from lap_records import RECORDS_COLLECTION, get_record, offer_record
+
+
+def record(time_ns, driver="driver_norris", year=2024):
+    seconds = time_ns / 1e9
+    return {
+        "driver": driver,
+        "driver_code": driver[-3:].upper(),
+        "lap": 50,
+        "time": f"{int(seconds // 60)}:{seconds % 60:06.3f}",
+        "time_ns": time_ns,
+        "year": year,
+        "round": 16
+    }
+
+
+def test_first_record_is_stored_and_mirrored(db):
+    assert offer_record("circuit_Monza", record(81_432_000_000), db) is True
+
+    assert get_record("circuit_Monza", db)["time_ns"] == 81_432_000_000
+    assert db.circuit.find_one({"_id": "circuit_Monza"})["lap_record"] == {
+        "time": "1:21.432", "driver": "driver_norris", "year": 2024
+    }
+
+
+def test_slower_or_equal_lap_is_rejected(db):
+    offer_record("circuit_Monza", record(81_432_000_000), db)
+
+    assert offer_record("circuit_Monza", record(82_000_000_000, "driver_leclerc", 2025), db) is False
+    assert offer_record("circuit_Monza", record(81_432_000_000, "driver_leclerc", 2025), db) is False
+    assert get_record("circuit_Monza", db)["driver"] == "driver_norris"
+    assert db.circuit.find_one({"_id": "circuit_Monza"})["lap_record"]["driver"] == "driver_norris"
+
+
+def test_faster_lap_replaces_record(db):
+    offer_record("circuit_Monza", record(81_432_000_000), db)
+
+    assert offer_record("circuit_Monza", record(80_901_000_000, "driver_leclerc", 2025), db) is True
+    assert get_record("circuit_Monza", db)["driver"] == "driver_leclerc"
+    assert db.circuit.find_one({"_id": "circuit_Monza"})["lap_record"]["year"] == 2025
+    assert db[RECORDS_COLLECTION].count_documents({}) == 1
+
+
+def test_missing_record_is_ignored(db):
+    assert offer_record("circuit_Monza", None, db) is False
+    assert get_record("circuit_Monza", db) is None
@@ -0,0 +1,60 @@
+import time
+import threading
+import pytest
+import session_cache
+
+KEY = (2025, 5, "Race")
+WANTED = session_cache.LOAD_PROFILES["results"]
+
+
+@pytest.fixture(autouse=True)
+def empty_memo():
+    session_cache.clear()
+    session_cache._key_locks.clear()
+    yield
+    session_cache.clear()
+    session_cache._key_locks.clear()
+
+
+def test_evict_keeps_locks_that_threads_are_waiting_for():
+    waiting = threading.Lock()
+    session_cache._key_locks[KEY] = [waiting, 1]
+    session_cache._key_locks[(2025, 4, "Race")] = [threading.Lock(), 0]
+
+    with session_cache._lock:
+        session_cache._evict((2025, 6, "Race"))
+
+    assert session_cache._key_locks[KEY][0] is waiting
+    assert (2025, 4, "Race") not in session_cache._key_locks
+
+
+def test_same_session_is_never_loaded_twice_at_once(monkeypatch):
+    active, peak, loads = [0], [0], []
+
+    def slow_load(key, wanted, profile, event):
+        with session_cache._lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with session_cache._lock:
+            active[0] -= 1
+            loads.append(key)
+            # Se expulsa enseguida, como haría la carga de otra ronda
+            session_cache._evict((2025, 99, "Race"))
+        return object()
+
+    # Cada hilo debe cargar: la sesión nunca queda en memoria
+    monkeypatch.setattr(session_cache, "_load", slow_load)
+    monkeypatch.setattr(session_cache, "_cached", lambda key, wanted: None)
+
+    threads = [threading.Thread(target=session_cache._load_once, args=(KEY, WANTED, "results", None))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 8
+    assert peak[0] == 1
+    # Sin usuarios ni sesión en memoria el lock se libera
+    assert KEY not in session_cache._key_locks
@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+import standings
+from standings import SeasonStandings, contribution_from_results, get_season, update_standings
+
+
+def contribution(gp_round, session, rows):
+    # rows: (piloto, equipo, puntos, posición)
+    drivers, teams, points, positions = zip(*rows)
+    return {"year": 2025, "round": gp_round, "session": session, "drivers": list(drivers),
+            "teams": list(teams), "points": list(points), "positions": list(positions)}
+
+
+ROUND_1 = contribution(1, "Race", [("norris", "mclaren", 25, 1), ("verstappen", "red_bull", 18, 2),
+                                   ("piastri", "mclaren", 15, 3)])
+ROUND_2 = contribution(2, "Race", [("verstappen", "red_bull", 25, 1), ("norris", "mclaren", 18, 2),
+                                   ("piastri", "mclaren", 15, 3)])
+SPRINT_2 = contribution(2, "Sprint", [("piastri", "mclaren", 8, 1), ("verstappen", "red_bull", 7, 2)])
+
+
+def season_of(*contributions):
+    season = SeasonStandings(2025)
+    for c in contributions:
+        season.apply(c)
+    return season
+
+
+def by_id(document, field):
+    return {entry[field]: entry for entry in document["standings"]}
+
+
+@pytest.fixture(autouse=True)
+def clear_seasons():
+    standings._seasons.clear()
+    yield
+    standings._seasons.clear()
+
+
+def test_points_positions_and_teams():
+    documents = season_of(ROUND_1, ROUND_2, SPRINT_2).documents()
+    drivers = by_id(documents["2025_drivers"], "driver")
+    teams = by_id(documents["2025_teams"], "team")
+
+    assert documents["2025_drivers"]["rounds"] == [1, 2]
+    assert drivers["verstappen"]["points"] == 50
+    assert drivers["verstappen"]["round_points"] == [18, 32]
+    assert drivers["verstappen"]["positions"] == [2, 1]
+    assert drivers["norris"]["points"] == 43
+    assert drivers["norris"]["position_change"] == -1
+    assert drivers["piastri"]["podiums"] == 2
+    assert drivers["piastri"]["team"] == "mclaren"
+    assert teams["mclaren"]["points"] == 81
+    assert teams["red_bull"]["points"] == 50
+
+
+def test_tie_is_broken_by_wins():
+    season = season_of(
+        contribution(1, "Race", [("zhou", "t1", 10, 1), ("albon", "t2", 5, 2)]),
+        contribution(2, "Race", [("sainz", "t3", 10, 1), ("albon", "t2", 5, 2), ("zhou", "t1", 0, 0)]),
+    )
+    drivers = by_id(season.documents()["2025_drivers"], "driver")
+
+    # Empatan a 10 puntos; zhou tiene una victoria y va por delante aunque el orden alfabético diga lo contrario
+    assert drivers["zhou"]["points"] == drivers["albon"]["points"] == 10
+    assert drivers["zhou"]["wins"] == 1
+    assert drivers["zhou"]["position"] < drivers["albon"]["position"]
+
+
+def test_order_of_application_does_not_matter():
+    in_order = season_of(ROUND_1, SPRINT_2, ROUND_2).documents()
+    shuffled = season_of(ROUND_2, ROUND_1, SPRINT_2).documents()
+
+    assert in_order == shuffled
+
+
+def test_reapplying_a_session_replaces_it():
+    corrected = contribution(1, "Race", [("verstappen", "red_bull", 25, 1), ("norris", "mclaren", 18, 2)])
+    season = season_of(ROUND_1, corrected)
+    drivers = by_id(season.documents()["2025_drivers"], "driver")
+
+    assert len(season) == 1
+    assert drivers["verstappen"]["points"] == 25
+    # piastri ya no está en la carrera corregida
+    assert "piastri" not in drivers
+
+
+def test_contribution_from_results_skips_sessions_without_points():
+    results = pd.DataFrame({"DriverId": ["norris"], "TeamId": ["mclaren"], "Points": [None], "Position": [1.0]})
+    assert contribution_from_results(2025, 1, "Race", results) is None
+
+
+def test_get_season_reloads_contributions_changed_by_another_process(db):
+    results = pd.DataFrame({"DriverId": ["norris", "verstappen"], "TeamId": ["mclaren", "red_bull"],
+                            "Points": [25.0, 18.0], "Position": [1.0, 2.0]})
+    update_standings(2025, 1, "Race", results, db=db)
+    cached = get_season(2025, db)
+    assert get_season(2025, db) is cached
+
+    # Otro proceso corrige la misma aportación: el número de aportaciones no cambia
+    corrected = contribution_from_results(2025, 1, "Race", results.assign(Points=[18.0, 25.0]))
+    standings.write_season(standings.load_season(2025, db), db, [corrected])
+
+    reloaded = get_season(2025, db)
+    assert reloaded is not cached
+    assert reloaded.documents()["2025_drivers"]["standings"][0]["driver"] == "verstappen"
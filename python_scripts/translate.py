@@ -1,7 +1,94 @@
-import deepl
+import os
+import json
+import hashlib
+from pathlib import Path
 
-def translate_with_deepl(text, target_lang="ES", auth_key="3d0b5e5a-bd55-4b5d-90a8-75c4eccd6356:fx"):
-    translator = deepl.Translator(auth_key)
-    result = translator.translate_text(text, target_lang=target_lang)
-    return result.text
+# Servicio de traducción con caché persistente en disco.
+#
+# - Las traducciones se guardan por (hash del texto, idioma destino), así que
+#   biografías y preguntas ya traducidas no vuelven a pedirse a DeepL.
+# - Todos los textos que no están en caché se envían en una única llamada.
+# - Se reutiliza un solo cliente y la clave se lee de DEEPL_AUTH_KEY.
+# - El backend es intercambiable (set_backend) para usar uno falso en pruebas:
+#   cualquier objeto con translate(texts, target_lang) -> lista de textos.
 
+CACHE_PATH = Path(os.getenv("TRANSLATION_CACHE", Path(__file__).resolve().parent / "translation_cache.json"))
+
+
+class DeepLBackend:
+    def __init__(self, auth_key=None):
+        import deepl
+
+        auth_key = auth_key or os.getenv("DEEPL_AUTH_KEY")
+        if not auth_key:
+            raise ValueError("Falta la variable de entorno DEEPL_AUTH_KEY")
+        self.client = deepl.Translator(auth_key)
+
+    def translate(self, texts, target_lang):
+        results = self.client.translate_text(texts, target_lang=target_lang)
+        return [r.text for r in results]
+
+
+class TranslationService:
+    def __init__(self, backend=None, cache_path=CACHE_PATH):
+        self.backend = backend
+        self.cache_path = Path(cache_path)
+        self.cache = self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_cache(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    @staticmethod
+    def cache_key(text, target_lang):
+        return f"{hashlib.sha256(text.encode('utf-8')).hexdigest()}:{target_lang.upper()}"
+
+    def translate_many(self, texts, target_lang="ES"):
+        keys = [self.cache_key(text, target_lang) for text in texts]
+
+        # Textos únicos que no están en caché, en orden de aparición
+        misses = {}
+        for key, text in zip(keys, texts):
+            if key not in self.cache and key not in misses:
+                misses[key] = text
+
+        if misses:
+            if self.backend is None:
+                self.backend = DeepLBackend()
+            translated = self.backend.translate(list(misses.values()), target_lang)
+            self.cache.update(zip(misses.keys(), translated))
+            self._save_cache()
+
+        return [self.cache[key] for key in keys]
+
+    def translate(self, text, target_lang="ES"):
+        return self.translate_many([text], target_lang)[0]
+
+
+_service = None
+
+
+def get_service():
+    global _service
+    if _service is None:
+        _service = TranslationService()
+    return _service
+
+
+def set_backend(backend):
+    # Sustituye el backend del servicio compartido (p.ej. por uno falso en pruebas)
+    get_service().backend = backend
+
+
+def translate_with_deepl(text, target_lang="ES"):
+    return get_service().translate(text, target_lang)
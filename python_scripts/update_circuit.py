@@ -1,11 +1,7 @@
-import deepl
+from bulk_writer import BulkWriter
+from translate import get_service
 
-def translate_with_deepl(text, target_lang="ES", auth_key="3d0b5e5a-bd55-4b5d-90a8-75c4eccd6356:fx"):
-    translator = deepl.Translator(auth_key)
-    result = translator.translate_text(text, target_lang=target_lang)
-    return result.text
-
-def update_circuit_document(db, circuit_id, first_gp=None, number_of_laps=None, length=None, race_distance=None, lap_record=None, questions=None):
+def update_circuit_document(db, circuit_id, first_gp=None, number_of_laps=None, length=None, race_distance=None, lap_record=None, questions=None, writer=None):
     """
     Actualiza campos específicos de un documento en la colección 'circuit'.
 
@@ -17,12 +13,14 @@ def update_circuit_document(db, circuit_id, first_gp=None, number_of_laps=None,
       length: Longitud del circuito (km).
       race_distance: Distancia total de carrera (km).
       questions: Diccionario con preguntas (en inglés, se traducen a español).
-      lap_record: Diccionario con 'time', 'driver', 'year'.
+      lap_record: Diccionario con 'time', 'driver', 'year'. Solo para correcciones
+                  manuales: el récord se actualiza solo desde lap_records.py.
+      writer: BulkWriter opcional; si se indica, la escritura queda en cola
+              hasta su flush y los totales se consultan en writer.totals.
     
     Retorna:
       matched_count, modified_count
     """
-    collection = db["circuit"]
     document_id = f"circuit_{circuit_id}"
 
     update_fields = {}
@@ -49,24 +47,26 @@ def update_circuit_document(db, circuit_id, first_gp=None, number_of_laps=None,
 
 
     if questions is not None:
-        translated_questions = {}
-        for key, text in questions.items():
-            try:
-                translated_text = translate_with_deepl(text)
-                translated_questions[key] = translated_text
-            except Exception as e:
-                print(f"Error al traducir la pregunta {key}: {e}")
-                translated_questions[key] = text
+        # Todas las preguntas en una sola petición (las ya traducidas salen de la caché)
+        try:
+            translated_texts = get_service().translate_many(list(questions.values()))
+            translated_questions = dict(zip(questions.keys(), translated_texts))
+        except Exception as e:
+            print(f"Error al traducir las preguntas: {e}")
+            translated_questions = dict(questions)
         update_fields["questions"] = translated_questions
 
     if not update_fields:
         print("No se proporcionaron campos para actualizar.")
         return 0, 0
 
-    result = collection.update_one(
-        {"_id": document_id},
-        {"$set": update_fields}
-    )
+    if writer is not None:
+        writer.upsert("circuit", document_id, update_fields, upsert=False)
+        return 0, 0
+
+    with BulkWriter(db) as own_writer:
+        own_writer.upsert("circuit", document_id, update_fields, upsert=False)
 
-    print(f"Actualización completada. Documentos afectados: {result.matched_count}, modificados: {result.modified_count}")
-    return result.matched_count, result.modified_count
+    totals = own_writer.totals
+    print(f"Actualización completada. Documentos afectados: {totals['matched']}, modificados: {totals['modified']}")
+    return totals["matched"], totals["modified"]
@@ -0,0 +1,137 @@
+import sys
+import io
+import os
+import json
+import time
+import traceback
+
+# Worker persistente: importa fastf1/pandas una sola vez y atiende trabajos
+# enviados por Node a través de stdin/stdout.
+#
+# Protocolo (una línea JSON por mensaje):
+#   petición:  {"id": 1, "job": "race", "year": 2025, "round": 5,
+#               "options": {"publish": true, "write_file": false}}
+#   respuesta: {"id": 1, "ok": true, "result": {...}, "elapsed": 1.234}
+#              {"id": 1, "ok": false, "error": "...", "traceback": "..."}
+#
+# Todo lo que los scripts escriban con print se redirige a stderr para no
+# romper el protocolo de stdout.
+
+started_at = time.time()
+jobs_done = 0
+
+
+def run_race(year, gp_round, publish=False, write_file=True, force=False):
+    from get_race_results import get_race_results
+    return get_race_results(year, gp_round, publish=publish, write_file=write_file, force=force)
+
+
+def run_qualifying(year, gp_round, publish=False, write_file=True, force=False):
+    from get_qualifying_results import get_qualifying_results
+    return get_qualifying_results(year, gp_round, publish=publish, write_file=write_file, force=force)
+
+
+def run_practice(year, gp_round, force=False):
+    from getPracticeResults import process_sessions
+    process_sessions(year, gp_round, force=force)
+    return {"message": f"Sesiones del año {year}, ronda {gp_round} procesadas correctamente."}
+
+
+def run_telemetry(year, gp_round, session="Q", driver=None, points=None, reference=None):
+    from telemetry import fastest_lap_trace, TELEMETRY_POINTS
+    return fastest_lap_trace(year, gp_round, session, driver, points or TELEMETRY_POINTS, reference)
+
+
+def run_ping(year=None, gp_round=None):
+    return {
+        "pid": os.getpid(),
+        "uptime": round(time.time() - started_at, 3),
+        "jobs_done": jobs_done
+    }
+
+
+JOBS = {
+    "race": run_race,
+    "qualifying": run_qualifying,
+    "practice": run_practice,
+    "telemetry": run_telemetry,
+    "ping": run_ping
+}
+
+
+def handle_request(request):
+    job = request.get("job")
+    if job not in JOBS:
+        raise ValueError(f"Trabajo desconocido: {job}")
+
+    if job == "ping":
+        return JOBS[job]()
+
+    year = int(request["year"])
+    gp_round = int(request["round"])
+    return JOBS[job](year, gp_round, **request.get("options", {}))
+
+
+def warm_up():
+    # Importaciones pesadas y caché de FastF1 una única vez por proceso
+    import pandas  # noqa: F401
+    from cache_config import enable_cache
+    import get_race_results  # noqa: F401
+    import get_qualifying_results  # noqa: F401
+    import getPracticeResults  # noqa: F401
+
+    enable_cache()
+
+
+def main():
+    global jobs_done
+
+    protocol_out = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
+    sys.stdout = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', line_buffering=True)
+    sys.stderr = sys.stdout
+    protocol_in = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+
+    def send(message):
+        protocol_out.write(json.dumps(message, ensure_ascii=False, default=str) + "\n")
+        protocol_out.flush()
+
+    try:
+        warm_up()
+    except Exception as e:
+        send({"id": None, "ok": False, "event": "ready", "error": str(e)})
+        return 1
+
+    send({"id": None, "ok": True, "event": "ready", "result": run_ping()})
+
+    for line in protocol_in:
+        line = line.strip()
+        if not line:
+            continue
+
+        request_id = None
+        start = time.perf_counter()
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            result = handle_request(request)
+            jobs_done += 1
+            send({
+                "id": request_id,
+                "ok": True,
+                "result": result,
+                "elapsed": round(time.perf_counter() - start, 3)
+            })
+        except Exception as e:
+            send({
+                "id": request_id,
+                "ok": False,
+                "error": str(e),
+                "traceback": traceback.format_exc(),
+                "elapsed": round(time.perf_counter() - start, 3)
+            })
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,7 @@ import driversRouter  from './drivers.js';
 import racesRouter    from './races.js';
 import teamsRouter    from './teams.js';
 import scriptRouter   from './scripts.js';
+import standingsRouter from './standings.js';
 
 const router = express.Router();
 
@@ -12,6 +13,7 @@ router.use('/drivers',  driversRouter);
 router.use('/races',    racesRouter);
 router.use('/teams',    teamsRouter);
 router.use('/scripts',  scriptRouter);
+router.use('/standings', standingsRouter);
 
 
 export default router;
@@ -1,5 +1,5 @@
 import express from 'express';
-import { getAllRaces, getTimezones, getRaceById, getCircuitById, getFinishedRaces, getFinishedRaceById, getUpcomingRaces, getScheduleCircuitInfo, updateSesionsByRound, updateQualyfingByRound, updateRaceByRound } from '../controllers/raceController.js';
+import { getAllRaces, getTimezones, getRaceById, getRaceChart, getCircuitById, getFinishedRaces, getFinishedRaceById, getUpcomingRaces, getScheduleCircuitInfo, updateSesionsByRound, updateQualyfingByRound, updateRaceByRound } from '../controllers/raceController.js';
 
 const router = express.Router();
 
@@ -9,6 +9,8 @@ router.get('/', getAllRaces);
 router.get('/timezones', getTimezones);
 // GET One Race
 router.get('/race/:raceId', getRaceById);
+// GET Race Position Chart
+router.get('/race/:raceId/chart', getRaceChart);
 // GET One Circuit
 router.get('/circuit/:circuitId', getCircuitById);
 // GET Finished Races
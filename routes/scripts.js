@@ -1,10 +1,12 @@
 import express from 'express';
-import { process_sessions, get_qualifying, get_race } from '../controllers/scriptController.js';
+import { process_sessions, get_qualifying, get_race, get_telemetry, workers_health } from '../controllers/scriptController.js';
 
 const router = express.Router();
 
 router.get('/process_sessions/:year/:round', process_sessions);
 router.get('/updateQualy/:year/:round', get_qualifying);
 router.get('/updateRace/:year/:round', get_race);
+router.get('/telemetry/:year/:round/:session/:driver', get_telemetry);
+router.get('/health', workers_health);
 
 export default router;
@@ -0,0 +1,13 @@
+import express from 'express';
+import { getDriversStandings, getTeamsStandings, getRoundContributions } from '../controllers/standingsController.js';
+
+const router = express.Router();
+
+// GET Clasificación de pilotos de una temporada
+router.get('/:year/drivers', getDriversStandings);
+// GET Clasificación de equipos de una temporada
+router.get('/:year/teams', getTeamsStandings);
+// GET Puntos aportados por la carrera (y sprint) de una ronda
+router.get('/:year/rounds/:round', getRoundContributions);
+
+export default router;